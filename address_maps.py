@@ -0,0 +1,82 @@
+"""
+address_maps.py — USPS abbreviation tables shared by the address tooling.
+
+Kept free of third-party imports so that lightweight readers (view_data.py's
+street filters, the match index, the geocoder) can expand "ln" → "Lane" the
+same way normalize_data.py does without loading usaddress.
+"""
+
+import re
+
+
+# ── Abbreviation expansion map ─────────────────────────────────────────────────
+# Covers USPS Publication 28 standard abbreviations.
+STREET_SUFFIX_MAP: dict[str, str] = {
+    "st": "Street",
+    "str": "Street",
+    "ave": "Avenue",
+    "av": "Avenue",
+    "blvd": "Boulevard",
+    "bvd": "Boulevard",
+    "cir": "Circle",
+    "ct": "Court",
+    "dr": "Drive",
+    "drv": "Drive",
+    "hwy": "Highway",
+    "ln": "Lane",
+    "pkwy": "Parkway",
+    "pl": "Place",
+    "plz": "Plaza",
+    "rd": "Road",
+    "sq": "Square",
+    "ter": "Terrace",
+    "trl": "Trail",
+    "way": "Way",
+}
+
+DIRECTIONAL_MAP: dict[str, str] = {
+    "n": "North",
+    "s": "South",
+    "e": "East",
+    "w": "West",
+    "ne": "Northeast",
+    "nw": "Northwest",
+    "se": "Southeast",
+    "sw": "Southwest",
+}
+
+OCCUPANCY_MAP: dict[str, str] = {
+    "apt": "Apartment",
+    "ste": "Suite",
+    "bldg": "Building",
+    "fl": "Floor",
+    "rm": "Room",
+    "unit": "Unit",
+    "#": "Unit",
+}
+
+
+# ── Street keys ────────────────────────────────────────────────────────────────
+
+_HOUSE_NUMBER = re.compile(r"^[\d-]+[A-Za-z]?\s+")
+
+
+def street_key(normalized_address: str) -> str:
+    """The street part of a normalized address, e.g. '600 Sycamore Lane, …' → 'sycamore lane'."""
+    street_line = (normalized_address or "").split(",", 1)[0].strip()
+    return _HOUSE_NUMBER.sub("", street_line).lower()
+
+
+def query_key(query: str) -> str:
+    """
+    Turn a user-typed street or address prefix ("Sycamore Ln", "280 w 8th st")
+    into the lowercase form street_key() / address keys use, expanding the
+    same abbreviations as normalize_data.py.
+    """
+    words = query.replace(".", " ").split()
+    first = 1 if words and _HOUSE_NUMBER.match(words[0] + " ") else 0
+    if len(words) > first and words[first].lower() in DIRECTIONAL_MAP:
+        words[first] = DIRECTIONAL_MAP[words[first].lower()]
+    if len(words) > first + 1 and words[-1].lower() in STREET_SUFFIX_MAP:
+        words[-1] = STREET_SUFFIX_MAP[words[-1].lower()]
+    return " ".join(words).lower()
@@ -0,0 +1,313 @@
+"""
+bake_tiles.py — Pre-render and serve Mapbox Vector Tiles for the map pins.
+
+Bakes the `property_tile` RPC's output for the Davis area at the zoom levels
+the app actually uses into a local MBTiles file (SQLite), and can serve that
+store over HTTP so popular tiles never reach the database. Tiles missing from
+the store are fetched from the RPC once and cached.
+
+Tiles draw each property's location, name and risk_score, so the store
+records the data version it was baked from (property count plus the latest
+properties.updated_at, which a trigger bumps on every change to a property
+row — see supabase/migrations/20260308000000_touch_properties_updated_at.sql)
+in the MBTiles metadata and drops its tiles when the version changes: at the
+start of each bake, and while serving at most every VERSION_CHECK_S seconds.
+
+Usage:
+    python bake_tiles.py bake                  Bake zooms 12–16 over Davis
+    python bake_tiles.py bake --zooms 10-17 --workers 16
+    python bake_tiles.py serve --port 8080     Serve /tiles/{z}/{x}/{y}.mvt
+
+Options:
+    --store PATH     MBTiles file (default: tiles.mbtiles)
+"""
+
+import argparse
+import http.client
+import json
+import math
+import sqlite3
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import instrument
+from supabase_api import API, HEADERS
+
+
+STORE_FILE = "tiles.mbtiles"
+
+# Davis, CA — city limits plus campus, as (min_long, min_lat, max_long, max_lat)
+DAVIS_BBOX = (-121.81, 38.52, -121.68, 38.58)
+DEFAULT_ZOOMS = "12-16"
+
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+VERSION_CHECK_S = 60.0      # how stale `serve` may let the data version get
+
+# What a tile fetch can raise: URLError/HTTPError, socket timeouts and resets
+# (all OSError), and truncated responses (http.client.IncompleteRead).
+FETCH_ERRORS = (OSError, http.client.HTTPException)
+
+
+# ── Tile math ──────────────────────────────────────────────────────────────────
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int) -> tuple[int, int]:
+    """XYZ (slippy-map) tile containing a WGS-84 point."""
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_for_bbox(bbox: tuple[float, float, float, float], zoom: int) -> list[tuple[int, int, int]]:
+    min_long, min_lat, max_long, max_lat = bbox
+    x0, y0 = lonlat_to_tile(min_long, max_lat, zoom)  # top-left
+    x1, y1 = lonlat_to_tile(max_long, min_lat, zoom)  # bottom-right
+    return [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def parse_zooms(spec: str) -> list[int]:
+    """'12-16' or '12,14,16' → [12, …]."""
+    zooms: list[int] = []
+    for part in spec.split(","):
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            zooms.extend(range(int(lo), int(hi) + 1))
+        elif part.strip():
+            zooms.append(int(part))
+    return sorted(set(zooms))
+
+
+# ── Tile store (MBTiles) ───────────────────────────────────────────────────────
+
+class TileStore:
+    """
+    Minimal MBTiles store. Rows use the spec's TMS numbering (y flipped);
+    callers use XYZ. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = STORE_FILE):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.generation = 0         # bumped whenever sync_version drops the tiles
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                create table if not exists metadata (name text primary key, value text);
+                create table if not exists tiles (
+                  zoom_level  integer,
+                  tile_column integer,
+                  tile_row    integer,
+                  tile_data   blob,
+                  primary key (zoom_level, tile_column, tile_row)
+                );
+            """)
+            self._conn.executemany(
+                "insert or replace into metadata (name, value) values (?, ?)",
+                [("name", "leaselens-properties"), ("format", "pbf"),
+                 ("bounds", ",".join(map(str, DAVIS_BBOX)))],
+            )
+
+    @staticmethod
+    def _row(z: int, y: int) -> int:
+        return (2 ** z - 1) - y
+
+    def get(self, z: int, x: int, y: int) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "select tile_data from tiles where zoom_level = ? and tile_column = ? and tile_row = ?",
+                (z, x, self._row(z, y)),
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def put(self, z: int, x: int, y: int, data: bytes, generation: int | None = None) -> None:
+        """Store a tile, unless the store was invalidated since `generation`."""
+        with self._lock, self._conn:
+            if generation is not None and generation != self.generation:
+                return
+            self._conn.execute(
+                "insert or replace into tiles (zoom_level, tile_column, tile_row, tile_data) "
+                "values (?, ?, ?, ?)",
+                (z, x, self._row(z, y), data),
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from tiles").fetchone()[0]
+
+    def sync_version(self, version: str) -> int:
+        """
+        Make the store match data `version`: if it was baked from another
+        version, delete its tiles. Returns the number of tiles dropped.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("select value from metadata where name = 'data_version'").fetchone()
+            if row is not None and row[0] == version:
+                return 0
+            dropped = self._conn.execute("delete from tiles").rowcount
+            self.generation += 1
+            self._conn.execute(
+                "insert or replace into metadata (name, value) values ('data_version', ?)", (version,),
+            )
+            return dropped
+
+
+# ── RPC ────────────────────────────────────────────────────────────────────────
+
+def fetch_tile(z: int, x: int, y: int) -> bytes:
+    """Render one tile through the property_tile RPC (raw bytea response)."""
+    url = f"{API}/rpc/property_tile?z={z}&x={x}&y={y}"
+    headers = {**HEADERS, "Accept": "application/octet-stream"}
+    req = urllib.request.Request(url, headers=headers)
+    with urllib.request.urlopen(req) as resp:
+        return resp.read()
+
+
+def data_version() -> str:
+    """'<property count>:<latest updated_at>' — changes whenever a tile could."""
+    url = f"{API}/properties?select=updated_at&order=updated_at.desc.nullslast&limit=1"
+    req = urllib.request.Request(url, headers={**HEADERS, "Prefer": "count=exact"})
+    with urllib.request.urlopen(req) as resp:
+        rows = json.loads(resp.read().decode("utf-8"))
+        total = (resp.headers.get("Content-Range") or "*/0").rsplit("/", 1)[-1]
+    latest = rows[0]["updated_at"] if rows else ""
+    return f"{total}:{latest}"
+
+
+# ── Commands ───────────────────────────────────────────────────────────────────
+
+def bake(store: TileStore, zooms: list[int], workers: int) -> None:
+    try:
+        version = data_version()
+    except FETCH_ERRORS as e:
+        print(f"✗ Could not read the property data version: {e}")
+        sys.exit(1)
+    dropped = store.sync_version(version)
+    if dropped:
+        print(f"  • data changed ({version}); dropped {dropped} stale tile(s)")
+
+    tiles = [t for z in zooms for t in tiles_for_bbox(DAVIS_BBOX, z)]
+    print(f"Baking {len(tiles)} tiles (zooms {zooms[0]}–{zooms[-1]}) with {workers} workers…")
+
+    failed = 0
+    total_bytes = 0
+    start = time.perf_counter()
+
+    def work(tile: tuple[int, int, int]) -> int:
+        data = fetch_tile(*tile)
+        store.put(*tile, data)
+        return len(data)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for tile, future in [(t, pool.submit(work, t)) for t in tiles]:
+            try:
+                total_bytes += future.result()
+            except FETCH_ERRORS as e:
+                failed += 1
+                print(f"  ✗ {tile[0]}/{tile[1]}/{tile[2]}: {e}")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ {len(tiles) - failed} tiles baked in {elapsed:.1f}s "
+          f"({total_bytes / 1024:.1f} KB, {len(tiles) / elapsed:.0f} tiles/s)")
+    if failed:
+        print(f"⚠  {failed} tile(s) failed")
+
+
+def serve(store: TileStore, port: int) -> None:
+    """Serve /tiles/{z}/{x}/{y}.mvt from the store, filling misses from the RPC."""
+    # Handlers run on ThreadingHTTPServer's threads; both dicts are guarded by `lock`.
+    stats = {"hits": 0, "misses": 0}
+    checked = {"at": -math.inf}
+    lock = threading.Lock()
+
+    def count(key: str) -> None:
+        with lock:
+            stats[key] += 1
+
+    def check_version() -> None:
+        with lock:
+            if time.monotonic() - checked["at"] < VERSION_CHECK_S:
+                return
+            checked["at"] = time.monotonic()
+        try:
+            dropped = store.sync_version(data_version())
+        except FETCH_ERRORS as e:
+            print(f"  ⚠ Could not read the property data version ({e}); serving cached tiles")
+            return
+        if dropped:
+            print(f"  • property data changed; dropped {dropped} stale tile(s)")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            parts = self.path.strip("/").split("/")
+            try:
+                if len(parts) != 4 or parts[0] != "tiles" or not parts[3].endswith(".mvt"):
+                    raise ValueError
+                z, x, y = int(parts[1]), int(parts[2]), int(parts[3][:-4])
+            except ValueError:
+                self.send_error(404)
+                return
+
+            check_version()
+            data = store.get(z, x, y)
+            if data is None:
+                count("misses")
+                generation = store.generation
+                try:
+                    data = fetch_tile(z, x, y)
+                except FETCH_ERRORS as e:
+                    self.send_error(502, str(e))
+                    return
+                # Fetched from the old data if the version changed meanwhile.
+                store.put(z, x, y, data, generation)
+            else:
+                count("hits")
+
+            self.send_response(200)
+            self.send_header("Content-Type", MVT_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", f"public, max-age={VERSION_CHECK_S:.0f}")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt: str, *args) -> None:
+            with lock:
+                hits, misses = stats["hits"], stats["misses"]
+            print(f"  {self.address_string()} {fmt % args} (hits={hits}, misses={misses})")
+
+    check_version()
+    server = ThreadingHTTPServer(("", port), Handler)
+    print(f"Serving {store.count()} cached tiles on http://localhost:{port}/tiles/{{z}}/{{x}}/{{y}}.mvt")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Bake and serve property vector tiles",
+    )
+    parser.add_argument("command", choices=["bake", "serve"])
+    parser.add_argument("--store", default=STORE_FILE, help=f"MBTiles file (default: {STORE_FILE})")
+    parser.add_argument("--zooms", default=DEFAULT_ZOOMS, help=f"Zoom levels to bake (default: {DEFAULT_ZOOMS})")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent RPC calls while baking")
+    parser.add_argument("--port", type=int, default=8080, help="Port for `serve`")
+    args = parser.parse_args()
+
+    print(f"bake_tiles.py — {args.command}\n")
+    store = TileStore(args.store)
+    if args.command == "bake":
+        bake(store, parse_zooms(args.zooms), args.workers)
+    else:
+        serve(store, args.port)
+
+
+if __name__ == "__main__":
+    instrument.run(main, "bake_tiles")
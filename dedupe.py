@@ -0,0 +1,410 @@
+"""
+dedupe.py — Collapse duplicate Yelp listings and violation records.
+
+Yelp pagination returns the same complex on several pages, sometimes under
+different names ("The Lexington" / "Lexington Apartments"), and city exports
+repeat a case once per status update. This stage runs on normalized records
+(it needs `normalized_address`) and merges each group of duplicates into one
+canonical record.
+
+    1. Blocking   every record gets a few cheap keys (its street line, its
+                  distinctive name tokens, its case number); only records that
+                  share a key are compared. Blocks larger than MAX_BLOCK are
+                  skipped — a key that common does not identify anything.
+    2. Linking    pairs in a block are linked by a per-dataset rule
+                  (see YELP / VIOLATIONS).
+    3. Clustering links are merged with union-find, so A~B and B~C put A, B
+                  and C in one cluster even if A and C were never compared.
+
+Work is O(n) in the number of records plus Σ block² over the (capped)
+blocks, i.e. near-linear at city scale.
+
+Each canonical record takes, per field, the most common non-empty value in
+its cluster (ties go to the longer value, then the first seen); fields in
+`latest` take the last value in input order instead (a case's current
+status). It also carries provenance:
+
+    cluster_size    number of input records merged
+    source_rows     their positions in the input
+    variants        {field: [distinct values]} for fields that disagreed
+
+Usage:
+    python dedupe.py                       Report duplicates in the normalized files
+    python dedupe.py --write               … and rewrite the files deduplicated
+    python dedupe.py --benchmark --size 200000
+    python dedupe.py --check               Run the regression cases (exit 1 on failure)
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+import instrument
+import match_index
+from address_maps import street_key
+from json_records import iter_json_array
+
+
+YELP_FILE = "normalized_yelp.json"
+VIOLATIONS_FILE = "normalized_violations.json"
+
+MAX_BLOCK = 200
+NAME_SIMILARITY = 0.5       # token Jaccard needed to link two names at one address
+
+# Words that say what kind of place it is rather than which one.
+NAME_STOPWORDS = frozenset({
+    "the", "at", "of", "and", "on", "in", "a",
+    "apartment", "apartments", "apts", "apt", "homes", "residences",
+    "townhomes", "townhouses", "community", "communities", "complex",
+    "davis", "llc", "inc", "ca",
+})
+_WORD = re.compile(r"[a-z0-9]+")
+_UNIT = re.compile(r",\s*(?:apartment|unit|suite|building|#)\b[^,]*", re.IGNORECASE)
+
+
+# ── Union-find ─────────────────────────────────────────────────────────────────
+
+class UnionFind:
+    """Disjoint sets over 0…n-1 (union by size, path halving)."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+    def groups(self) -> list[list[int]]:
+        """Members of each set, in order of first member."""
+        by_root: dict[int, list[int]] = {}
+        for i in range(len(self.parent)):
+            by_root.setdefault(self.find(i), []).append(i)
+        return list(by_root.values())
+
+
+# ── Keys and rules ─────────────────────────────────────────────────────────────
+
+def name_tokens(name: str | None) -> frozenset[str]:
+    """Distinctive lowercase words of a listing name ('The Lexington Apts' → {'lexington'})."""
+    return frozenset(_WORD.findall((name or "").lower())) - NAME_STOPWORDS
+
+
+def street_line(normalized_address: str | None) -> str:
+    """Number + street of a normalized address, without unit, city or zip."""
+    return _UNIT.sub("", normalized_address or "").split(",", 1)[0].strip().lower()
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    How one dataset is blocked, linked and merged. `features` runs once per
+    record; `blocks` and `same` work on its result, so the per-pair test does
+    not re-tokenize.
+    """
+    name: str
+    features: Callable[[dict], tuple]
+    blocks: Callable[[tuple], Iterable[tuple]]
+    same: Callable[[tuple, tuple], bool]
+    latest: frozenset[str] = field(default_factory=frozenset)
+
+
+def _yelp_features(rec: dict) -> tuple:
+    address = rec.get("normalized_address") or ""
+    return name_tokens(rec.get("property_name")), street_line(address), street_key(address)
+
+
+def _yelp_blocks(feat: tuple) -> Iterable[tuple]:
+    tokens, line, _ = feat
+    if line:
+        yield ("address", line)
+    for token in tokens:
+        yield ("name", token)
+
+
+def _yelp_same(a: tuple, b: tuple) -> bool:
+    """
+    Same listing if at the same street address with similar names (or a name
+    missing), or with the same distinctive name on the same street (a
+    complex listed under its leasing-office and building numbers).
+    """
+    (ta, la, sa), (tb, lb, sb) = a, b
+    if la and la == lb:
+        return not ta or not tb or _jaccard(ta, tb) >= NAME_SIMILARITY
+    if ta and ta == tb:
+        return not la or not lb or sa == sb
+    return False
+
+
+# Case-number cells that mean "no case number" (older ingests wrote blank
+# CSV cells as the string "nan"); treating them as a real number would put
+# every such violation in one block and merge them all.
+NO_CASE_NUMBER = frozenset({"", "NAN", "NONE"})
+
+
+def _case_number(rec: dict) -> str:
+    case = str(rec.get("case_number") or "").strip().upper()
+    return "" if case in NO_CASE_NUMBER else case
+
+
+def _violation_features(rec: dict) -> tuple:
+    return (
+        _case_number(rec),
+        (rec.get("normalized_address") or "").lower(),
+        (rec.get("violation_type") or "").strip().lower(),
+        rec.get("date") or "",
+    )
+
+
+def _violation_blocks(feat: tuple) -> Iterable[tuple]:
+    case, address = feat[0], feat[1]
+    if case:
+        yield ("case", case)
+    if address:
+        yield ("address", address)
+
+
+def _violation_same(a: tuple, b: tuple) -> bool:
+    """
+    Same case if the case numbers agree; without case numbers, the same
+    violation type at the same address on the same date.
+    """
+    if a[0] and b[0]:
+        return a[0] == b[0]
+    return a[1:] == b[1:]
+
+
+YELP = Rule("yelp", _yelp_features, _yelp_blocks, _yelp_same)
+VIOLATIONS = Rule(
+    "violations", _violation_features, _violation_blocks, _violation_same,
+    latest=frozenset({"status"}),
+)
+
+
+# ── Clustering ─────────────────────────────────────────────────────────────────
+
+PROVENANCE_FIELDS = ("cluster_size", "source_rows", "variants")
+
+
+def cluster(records: list[dict], rule: Rule, max_block: int = MAX_BLOCK) -> list[list[int]]:
+    """Group record positions into duplicate clusters."""
+    features = [rule.features(rec) for rec in records]
+    blocks: dict[tuple, list[int]] = defaultdict(list)
+    for i, feat in enumerate(features):
+        for key in set(rule.blocks(feat)):
+            blocks[key].append(i)
+
+    uf = UnionFind(len(records))
+    skipped = 0
+    for members in blocks.values():
+        if len(members) > max_block:
+            skipped += 1
+            continue
+        for x in range(len(members)):
+            i = members[x]
+            for j in members[x + 1:]:
+                if uf.find(i) != uf.find(j) and rule.same(features[i], features[j]):
+                    uf.union(i, j)
+    instrument.count(f"dedupe.{rule.name}.blocks_skipped", skipped)
+    return uf.groups()
+
+
+def _pick(values: list, latest: bool):
+    present = [v for v in values if v not in (None, "")]
+    if not present:
+        return values[0]
+    if latest:
+        return present[-1]
+    counts = Counter(present)
+    first_seen = {v: n for n, v in reversed(list(enumerate(present)))}
+    return max(counts, key=lambda v: (counts[v], len(str(v)), -first_seen[v]))
+
+
+def merge(records: list[dict], rows: list[int], rule: Rule) -> dict:
+    """Canonical record for one cluster, with provenance."""
+    if len(rows) == 1:
+        canonical = {k: v for k, v in records[rows[0]].items() if k not in PROVENANCE_FIELDS}
+        canonical.update(cluster_size=1, source_rows=rows, variants={})
+        return canonical
+    members = [records[i] for i in rows]
+    fields = list(dict.fromkeys(k for rec in members for k in rec if k not in PROVENANCE_FIELDS))
+    canonical: dict = {}
+    variants: dict[str, list] = {}
+    for name in fields:
+        values = [rec.get(name) for rec in members]
+        if any(isinstance(v, (list, dict)) for v in values):
+            canonical[name] = next((v for v in values if v), values[0])
+            continue
+        canonical[name] = _pick(values, name in rule.latest)
+        distinct = list(dict.fromkeys(v for v in values if v not in (None, "")))
+        if len(distinct) > 1:
+            variants[name] = distinct
+    canonical["cluster_size"] = len(rows)
+    canonical["source_rows"] = rows
+    canonical["variants"] = variants
+    return canonical
+
+
+def resolve(records: list[dict], rule: Rule) -> list[dict]:
+    """One canonical record per duplicate cluster, in order of first appearance."""
+    with instrument.span(f"dedupe.{rule.name}"):
+        groups = cluster(records, rule)
+        merged = [merge(records, rows, rule) for rows in groups]
+    instrument.count(f"dedupe.{rule.name}.merged", len(records) - len(merged))
+    return merged
+
+
+def report(records: list[dict], merged: list[dict], label: str, limit: int = 10) -> None:
+    dupes = [m for m in merged if m["cluster_size"] > 1]
+    print(f"  • {label}: {len(records)} records → {len(merged)} "
+          f"({len(records) - len(merged)} duplicates in {len(dupes)} clusters)")
+    for m in sorted(dupes, key=lambda m: -m["cluster_size"])[:limit]:
+        title = m.get("property_name") or m.get("case_number") or m.get("violation_type") or ""
+        names = m["variants"].get("property_name")
+        also = f"  (also: {', '.join(n for n in names if n != title)})" if names else ""
+        print(f"      {m['cluster_size']:>3}×  {title} — {m.get('normalized_address', '')}{also}")
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+BENCH_NAMES = ("Lexington", "Sycamore", "Aggie", "Oak", "Willow", "Cedar", "Arbor", "Cypress", "Orchard")
+BENCH_KINDS = ("Apartments", "Village", "Place", "Commons", "Court", "Terrace")
+BENCH_STREETS = ("Russell Boulevard", "Sycamore Lane", "Anderson Road", "Olive Drive", "Covell Boulevard")
+
+
+def synthetic_listings(n: int, dup_rate: float = 0.2, seed: int = 7) -> list[dict]:
+    """n Yelp-like listings, `dup_rate` of them re-listings of an earlier one."""
+    rng = random.Random(seed)
+    out: list[dict] = []
+    while len(out) < n:
+        if out and rng.random() < dup_rate:
+            rec = dict(rng.choice(out))
+            base = " ".join(w for w in rec["property_name"].split() if w not in ("The", "Apartments"))
+            rec["property_name"] = rng.choice((f"The {base}", f"{base} Apartments", base))
+        else:
+            k = len(out)
+            name = f"{rng.choice(BENCH_NAMES)} {rng.choice(BENCH_KINDS)} {k}"
+            rec = {
+                "property_name": name,
+                "normalized_address": f"{rng.randint(100, 9999)} {rng.choice(BENCH_STREETS)}, Davis, CA 95616",
+                "star_rating": rng.choice((3.5, 4.0, 4.5)),
+            }
+        out.append(rec)
+    return out
+
+
+def benchmark(size: int) -> None:
+    for n in (size // 10, size):
+        records = synthetic_listings(n)
+        start = time.perf_counter()
+        merged = resolve(records, YELP)
+        elapsed = time.perf_counter() - start
+        print(f"  • {n:>9,} listings → {len(merged):,} in {elapsed:.2f}s ({n / elapsed:,.0f}/s)")
+
+
+# ── Check ──────────────────────────────────────────────────────────────────────
+
+def _violation(address: str, case: str | None, vtype: str = "Mold", when: str = "2024-01-01") -> dict:
+    return {"normalized_address": address, "case_number": case, "violation_type": vtype, "date": when}
+
+
+# (description, records, expected cluster sizes in order of first appearance)
+CHECK_CASES: list[tuple[str, list[dict], list[int]]] = [
+    ("blank case numbers at different addresses stay separate", [
+        _violation("1 A Street, Davis, CA 95616", "nan"),
+        _violation("2 B Street, Davis, CA 95616", "NaN"),
+        _violation("3 C Street, Davis, CA 95616", None),
+    ], [1, 1, 1]),
+    ("'None' / '' case numbers are not case numbers either", [
+        _violation("1 A Street, Davis, CA 95616", "None", "Mold"),
+        _violation("1 A Street, Davis, CA 95616", "", "Pest Infestation"),
+    ], [1, 1]),
+    ("blank case numbers still merge on address + type + date", [
+        _violation("1 A Street, Davis, CA 95616", "nan"),
+        _violation("1 A Street, Davis, CA 95616", None),
+    ], [2]),
+    ("a shared case number merges across addresses", [
+        _violation("1 A Street, Davis, CA 95616", "CE-1"),
+        _violation("1 A St, Davis, CA 95616", "ce-1 "),
+    ], [2]),
+]
+
+
+def check() -> bool:
+    """Run CHECK_CASES against the violation rule; True if all pass."""
+    ok = True
+    for description, records, expected in CHECK_CASES:
+        sizes = [m["cluster_size"] for m in resolve(records, VIOLATIONS)]
+        if sizes == expected:
+            print(f"  ✓ {description}")
+        else:
+            print(f"  ✗ {description}: clusters {sizes}, expected {expected}")
+            ok = False
+    return ok
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Collapse duplicate Yelp listings and violation records",
+    )
+    parser.add_argument("--write", action="store_true", help="Rewrite the normalized files deduplicated")
+    parser.add_argument("--limit", type=int, default=10, help="Clusters to list per dataset")
+    parser.add_argument("--benchmark", action="store_true", help="Time synthetic listings instead")
+    parser.add_argument("--size", type=int, default=200_000, help="Benchmark size")
+    parser.add_argument("--check", action="store_true", help="Run the regression cases and exit")
+    args = parser.parse_args()
+
+    print("dedupe.py — Duplicate clustering for LeaseLens\n")
+    if args.check:
+        sys.exit(0 if check() else 1)
+    if args.benchmark:
+        benchmark(args.size)
+        return
+
+    conn = match_index.open_index() if args.write else None
+    for label, path, source, rule in (
+        ("Yelp", YELP_FILE, match_index.YELP_SOURCE, YELP),
+        ("Violations", VIOLATIONS_FILE, match_index.VIOLATIONS_SOURCE, VIOLATIONS),
+    ):
+        try:
+            records = list(iter_json_array(path))
+        except FileNotFoundError:
+            print(f"  ⚠  {path} not found — run normalize_data.py first.")
+            continue
+        merged = resolve(records, rule)
+        report(records, merged, label, args.limit)
+        if conn is not None and len(merged) < len(records):
+            match_index.save_indexed(conn, source, merged, path)
+            print(f"  ✓ Saved {len(merged)} records → {path} (indexed)")
+
+    if conn is not None:
+        conn.close()
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "dedupe")
@@ -0,0 +1,358 @@
+"""
+export_snapshot.py — Export Supabase tables to local NDJSON / Parquet files.
+
+Copies `properties`, `violations` and `reviews` (or the tables given) into a
+snapshot directory for offline analysis and diffing:
+
+    snapshots/<YYYYmmddTHHMMSS>/
+        manifest.json                       per-table state, rows, watermark
+        properties/shard-00-00000.ndjson
+        properties/shard-01-00000.ndjson    …
+
+Each table's id range is split into --workers shards that are read
+concurrently, every shard by keyset pagination (`id=gt.<last>&order=id`,
+PAGE_SIZE rows per request). Pages are streamed straight into the shard's
+current chunk file, so memory holds one page per worker, never a table.
+
+A chunk is written as `*.tmp` and renamed once it holds CHUNK_ROWS rows (or
+its shard is done); only then does the manifest record the shard's last id.
+An interrupted export is resumed with --resume: unfinished chunks are
+deleted and each shard continues after its last committed id.
+
+--incremental exports only rows with `created_at` later than the newest one
+in the previous complete snapshot (its watermark), into a new snapshot.
+Rows updated in place are not picked up; take a full snapshot for those.
+
+Usage:
+    python export_snapshot.py
+    python export_snapshot.py --format parquet --workers 8
+    python export_snapshot.py --incremental
+    python export_snapshot.py --resume snapshots/20260301T120000
+    python export_snapshot.py --tables violations --since 2026-01-01
+
+Options:
+    --out DIR          Snapshot root (default: snapshots)
+    --tables LIST      Comma-separated tables (default: properties,violations,reviews)
+    --format FMT       ndjson (default) or parquet (needs pyarrow)
+    --workers N        Concurrent shards per table (default: 4)
+    --since TS         Only rows with created_at > TS
+    --incremental      --since the previous complete snapshot's watermark
+    --resume DIR       Continue an interrupted snapshot
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import instrument
+from supabase_api import API, HEADERS
+
+
+SNAPSHOT_ROOT = "snapshots"
+MANIFEST = "manifest.json"
+DEFAULT_TABLES = ("properties", "violations", "reviews")
+
+PAGE_SIZE = 1000            # rows per request (PostgREST's default max-rows)
+CHUNK_ROWS = 100_000        # rows per output file
+DEFAULT_WORKERS = 4
+HTTP_TIMEOUT_S = 60.0       # a stalled page fails the table instead of hanging the export
+
+# What a page fetch can raise: URLError/HTTPError, socket timeouts and resets
+# (all OSError), and truncated responses (http.client.IncompleteRead).
+FETCH_ERRORS = (OSError, http.client.HTTPException)
+
+# Columns exported per table, with their Parquet types. Timestamps and dates
+# are kept as the ISO strings PostgREST returns; GeoJSON as JSON text.
+TABLE_COLUMNS: dict[str, dict[str, str]] = {
+    "properties": {
+        "id": "int64", "name": "string", "address_normalized": "string",
+        "location": "json", "risk_score": "float64",
+        "created_at": "string", "updated_at": "string",
+    },
+    "violations": {
+        "id": "int64", "property_id": "int64", "case_number": "string", "type": "string",
+        "status": "string", "date": "string", "created_at": "string",
+    },
+    "reviews": {
+        "id": "int64", "property_id": "int64", "source": "string", "rating": "float64",
+        "created_at": "string",
+    },
+}
+
+
+# ── HTTP ───────────────────────────────────────────────────────────────────────
+
+def _get(table: str, params: list[tuple[str, str]]) -> list[dict]:
+    url = f"{API}/{table}?{urllib.parse.urlencode(params)}"
+    req = urllib.request.Request(url, headers=HEADERS)
+    with instrument.span("http.get"), urllib.request.urlopen(req, timeout=HTTP_TIMEOUT_S) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def _filters(since: str | None) -> list[tuple[str, str]]:
+    return [("created_at", f"gt.{since}")] if since else []
+
+
+def id_bounds(table: str, since: str | None) -> tuple[int, int] | None:
+    """Smallest and largest id matching the filter, or None if no rows."""
+    first = _get(table, [("select", "id"), ("order", "id.asc"), ("limit", "1"), *_filters(since)])
+    if not first:
+        return None
+    last = _get(table, [("select", "id"), ("order", "id.desc"), ("limit", "1"), *_filters(since)])
+    return first[0]["id"], last[0]["id"]
+
+
+def split_shards(lo: int, hi: int, n: int) -> list[dict]:
+    """n contiguous id ranges (after, upto] covering [lo, hi]."""
+    n = max(1, min(n, hi - lo + 1))
+    step = (hi - lo + 1) / n
+    edges = [lo - 1 + round(step * i) for i in range(n)] + [hi]
+    return [
+        {"after": edges[i], "upto": edges[i + 1], "chunk": 0, "rows": 0, "done": False}
+        for i in range(n)
+    ]
+
+
+# ── Writers ────────────────────────────────────────────────────────────────────
+
+class NDJSONChunk:
+    suffix = ".ndjson"
+
+    def __init__(self, path: str, columns: dict[str, str]):
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: list[dict]) -> None:
+        self.f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+
+    def close(self) -> None:
+        self.f.close()
+
+
+class ParquetChunk:
+    """One Parquet file; each page becomes a row group."""
+    suffix = ".parquet"
+
+    def __init__(self, path: str, columns: dict[str, str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema([
+            (name, pa.string() if kind in ("string", "json") else getattr(pa, kind)())
+            for name, kind in columns.items()
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows: list[dict]) -> None:
+        data = {
+            name: [
+                json.dumps(r.get(name)) if kind == "json" and r.get(name) is not None else r.get(name)
+                for r in rows
+            ]
+            for name, kind in self.columns.items()
+        }
+        self.writer.write_table(self.pa.table(data, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+WRITERS = {"ndjson": NDJSONChunk, "parquet": ParquetChunk}
+
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+
+class Snapshot:
+    """A snapshot directory and its manifest (saved after every committed chunk)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        manifest_path = os.path.join(path, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"started_at": datetime.now().isoformat(timespec="seconds"), "tables": {}}
+
+    def save(self) -> None:
+        with self._lock:
+            tmp = os.path.join(self.path, MANIFEST + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp, os.path.join(self.path, MANIFEST))
+
+
+def export_shard(snapshot: Snapshot, table: str, index: int, fmt: str) -> int:
+    """Page one shard into chunk files; returns rows written this session."""
+    state = snapshot.manifest["tables"][table]
+    shard = state["shards"][index]
+    columns = TABLE_COLUMNS.get(table) or {}
+    select = ",".join(columns) if columns else "*"
+    writer_cls = WRITERS[fmt]
+    table_dir = os.path.join(snapshot.path, table)
+    written = 0
+
+    chunk, chunk_rows, chunk_path, last_id = None, 0, "", shard["after"]
+    while not shard["done"]:
+        params = [
+            ("select", select), ("order", "id.asc"), ("limit", str(PAGE_SIZE)),
+            ("id", f"gt.{last_id}"), ("id", f"lte.{shard['upto']}"),
+            *_filters(state["since"]),
+        ]
+        rows = _get(table, params)
+        if rows:
+            if chunk is None:
+                name = f"shard-{index:02d}-{shard['chunk']:05d}{writer_cls.suffix}"
+                chunk_path = os.path.join(table_dir, name)
+                chunk = writer_cls(chunk_path + ".tmp", columns)
+            chunk.write(rows)
+            chunk_rows += len(rows)
+            last_id = rows[-1]["id"]
+            newest = max((r.get("created_at") or "" for r in rows), default="")
+            with snapshot._lock:
+                state["watermark"] = max(state.get("watermark") or "", newest) or None
+
+        finished = len(rows) < PAGE_SIZE
+        if chunk is not None and (finished or chunk_rows >= CHUNK_ROWS):
+            chunk.close()
+            os.replace(chunk_path + ".tmp", chunk_path)
+            instrument.count(f"rows_exported.{table}", chunk_rows)
+            with snapshot._lock:
+                shard.update(after=last_id, chunk=shard["chunk"] + 1, rows=shard["rows"] + chunk_rows)
+            chunk, written, chunk_rows = None, written + chunk_rows, 0
+        if finished:
+            with snapshot._lock:
+                shard["done"] = True
+        if chunk is None:
+            snapshot.save()
+    return written
+
+
+def export_table(snapshot: Snapshot, table: str, fmt: str, workers: int, since: str | None) -> None:
+    tables = snapshot.manifest["tables"]
+    table_dir = os.path.join(snapshot.path, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    if table not in tables:
+        bounds = id_bounds(table, since)
+        tables[table] = {
+            "format": fmt,
+            "since": since,
+            "watermark": since,
+            "shards": split_shards(*bounds, workers) if bounds else [],
+            "complete": False,
+        }
+        snapshot.save()
+    state = tables[table]
+    if state["complete"]:
+        print(f"  • {table}: already complete ({sum(s['rows'] for s in state['shards'])} rows)")
+        return
+
+    # Anything not renamed into place was never committed.
+    for name in os.listdir(table_dir):
+        if name.endswith(".tmp"):
+            os.remove(os.path.join(table_dir, name))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(state["shards"]))) as pool:
+        futures = [
+            pool.submit(export_shard, snapshot, table, i, state["format"])
+            for i, shard in enumerate(state["shards"]) if not shard["done"]
+        ]
+        new_rows = sum(f.result() for f in futures)
+    elapsed = time.perf_counter() - start
+
+    state["complete"] = True
+    snapshot.save()
+    total = sum(s["rows"] for s in state["shards"])
+    rate = f", {new_rows / elapsed:,.0f} rows/s" if elapsed > 0 and new_rows else ""
+    print(f"  ✓ {table}: {total} rows in {len(state['shards'])} shard(s) "
+          f"({new_rows} this run, {elapsed:.1f}s{rate})")
+
+
+def previous_watermarks(root: str) -> dict[str, str]:
+    """Per-table watermark of the newest complete snapshot under `root`."""
+    if not os.path.isdir(root):
+        return {}
+    for name in sorted(os.listdir(root), reverse=True):
+        path = os.path.join(root, name, MANIFEST)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            tables = json.load(f).get("tables", {})
+        if tables and all(t.get("complete") for t in tables.values()):
+            return {name: t["watermark"] for name, t in tables.items() if t.get("watermark")}
+    return {}
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Export Supabase tables to local NDJSON / Parquet",
+    )
+    parser.add_argument("--out", default=SNAPSHOT_ROOT, help="Snapshot root directory")
+    parser.add_argument("--tables", default=",".join(DEFAULT_TABLES), help="Comma-separated tables")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="ndjson", help="Output format")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent shards per table")
+    parser.add_argument("--since", help="Only rows with created_at later than this timestamp")
+    parser.add_argument("--incremental", action="store_true",
+                        help="--since the previous complete snapshot's watermark")
+    parser.add_argument("--resume", metavar="DIR", help="Continue an interrupted snapshot")
+    args = parser.parse_args()
+
+    print("export_snapshot.py — Supabase table export\n")
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("✗ --format parquet needs pyarrow (pip install 'leaselens[export]')")
+            sys.exit(1)
+
+    if args.resume:
+        if not os.path.exists(os.path.join(args.resume, MANIFEST)):
+            print(f"✗ {args.resume} has no {MANIFEST} to resume from")
+            sys.exit(1)
+        snapshot = Snapshot(args.resume)
+        tables = snapshot.manifest["requested"]
+        print(f"Resuming {args.resume}…")
+    else:
+        watermarks = previous_watermarks(args.out) if args.incremental else {}
+        if args.incremental and not watermarks:
+            print("  ⚠ No complete snapshot to continue from — taking a full snapshot")
+        path = os.path.join(args.out, datetime.now().strftime("%Y%m%dT%H%M%S"))
+        os.makedirs(path, exist_ok=True)
+        snapshot = Snapshot(path)
+        tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+        snapshot.manifest["requested"] = tables
+        snapshot.save()
+        print(f"Exporting to {path}…")
+
+    for table in tables:
+        since = args.since
+        if not args.resume and args.incremental:
+            since = watermarks.get(table) or args.since
+        if since and table not in snapshot.manifest["tables"]:
+            print(f"  • {table}: rows created after {since}")
+        try:
+            with instrument.span(f"export.{table}"):
+                export_table(snapshot, table, args.format, args.workers, since)
+        except FETCH_ERRORS as e:
+            print(f"  ✗ {table}: {e}")
+            print(f"\n⚠ Snapshot incomplete — continue with --resume {snapshot.path}")
+            sys.exit(1)
+
+    print(f"\n✓ Snapshot complete → {snapshot.path}")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "export_snapshot")
@@ -1,21 +1,49 @@
+"""
+generate_sql.py — Write the seed properties as a SQL script.
+
+Renders every property after the first 10 (those are already in the
+database) with its violations and reviews as `DO $$ … $$` blocks in
+seed_new_properties.sql, to run in the SQL editor where the anonymous key's
+RLS restrictions don't apply.
+
+Usage:
+    python generate_sql.py
+    python generate_sql.py --seed-file synthetic_seed.json
+
+Options:
+    --seed-file FILE   Render every property in FILE instead — a JSON object
+                       with "properties", "violations" and "reviews" shaped
+                       like seed_data.py's (see synthetic_city.py)
+"""
+
+import argparse
 import json
-from seed_properties import PROPERTIES, VIOLATIONS, REVIEWS
-
-# The first 10 are already in the DB as verified. We just insert the remaining 20.
-new_props = PROPERTIES[10:]
-
-sql = ["-- ============================================================================",
-       "-- Seed 20 new properties for Davis, CA",
-       "-- Generated to bypass RLS restrictions on the anonymous key",
-       "-- ============================================================================\n"]
-
-for p in new_props:
-    name = p["name"].replace("'", "''")
-    addr = p["address_normalized"].replace("'", "''")
-    loc = p["location"]
-    risk = p["risk_score"]
-    
-    sql.append(f"""DO $$ 
+
+import instrument
+from seed_data import PROPERTIES, REVIEWS, VIOLATIONS
+
+
+OUTPUT_FILE = "seed_new_properties.sql"
+ALREADY_SEEDED = 10
+
+
+def build_sql(
+    properties: list[dict],
+    violations: dict[str, list[dict]] = VIOLATIONS,
+    reviews: dict[str, list[dict]] = REVIEWS,
+) -> str:
+    sql = ["-- ============================================================================",
+           f"-- Seed {len(properties)} new properties for Davis, CA",
+           "-- Generated to bypass RLS restrictions on the anonymous key",
+           "-- ============================================================================\n"]
+
+    for p in properties:
+        name = p["name"].replace("'", "''")
+        addr = p["address_normalized"].replace("'", "''")
+        loc = p["location"]
+        risk = p["risk_score"]
+
+        sql.append(f"""DO $$ 
 DECLARE
     new_prop_id bigint;
 BEGIN
@@ -23,30 +51,51 @@ BEGIN
     VALUES ('{name}', '{addr}', '{loc}', {risk})
     RETURNING id INTO new_prop_id;
 """)
-    
-    vs = VIOLATIONS.get(p["name"], [])
-    if vs:
-        v_vals = []
-        for v in vs:
-            case_num = v["case_number"].replace("'", "''")
-            vtype = v["type"].replace("'", "''")
-            status = v["status"].replace("'", "''")
-            date = v["date"]
-            v_vals.append(f"    (new_prop_id, '{case_num}', '{vtype}', '{status}', '{date}')")
-        sql.append(f"    INSERT INTO public.violations (property_id, case_number, type, status, date) VALUES\n" + ",\n".join(v_vals) + ";")
-    
-    rs = REVIEWS.get(p["name"], [])
-    if rs:
-        r_vals = []
-        for r in rs:
-            source = r["source"].replace("'", "''")
-            rating = r["rating"]
-            r_vals.append(f"    (new_prop_id, '{source}', {rating})")
-        sql.append(f"    INSERT INTO public.reviews (property_id, source, rating) VALUES\n" + ",\n".join(r_vals) + ";")
-        
-    sql.append("END $$;\n")
-
-with open("seed_new_properties.sql", "w") as f:
-    f.write("\n".join(sql))
-
-print("Generated seed_new_properties.sql")
+
+        vs = violations.get(p["name"], [])
+        if vs:
+            v_vals = []
+            for v in vs:
+                case_num = v["case_number"].replace("'", "''")
+                vtype = v["type"].replace("'", "''")
+                status = v["status"].replace("'", "''")
+                date = v["date"]
+                v_vals.append(f"    (new_prop_id, '{case_num}', '{vtype}', '{status}', '{date}')")
+            sql.append(f"    INSERT INTO public.violations (property_id, case_number, type, status, date) VALUES\n" + ",\n".join(v_vals) + ";")
+
+        rs = reviews.get(p["name"], [])
+        if rs:
+            r_vals = []
+            for r in rs:
+                source = r["source"].replace("'", "''")
+                rating = r["rating"]
+                r_vals.append(f"    (new_prop_id, '{source}', {rating})")
+            sql.append(f"    INSERT INTO public.reviews (property_id, source, rating) VALUES\n" + ",\n".join(r_vals) + ";")
+
+        sql.append("END $$;\n")
+
+    return "\n".join(sql)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Write seed properties as a SQL script",
+    )
+    parser.add_argument("--seed-file", help="JSON with properties / violations / reviews to render instead")
+    args = parser.parse_args()
+
+    if args.seed_file:
+        with open(args.seed_file, encoding="utf-8") as f:
+            seed = json.load(f)
+        sql = build_sql(seed["properties"], seed.get("violations", {}), seed.get("reviews", {}))
+    else:
+        # The first 10 are already in the DB as verified. We just insert the remaining 20.
+        sql = build_sql(PROPERTIES[ALREADY_SEEDED:])
+    with open(OUTPUT_FILE, "w") as f:
+        f.write(sql)
+
+    print(f"Generated {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "generate_sql")
@@ -0,0 +1,138 @@
+"""
+geo.py — Small geometry helpers shared by the LeaseLens spatial tools.
+
+    haversine_m   great-circle distance in metres between two lon/lat points
+    GridIndex     uniform-grid spatial index over lon/lat points with radius
+                  and nearest-neighbour queries
+    viewport_bbox bounding box of a map viewport at a Web-Mercator zoom level
+
+Coordinates are WGS-84 (SRID 4326) longitude / latitude in degrees, matching
+`properties.location`.
+"""
+
+import math
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+
+
+EARTH_RADIUS_M = 6_371_008.8
+METRES_PER_DEGREE_LAT = 111_320.0
+TILE_SIZE = 256
+
+
+def haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance between two points, in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_point(value) -> tuple[float, float] | None:
+    """
+    Read a (lon, lat) pair from any of the shapes the pipeline sees:
+    EWKT / WKT ('SRID=4326;POINT(-121.78 38.54)'), GeoJSON
+    ({'type': 'Point', 'coordinates': [lon, lat]}) or a (lon, lat) sequence.
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        coords = value.get("coordinates")
+        return (float(coords[0]), float(coords[1])) if coords else None
+    if isinstance(value, str):
+        text = value.split(";", 1)[-1].strip()
+        if not text.upper().startswith("POINT"):
+            return None
+        inner = text[text.index("(") + 1:text.rindex(")")].split()
+        return float(inner[0]), float(inner[1])
+    lon, lat = value
+    return float(lon), float(lat)
+
+
+class GridIndex:
+    """
+    Uniform grid over lon/lat points. Each item lands in one square cell of
+    `cell_m` metres (measured at `ref_lat`); queries only visit the cells
+    overlapping the search circle, so a lookup costs O(points nearby) rather
+    than O(all points). Suited to city-scale data where density is fairly
+    even; items are any hashable payload.
+    """
+
+    def __init__(self, cell_m: float = 250.0, ref_lat: float = 38.54):
+        self.cell_lat = cell_m / METRES_PER_DEGREE_LAT
+        self.cell_lon = cell_m / (METRES_PER_DEGREE_LAT * math.cos(math.radians(ref_lat)))
+        self._cells: dict[tuple[int, int], list[tuple[float, float, Hashable]]] = defaultdict(list)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell(self, lon: float, lat: float) -> tuple[int, int]:
+        return math.floor(lon / self.cell_lon), math.floor(lat / self.cell_lat)
+
+    def insert(self, lon: float, lat: float, item: Hashable) -> None:
+        self._cells[self._cell(lon, lat)].append((lon, lat, item))
+        self._size += 1
+
+    def extend(self, points: Iterable[tuple[float, float, Hashable]]) -> None:
+        for lon, lat, item in points:
+            self.insert(lon, lat, item)
+
+    def within(self, lon: float, lat: float, radius_m: float) -> list[tuple[float, Hashable]]:
+        """All items within `radius_m` of the point, as (distance_m, item), nearest first."""
+        dlat = radius_m / METRES_PER_DEGREE_LAT
+        dlon = radius_m / (METRES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        cx0, cy0 = self._cell(lon - dlon, lat - dlat)
+        cx1, cy1 = self._cell(lon + dlon, lat + dlat)
+
+        # Cheap equirectangular pre-check (slightly generous) before haversine.
+        kx = METRES_PER_DEGREE_LAT * math.cos(math.radians(lat))
+        limit = (radius_m * 1.01 + 1.0) ** 2
+
+        found: list[tuple[float, Hashable]] = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for plon, plat, item in self._cells.get((cx, cy), ()):
+                    dx = (plon - lon) * kx
+                    dy = (plat - lat) * METRES_PER_DEGREE_LAT
+                    if dx * dx + dy * dy > limit:
+                        continue
+                    d = haversine_m(lon, lat, plon, plat)
+                    if d <= radius_m:
+                        found.append((d, item))
+        found.sort(key=lambda hit: hit[0])
+        return found
+
+    def nearest(self, lon: float, lat: float, max_m: float) -> tuple[float, Hashable] | None:
+        """The closest item within `max_m`, as (distance_m, item), or None."""
+        hits = self.within(lon, lat, max_m)
+        return hits[0] if hits else None
+
+
+def viewport_bbox(
+    lon: float,
+    lat: float,
+    zoom: float,
+    width_px: int,
+    height_px: int,
+) -> dict[str, float]:
+    """Bounding box of a width × height pixel Web-Mercator view centred on (lon, lat)."""
+    world_px = TILE_SIZE * 2 ** zoom
+    cx = (lon + 180) / 360 * world_px
+    sin_lat = math.sin(math.radians(lat))
+    cy = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * world_px
+
+    def to_lat(py: float) -> float:
+        n = math.pi - 2 * math.pi * py / world_px
+        return math.degrees(math.atan(math.sinh(n)))
+
+    def to_long(px: float) -> float:
+        return px / world_px * 360 - 180
+
+    return {
+        "min_lat": to_lat(cy + height_px / 2),
+        "max_lat": to_lat(cy - height_px / 2),
+        "min_long": to_long(cx - width_px / 2),
+        "max_long": to_long(cx + width_px / 2),
+    }
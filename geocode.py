@@ -0,0 +1,370 @@
+"""
+geocode.py — Offline batch geocoder for normalized LeaseLens addresses.
+
+Loads a local gazetteer (no external geocoding service) into a text index
+(street key → address points sorted by house number, plus street segments
+with left/right address ranges) and geocodes the canonical strings produced
+by normalize_data.normalize_address in batches. Each distinct address is resolved once, in this order:
+
+    point          exact house number on the street in the address-point file
+    segment        interpolated along a street segment whose address range
+                   (on the side with matching parity) contains the number
+    interpolated   interpolated between the nearest lower / higher address
+                   points on the same street
+    (unmatched)    no coordinates
+
+Results are cached in geocode_cache.sqlite, keyed by address and invalidated
+when the gazetteer files change. Geocoded records gain `longitude`,
+`latitude` and `geocode_precision` fields and are rewritten in place (the
+match index is updated alongside).
+
+Gazetteer CSVs (column names matched case-insensitively, see *_COLUMNS):
+    address points   number, street, [zip], lon, lat
+    street segments  street, from_left, to_left, from_right, to_right,
+                     start_lon, start_lat, end_lon, end_lat, [zip]
+
+Usage:
+    python geocode.py --points davis_address_points.csv
+    python geocode.py --points points.csv --segments streets.csv
+"""
+
+import argparse
+import bisect
+import csv
+import hashlib
+import re
+import sqlite3
+import time
+from collections import Counter
+from typing import NamedTuple
+
+import instrument
+import match_index
+from address_maps import query_key, street_key
+from json_records import iter_json_array
+
+
+CACHE_FILE = "geocode_cache.sqlite"
+
+INPUTS = [
+    (match_index.YELP_SOURCE, "normalized_yelp.json"),
+    (match_index.VIOLATIONS_SOURCE, "normalized_violations.json"),
+]
+
+# Canonical field name → accepted column names (lowercase), as in ingest_city_data.
+POINT_COLUMNS: dict[str, list[str]] = {
+    "number": ["number", "house_number", "address_number", "addr_number", "add_number", "housenum"],
+    "street": ["street", "street_name", "full_street", "fullname", "st_name", "road"],
+    "zip": ["zip", "zipcode", "zip_code", "postcode", "postal_code"],
+    "lon": ["lon", "long", "lng", "longitude", "x"],
+    "lat": ["lat", "latitude", "y"],
+}
+
+SEGMENT_COLUMNS: dict[str, list[str]] = {
+    "street": POINT_COLUMNS["street"],
+    "zip": POINT_COLUMNS["zip"],
+    "from_left": ["from_left", "l_f_add", "lfromadd", "left_from"],
+    "to_left": ["to_left", "l_t_add", "ltoadd", "left_to"],
+    "from_right": ["from_right", "r_f_add", "rfromadd", "right_from"],
+    "to_right": ["to_right", "r_t_add", "rtoadd", "right_to"],
+    "start_lon": ["start_lon", "from_lon", "x1"],
+    "start_lat": ["start_lat", "from_lat", "y1"],
+    "end_lon": ["end_lon", "to_lon", "x2"],
+    "end_lat": ["end_lat", "to_lat", "y2"],
+}
+
+_NUMBER = re.compile(r"^\s*(\d+)")
+_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\s*$")
+
+
+class GeocodeResult(NamedTuple):
+    lon: float
+    lat: float
+    precision: str      # "point" | "segment" | "interpolated"
+
+
+class Segment(NamedTuple):
+    ranges: tuple[tuple[int, int], tuple[int, int]]   # (left, right) address ranges
+    start: tuple[float, float]
+    end: tuple[float, float]
+    zip: str
+
+
+def parse_address(address: str) -> tuple[int | None, str, str]:
+    """Canonical address → (house number, street key, zip)."""
+    number = _NUMBER.match(address or "")
+    zipcode = _ZIP.search(address or "")
+    return (
+        int(number.group(1)) if number else None,
+        street_key(address),
+        zipcode.group(1) if zipcode else "",
+    )
+
+
+def _columns(fieldnames: list[str], spec: dict[str, list[str]], path: str) -> dict[str, str | None]:
+    lower = {name.lower().strip(): name for name in fieldnames}
+    mapping = {field: next((lower[a] for a in aliases if a in lower), None) for field, aliases in spec.items()}
+    missing = [f for f, col in mapping.items() if col is None and f != "zip"]
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+    return mapping
+
+
+def _int(value: str) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+# ── Gazetteer ──────────────────────────────────────────────────────────────────
+
+class Gazetteer:
+    def __init__(self):
+        # street key → parallel lists sorted by house number
+        self._numbers: dict[str, list[int]] = {}
+        self._points: dict[str, list[tuple[float, float, str]]] = {}
+        self._segments: dict[str, list[Segment]] = {}
+        self.point_count = 0
+        self.segment_count = 0
+
+    def load_points(self, path: str) -> None:
+        rows: dict[str, list[tuple[int, float, float, str]]] = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            cols = _columns(reader.fieldnames or [], POINT_COLUMNS, path)
+            for row in reader:
+                number = _int(row[cols["number"]])
+                street = query_key(row[cols["street"]] or "")
+                if not number or not street:
+                    continue
+                lon, lat = float(row[cols["lon"]]), float(row[cols["lat"]])
+                zipcode = (row[cols["zip"]] or "").strip()[:5] if cols["zip"] else ""
+                rows.setdefault(street, []).append((number, lon, lat, zipcode))
+                self.point_count += 1
+
+        for street, pts in rows.items():
+            pts.extend(
+                (n, lon, lat, z)
+                for n, (lon, lat, z) in zip(self._numbers.get(street, []), self._points.get(street, []))
+            )
+            pts.sort()
+            self._numbers[street] = [p[0] for p in pts]
+            self._points[street] = [(p[1], p[2], p[3]) for p in pts]
+
+    def load_segments(self, path: str) -> None:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            cols = _columns(reader.fieldnames or [], SEGMENT_COLUMNS, path)
+            for row in reader:
+                street = query_key(row[cols["street"]] or "")
+                if not street:
+                    continue
+                self._segments.setdefault(street, []).append(Segment(
+                    ranges=(
+                        (_int(row[cols["from_left"]]), _int(row[cols["to_left"]])),
+                        (_int(row[cols["from_right"]]), _int(row[cols["to_right"]])),
+                    ),
+                    start=(float(row[cols["start_lon"]]), float(row[cols["start_lat"]])),
+                    end=(float(row[cols["end_lon"]]), float(row[cols["end_lat"]])),
+                    zip=(row[cols["zip"]] or "").strip()[:5] if cols["zip"] else "",
+                ))
+                self.segment_count += 1
+
+    # ── Lookups ────────────────────────────────────────────────────────────
+
+    def _exact(self, number: int, street: str, zipcode: str) -> GeocodeResult | None:
+        numbers = self._numbers.get(street)
+        if not numbers:
+            return None
+        i = bisect.bisect_left(numbers, number)
+        candidates = []
+        while i < len(numbers) and numbers[i] == number:
+            candidates.append(self._points[street][i])
+            i += 1
+        if not candidates:
+            return None
+        lon, lat, _ = next((c for c in candidates if zipcode and c[2] == zipcode), candidates[0])
+        return GeocodeResult(lon, lat, "point")
+
+    def _along_segment(self, number: int, street: str, zipcode: str) -> GeocodeResult | None:
+        for seg in self._segments.get(street, ()):
+            if zipcode and seg.zip and seg.zip != zipcode:
+                continue
+            for lo, hi in seg.ranges:
+                if not lo and not hi:
+                    continue
+                if lo % 2 != number % 2:
+                    continue
+                a, b = min(lo, hi), max(lo, hi)
+                if not a <= number <= b:
+                    continue
+                t = 0.5 if lo == hi else (number - lo) / (hi - lo)
+                lon = seg.start[0] + t * (seg.end[0] - seg.start[0])
+                lat = seg.start[1] + t * (seg.end[1] - seg.start[1])
+                return GeocodeResult(lon, lat, "segment")
+        return None
+
+    def _between_points(self, number: int, street: str) -> GeocodeResult | None:
+        numbers = self._numbers.get(street)
+        if not numbers:
+            return None
+        i = bisect.bisect_left(numbers, number)
+        if i == 0 or i == len(numbers):
+            return None
+        n0, n1 = numbers[i - 1], numbers[i]
+        (lon0, lat0, _), (lon1, lat1, _) = self._points[street][i - 1], self._points[street][i]
+        t = (number - n0) / (n1 - n0)
+        return GeocodeResult(lon0 + t * (lon1 - lon0), lat0 + t * (lat1 - lat0), "interpolated")
+
+    def geocode(self, address: str) -> GeocodeResult | None:
+        number, street, zipcode = parse_address(address)
+        if number is None or not street:
+            return None
+        return (
+            self._exact(number, street, zipcode)
+            or self._along_segment(number, street, zipcode)
+            or self._between_points(number, street)
+        )
+
+
+# ── Cache ──────────────────────────────────────────────────────────────────────
+
+def gazetteer_hash(paths: list[str]) -> str:
+    h = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def open_cache(path: str, gaz_hash: str) -> sqlite3.Connection:
+    """Open the result cache, discarding it if it was built from another gazetteer."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        create table if not exists meta (key text primary key, value text not null);
+        create table if not exists results (
+          address    text primary key,
+          lon        real,
+          lat        real,
+          precision  text not null
+        ) without rowid;
+    """)
+    row = conn.execute("select value from meta where key = 'gazetteer'").fetchone()
+    if row is None or row[0] != gaz_hash:
+        with conn:
+            conn.execute("delete from results")
+            conn.execute("insert or replace into meta (key, value) values ('gazetteer', ?)", (gaz_hash,))
+    return conn
+
+
+def cached_results(conn: sqlite3.Connection, addresses: list[str]) -> dict[str, GeocodeResult | None]:
+    found: dict[str, GeocodeResult | None] = {}
+    for i in range(0, len(addresses), 500):
+        batch = addresses[i:i + 500]
+        rows = conn.execute(
+            f"select address, lon, lat, precision from results where address in ({','.join('?' * len(batch))})",
+            batch,
+        )
+        for address, lon, lat, precision in rows:
+            found[address] = None if precision == "unmatched" else GeocodeResult(lon, lat, precision)
+    return found
+
+
+def store_results(conn: sqlite3.Connection, results: dict[str, GeocodeResult | None]) -> None:
+    with conn:
+        conn.executemany(
+            "insert or replace into results (address, lon, lat, precision) values (?, ?, ?, ?)",
+            [
+                (addr, r.lon, r.lat, r.precision) if r else (addr, None, None, "unmatched")
+                for addr, r in results.items()
+            ],
+        )
+
+
+# ── Batch ──────────────────────────────────────────────────────────────────────
+
+def geocode_batch(
+    gazetteer: Gazetteer,
+    cache: sqlite3.Connection,
+    addresses: list[str],
+) -> tuple[dict[str, GeocodeResult | None], int]:
+    """Resolve distinct addresses, using the cache first. Returns (results, cache hits)."""
+    results = cached_results(cache, addresses)
+    hits = len(results)
+    fresh = {addr: gazetteer.geocode(addr) for addr in addresses if addr not in results}
+    store_results(cache, fresh)
+    results.update(fresh)
+    return results, hits
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Offline batch geocoding of normalized addresses",
+    )
+    parser.add_argument("--points", help="Address-point gazetteer CSV")
+    parser.add_argument("--segments", help="Street-segment gazetteer CSV")
+    parser.add_argument("--cache", default=CACHE_FILE, help=f"Result cache (default: {CACHE_FILE})")
+    args = parser.parse_args()
+    if not args.points and not args.segments:
+        parser.error("at least one of --points / --segments is required")
+
+    print("geocode.py — Offline geocoding for LeaseLens\n")
+
+    print("Loading gazetteer…")
+    start = time.perf_counter()
+    gazetteer = Gazetteer()
+    if args.points:
+        gazetteer.load_points(args.points)
+    if args.segments:
+        gazetteer.load_segments(args.segments)
+    print(f"  ✓ {gazetteer.point_count} address points, {gazetteer.segment_count} segments "
+          f"indexed in {time.perf_counter() - start:.2f}s")
+
+    sources = [p for p in (args.points, args.segments) if p]
+    cache = open_cache(args.cache, gazetteer_hash(sources))
+    index = match_index.open_index()
+
+    for source, path in INPUTS:
+        try:
+            records = list(iter_json_array(path))
+        except FileNotFoundError:
+            print(f"\n  ⚠  {path} not found — skipping.")
+            continue
+
+        print(f"\nGeocoding {path}…")
+        addresses = sorted({r.get("normalized_address") or "" for r in records} - {""})
+        start = time.perf_counter()
+        with instrument.span("geocode_batch"):
+            results, hits = geocode_batch(gazetteer, cache, addresses)
+        instrument.count("addresses_geocoded", len(addresses) - hits)
+        instrument.count("geocode_cache_hits", hits)
+        elapsed = time.perf_counter() - start
+
+        precision = Counter(r.precision if r else "unmatched" for r in results.values())
+        for rec in records:
+            result = results.get(rec.get("normalized_address") or "")
+            rec["longitude"] = result.lon if result else None
+            rec["latitude"] = result.lat if result else None
+            rec["geocode_precision"] = result.precision if result else None
+        match_index.save_indexed(index, source, records, path)
+
+        matched = len(addresses) - precision["unmatched"]
+        rate = (len(addresses) - hits) / elapsed if elapsed else 0.0
+        print(f"  • {len(addresses)} distinct address(es), {hits} from cache, "
+              f"{len(addresses) - hits} geocoded ({rate:,.0f}/s)")
+        print(f"  • match rate {matched}/{len(addresses)}"
+              f" ({matched / len(addresses) * 100 if addresses else 0:.1f}%): "
+              + ", ".join(f"{k}={v}" for k, v in sorted(precision.items())))
+        print(f"  ✓ Saved {len(records)} records → {path}")
+
+    index.close()
+    cache.close()
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "geocode")
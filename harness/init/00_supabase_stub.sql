@@ -0,0 +1,41 @@
+-- =============================================================================
+-- Harness: Supabase platform stand-ins
+-- Description: The parts of a Supabase database the migrations rely on but do
+--              not create themselves — the `extensions` schema, the API
+--              roles PostgREST switches between, and a minimal `auth` schema
+--              (auth.users, auth.uid()). Local harness only; never applied to
+--              the hosted project.
+-- =============================================================================
+
+create schema if not exists extensions;
+create extension if not exists postgis with schema extensions;
+
+-- API roles (PostgREST logs in as authenticator and switches to the JWT role)
+create role anon nologin noinherit;
+create role authenticated nologin noinherit;
+create role service_role nologin noinherit bypassrls;
+create role authenticator login noinherit password 'postgres';
+grant anon, authenticated, service_role to authenticator;
+
+-- Minimal auth schema
+create schema if not exists auth;
+
+create table auth.users (
+  id         uuid primary key default gen_random_uuid(),
+  email      text,
+  created_at timestamptz default now()
+);
+
+create or replace function auth.uid()
+returns uuid
+language sql
+stable
+as $$
+  select nullif(current_setting('request.jwt.claims', true)::jsonb ->> 'sub', '')::uuid;
+$$;
+
+-- Same default privileges Supabase grants; RLS policies do the restricting.
+grant usage on schema public, extensions, auth to anon, authenticated, service_role;
+alter default privileges in schema public grant all on tables to anon, authenticated, service_role;
+alter default privileges in schema public grant all on sequences to anon, authenticated, service_role;
+alter default privileges in schema public grant execute on functions to anon, authenticated, service_role;
@@ -0,0 +1,9 @@
+#!/bin/sh
+# Apply supabase/migrations (mounted at /migrations) in filename order on
+# first start of the harness database.
+set -e
+
+for migration in /migrations/*.sql; do
+  echo "harness: applying $(basename "$migration")"
+  psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" -f "$migration"
+done
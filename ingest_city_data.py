@@ -1,9 +1,9 @@
 """
 ingest_city_data.py — Ingest City of Davis, CA code-compliance violation CSVs.
 
-Reads a local CSV, extracts address / violation type / date columns using
-case-insensitive matching, tags every record with Davis, CA metadata, and
-saves the cleaned data to city_violations_clean.json.
+Reads a local CSV, extracts address / violation type / date / status columns
+using case-insensitive matching, tags every record with Davis, CA metadata,
+and saves the cleaned data to city_violations_clean.json.
 """
 
 import json
@@ -11,6 +11,8 @@ import sys
 
 import pandas as pd
 
+import instrument
+
 
 DEFAULT_CSV = "davis_code_violations.csv"
 OUTPUT_FILE = "city_violations_clean.json"
@@ -32,6 +34,14 @@ COLUMN_ALIASES: dict[str, list[str]] = {
         "date_opened", "incident_date", "created_date", "entry_date",
         "reported_date", "case_date", "status_date",
     ],
+    "case_number": [
+        "case_number", "casenumber", "case_no", "case_num", "case_id",
+        "case", "record_number", "permit_number",
+    ],
+    "status": [
+        "status", "case_status", "violation_status", "current_status",
+        "case_state", "disposition",
+    ],
 }
 
 
@@ -44,10 +54,19 @@ def _find_column(df: pd.DataFrame, aliases: list[str]) -> str | None:
     return None
 
 
+def _cell(row: pd.Series, column: str | None) -> str | None:
+    """A cell as a stripped string; None for an unmapped column or a blank (NaN) cell."""
+    if column is None or not pd.notna(row[column]):
+        return None
+    return str(row[column]).strip() or None
+
+
 def ingest(csv_path: str = DEFAULT_CSV) -> pd.DataFrame:
     """Read the CSV and return a cleaned DataFrame with standard columns."""
     print(f"→ Reading {csv_path} …")
-    df = pd.read_csv(csv_path, dtype=str)
+    with instrument.span("read_csv"):
+        df = pd.read_csv(csv_path, dtype=str)
+    instrument.count("rows_read", len(df))
     print(f"  ✓ {len(df)} rows, {len(df.columns)} columns")
 
     # Resolve actual column names
@@ -65,28 +84,26 @@ def ingest(csv_path: str = DEFAULT_CSV) -> pd.DataFrame:
         sys.exit(1)
 
     # Build cleaned output
-    records: list[dict] = []
-    for _, row in df.iterrows():
-        address_raw = str(row.get(mapping["address"], "")).strip()
-        if not address_raw or address_raw.lower() == "nan":
-            continue
-
-        record: dict = {
-            "address": address_raw,
-            "violation_type": (
-                str(row[mapping["violation_type"]]).strip()
-                if mapping["violation_type"] else None
-            ),
-            "date": (
-                str(row[mapping["date"]]).strip()
-                if mapping["date"] else None
-            ),
-            # Davis-specific metadata
-            "city": "Davis",
-            "state": "CA",
-        }
-        records.append(record)
-
+    with instrument.span("iterrows"):
+        records: list[dict] = []
+        for _, row in df.iterrows():
+            address_raw = str(row.get(mapping["address"], "")).strip()
+            if not address_raw or address_raw.lower() == "nan":
+                continue
+
+            record: dict = {
+                "address": address_raw,
+                "violation_type": _cell(row, mapping["violation_type"]),
+                "date": _cell(row, mapping["date"]),
+                "status": _cell(row, mapping["status"]),
+                "case_number": _cell(row, mapping["case_number"]),
+                # Davis-specific metadata
+                "city": "Davis",
+                "state": "CA",
+            }
+            records.append(record)
+
+    instrument.count("records_extracted", len(records))
     clean_df = pd.DataFrame(records)
     print(f"\n✓ {len(clean_df)} valid records extracted")
     return clean_df
@@ -94,11 +111,13 @@ def ingest(csv_path: str = DEFAULT_CSV) -> pd.DataFrame:
 
 def main() -> None:
     csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV
-    clean_df = ingest(csv_path)
+    with instrument.span("ingest"):
+        clean_df = ingest(csv_path)
 
-    clean_df.to_json(OUTPUT_FILE, orient="records", indent=2, force_ascii=False)
+    with instrument.span("write_json"):
+        clean_df.to_json(OUTPUT_FILE, orient="records", indent=2, force_ascii=False)
     print(f"✓ Saved to {OUTPUT_FILE}")
 
 
 if __name__ == "__main__":
-    main()
+    instrument.run(main, "ingest_city_data")
@@ -0,0 +1,228 @@
+"""
+instrument.py — Shared timing, counters and profiling for the LeaseLens scripts.
+
+    span(name)         context manager / decorator timing a stage or hot function
+    count(name, n)     add to a record counter
+    run(main, script)  run a script's main() with instrumentation; strips the
+                       flags below from sys.argv before main() sees them
+
+Every script ends with `instrument.run(main, "<script>")`, which accepts:
+
+    --metrics DIR      write DIR/<script>.json and DIR/<script>.prom
+                       (also enabled by $LEASELENS_METRICS_DIR; pipeline.py
+                       sets it to pipeline_logs/ for every stage)
+    --profile          also capture cProfile (DIR/<script>.prof plus the top
+                       functions on stderr) and tracemalloc's top allocation
+                       sites; DIR defaults to metrics/
+
+The JSON report has wall time, peak RSS, per-span call counts / total / max
+seconds and counters, so runs can be diffed for regressions; the .prom file
+is the same data in Prometheus text exposition format (for a textfile
+collector or pushgateway).
+
+Spans cost about a microsecond, so they are placed around stages, HTTP
+calls and per-address parsing, not inner loops. The profiling modules are
+imported only when --profile is given, since every script (and the
+`leaselens` CLI) imports this module at startup.
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from contextlib import ContextDecorator
+from datetime import datetime, timezone
+
+
+METRICS_ENV = "LEASELENS_METRICS_DIR"
+DEFAULT_METRICS_DIR = "metrics"
+PROFILE_TOP = 25
+TRACEMALLOC_TOP = 15
+
+
+# Process-wide registry. The scripts are single-process; spans may be entered
+# from worker threads, and the dict updates below are atomic enough for
+# reporting purposes.
+_spans: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0])   # calls, total, max
+_counters: dict[str, int] = defaultdict(int)
+
+
+class span(ContextDecorator):
+    """Time a block or function under `name`; nested spans are timed independently."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        elapsed = time.perf_counter() - self._start
+        stats = _spans[self.name]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        return False
+
+
+def count(name: str, n: int = 1) -> None:
+    _counters[name] += n
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset() -> None:
+    _spans.clear()
+    _counters.clear()
+
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+
+def snapshot(script: str, wall_seconds: float, extra: dict | None = None) -> dict:
+    return {
+        "script": script,
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "wall_seconds": round(wall_seconds, 6),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "spans": {
+            name: {"calls": calls, "total_seconds": round(total, 6), "max_seconds": round(peak, 6)}
+            for name, (calls, total, peak) in sorted(_spans.items())
+        },
+        "counters": dict(sorted(_counters.items())),
+        **(extra or {}),
+    }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(report: dict) -> str:
+    script = _label(report["script"])
+    lines = [
+        "# HELP leaselens_run_seconds Wall-clock duration of the script run.",
+        "# TYPE leaselens_run_seconds gauge",
+        f'leaselens_run_seconds{{script="{script}"}} {report["wall_seconds"]}',
+        "# HELP leaselens_peak_rss_bytes Peak resident set size of the run.",
+        "# TYPE leaselens_peak_rss_bytes gauge",
+        f'leaselens_peak_rss_bytes{{script="{script}"}} {report["peak_rss_bytes"]}',
+        "# HELP leaselens_span_seconds_total Time spent inside each span.",
+        "# TYPE leaselens_span_seconds_total counter",
+    ]
+    for name, s in report["spans"].items():
+        lines.append(f'leaselens_span_seconds_total{{script="{script}",span="{_label(name)}"}} {s["total_seconds"]}')
+    lines += [
+        "# HELP leaselens_span_calls_total Times each span was entered.",
+        "# TYPE leaselens_span_calls_total counter",
+    ]
+    for name, s in report["spans"].items():
+        lines.append(f'leaselens_span_calls_total{{script="{script}",span="{_label(name)}"}} {s["calls"]}')
+    lines += [
+        "# HELP leaselens_span_max_seconds Longest single call of each span.",
+        "# TYPE leaselens_span_max_seconds gauge",
+    ]
+    for name, s in report["spans"].items():
+        lines.append(f'leaselens_span_max_seconds{{script="{script}",span="{_label(name)}"}} {s["max_seconds"]}')
+    lines += [
+        "# HELP leaselens_records_total Records counted by the script.",
+        "# TYPE leaselens_records_total counter",
+    ]
+    for name, n in report["counters"].items():
+        lines.append(f'leaselens_records_total{{script="{script}",counter="{_label(name)}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+
+def write_report(report: dict, directory: str) -> None:
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, report["script"])
+    with open(f"{base}.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    with open(f"{base}.prom", "w", encoding="utf-8") as f:
+        f.write(to_prometheus(report))
+
+
+# ── Runner ─────────────────────────────────────────────────────────────────────
+
+def _pop_flags(argv: list[str]) -> tuple[str | None, bool]:
+    """Remove --metrics DIR / --metrics=DIR / --profile from argv; return (dir, profile)."""
+    metrics_dir, profile = None, False
+    i = 1
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--profile":
+            profile = True
+            del argv[i]
+        elif arg == "--metrics" and i + 1 < len(argv):
+            metrics_dir = argv[i + 1]
+            del argv[i:i + 2]
+        elif arg.startswith("--metrics="):
+            metrics_dir = arg.split("=", 1)[1]
+            del argv[i]
+        else:
+            i += 1
+    return metrics_dir, profile
+
+
+def run(main: Callable[[], None], script: str) -> None:
+    """Run `main` inside a span named after the script and export metrics on exit."""
+    metrics_dir, profile = _pop_flags(sys.argv)
+    metrics_dir = metrics_dir or os.environ.get(METRICS_ENV) or (DEFAULT_METRICS_DIR if profile else None)
+
+    profiler = None
+    if profile:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        with span(script):
+            main()
+    finally:
+        wall = time.perf_counter() - start
+        extra: dict = {}
+        if profiler is not None:
+            import tracemalloc
+            profiler.disable()
+            extra["tracemalloc_top"] = _tracemalloc_top()
+            extra["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if metrics_dir:
+            report = snapshot(script, wall, extra)
+            write_report(report, metrics_dir)
+            if profiler is not None:
+                profiler.dump_stats(os.path.join(metrics_dir, f"{script}.prof"))
+                _print_profile(profiler, extra["tracemalloc_top"])
+            print(f"\n• metrics → {os.path.join(metrics_dir, script)}.json / .prom", file=sys.stderr)
+
+
+def _tracemalloc_top() -> list[dict]:
+    import tracemalloc
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP]
+    return [
+        {"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "bytes": s.size, "blocks": s.count}
+        for s in stats
+    ]
+
+
+def _print_profile(profiler, allocations: list[dict]) -> None:
+    import io
+    import pstats
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    print(f"\n── cProfile (top {PROFILE_TOP} by cumulative time) ──", file=sys.stderr)
+    print(out.getvalue().strip(), file=sys.stderr)
+    print(f"\n── tracemalloc (top {TRACEMALLOC_TOP} allocation sites) ──", file=sys.stderr)
+    for a in allocations:
+        print(f"  {a['bytes'] / 1024:>10.1f} KiB  {a['blocks']:>7} blocks  {a['where']}", file=sys.stderr)
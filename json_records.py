@@ -0,0 +1,123 @@
+"""
+json_records.py — Lazy reader for the pipeline's JSON array files.
+
+normalize_data.py and ingest_city_data.py write their output as one big
+pretty-printed JSON array. `json.load` has to parse the whole file before the
+first record is available, so this module decodes the array incrementally,
+one element at a time, from a fixed-size read buffer. Memory use is bounded by
+the largest single record rather than the file size.
+
+The matching writer, `dump_json_array`, reports where each element landed in
+the file so that indexes (see match_index.py) can seek to single records.
+"""
+
+import json
+from collections.abc import Iterator
+
+
+CHUNK_SIZE = 64 * 1024  # characters read from disk per refill
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yield the elements of the top-level JSON array stored in `path`.
+
+    Raises FileNotFoundError if the file is missing and ValueError if the
+    file does not contain a JSON array.
+    """
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            """Append the next chunk to the buffer; False once at end of file."""
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace() -> str:
+            """Advance past whitespace and return the next character ('' at EOF)."""
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ""
+
+        if skip_whitespace() != "[":
+            raise ValueError(f"{path} does not contain a JSON array")
+        pos += 1
+
+        if skip_whitespace() == "]":
+            return
+
+        while True:
+            # Decode one element. A value that runs up to the end of the
+            # buffer may be truncated (e.g. a number), so only accept it once
+            # there is trailing data or the file is exhausted.
+            while True:
+                try:
+                    value, end = _DECODER.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof or not fill():
+                        raise
+                    continue
+                if end < len(buf) or eof or not fill():
+                    break
+            pos = end
+            yield value
+
+            sep = skip_whitespace()
+            if sep == ",":
+                pos += 1
+                skip_whitespace()
+            elif sep == "]":
+                return
+            else:
+                raise ValueError(f"{path}: malformed JSON array near offset {pos}")
+
+
+def dump_json_array(records: list[dict], path: str) -> list[tuple[int, int]]:
+    """
+    Write `records` as a JSON array and return the (byte offset, byte length)
+    of every element in the file.
+
+    The output is byte-for-byte what `json.dump(records, f, indent=2,
+    ensure_ascii=False)` produces, so the spans can be used to seek straight
+    to a single record later without parsing the rest of the file.
+    """
+    spans: list[tuple[int, int]] = []
+    with open(path, "wb") as f:
+        f.write(b"[")
+        pos = 1
+        for i, rec in enumerate(records):
+            sep = b"\n  " if i == 0 else b",\n  "
+            body = (
+                json.dumps(rec, indent=2, ensure_ascii=False)
+                .replace("\n", "\n  ")
+                .encode("utf-8")
+            )
+            f.write(sep)
+            pos += len(sep)
+            spans.append((pos, len(body)))
+            f.write(body)
+            pos += len(body)
+        f.write(b"\n]" if spans else b"]")
+    return spans
+
+
+def read_span(f, offset: int, length: int) -> dict:
+    """Decode the single record at a byte span of a file opened in binary mode."""
+    f.seek(offset)
+    return json.loads(f.read(length))
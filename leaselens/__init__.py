@@ -0,0 +1,9 @@
+"""
+leaselens — Command-line entry point for the LeaseLens data pipeline.
+
+The pipeline scripts live at the repository root (installed as top-level
+modules); this package only dispatches `leaselens <command>` to them. See
+leaselens/cli.py.
+"""
+
+__version__ = "0.1.0"
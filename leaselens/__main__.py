@@ -0,0 +1,3 @@
+from leaselens.cli import main
+
+main()
@@ -0,0 +1,89 @@
+"""
+leaselens.cli — `leaselens <command> [args…]`.
+
+One entry point for the pipeline scripts. Each command maps to a script
+module that is imported only when that command runs, so pandas, usaddress,
+Playwright, NumPy or psycopg load only for the commands that use them, and
+`leaselens --help` imports nothing beyond this file. Arguments after the
+command are passed through unchanged (`leaselens view yelp --limit 5` is
+`python view_data.py yelp --limit 5`), including instrument.py's --metrics
+and --profile.
+
+Usage:
+    leaselens --help
+    leaselens view yelp --format github
+    leaselens ingest davis_code_violations.csv
+    python -m leaselens normalize
+
+Startup time is checked by `python -m leaselens.startup_bench`.
+"""
+
+import sys
+
+
+# command → (module, summary). Keep this module free of heavy imports.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "scrape": ("scrape_yelp", "Scrape Yelp apartment listings for Davis, CA (Playwright)"),
+    "ingest": ("ingest_city_data", "Ingest a City of Davis code-violation CSV"),
+    "normalize": ("normalize_data", "Normalize addresses and cross-match the datasets"),
+    "view": ("view_data", "Show yelp / violations / matches / report / search / timeline"),
+    "seed": ("seed_properties", "Insert the seed properties into Supabase"),
+    "gensql": ("generate_sql", "Write the seed properties as seed_new_properties.sql"),
+    "pipeline": ("pipeline", "Run the cached pipeline DAG"),
+    "dedupe": ("dedupe", "Report / collapse duplicate listings and violation cases"),
+    "classify": ("violation_classifier", "Classify violation types into categories / severities"),
+    "export": ("export_snapshot", "Export Supabase tables to local NDJSON / Parquet snapshots"),
+    "index": ("match_index", "Rebuild match_index.sqlite from the normalized files"),
+    "cache": ("record_cache", "Build the binary sidecar caches of the normalized files"),
+    "geocode": ("geocode", "Geocode normalized addresses from a local gazetteer"),
+    "join": ("spatial_join", "Assign violations to properties by proximity"),
+    "timeline": ("temporal_index", "Rolling-window violation counts per property"),
+    "neighbors": ("neighbors", "Precompute nearby lower-risk alternatives per property"),
+    "risk": ("risk_score", "Compute and store property risk scores"),
+    "tiles": ("bake_tiles", "Bake / serve property vector tiles"),
+    "summary": ("property_summary", "Backfill / verify the property_summary table"),
+    "stack": ("local_stack", "Start / stop the local PostgREST + PostGIS stand-in"),
+    "loadgen": ("loadgen", "Replay map-pan / bulk-seed load against the REST API"),
+    "synth": ("synthetic_city", "Generate a synthetic large-city dataset"),
+    "scale": ("scale_benchmark", "Time the pipeline stages on synthetic cities"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = [
+        "usage: leaselens <command> [args…]",
+        "",
+        "LeaseLens data pipeline. Run `leaselens <command> --help` for a command's options.",
+        "",
+        "commands:",
+        *(f"  {name:<{width}}  {summary}" for name, (_, summary) in COMMANDS.items()),
+    ]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if not args or args[0] in ("-h", "--help"):
+        print(usage())
+        return
+    if args[0] == "--version":
+        from leaselens import __version__
+        print(f"leaselens {__version__}")
+        return
+
+    command, rest = args[0], args[1:]
+    if command not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        print(f"\nleaselens: unknown command '{command}'", file=sys.stderr)
+        sys.exit(2)
+
+    import importlib
+
+    import instrument
+
+    module_name = COMMANDS[command][0]
+    module = importlib.import_module(module_name)
+    # The scripts read sys.argv themselves; present the command as the program name.
+    sys.argv = [f"leaselens {command}", *rest]
+    instrument.run(module.main, module_name)
@@ -0,0 +1,99 @@
+"""
+leaselens.startup_bench — Guard the CLI's startup time.
+
+Runs a few `leaselens` invocations in fresh interpreters, reports the median
+wall time over a bare `python -c pass` baseline, and lists the slowest
+imports (from `python -X importtime`) for each. Exits non-zero when a case
+exceeds its budget, so it can run in CI.
+
+Usage:
+    python -m leaselens.startup_bench
+    python -m leaselens.startup_bench --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# (label, leaselens arguments, budget in ms above interpreter startup)
+CASES: list[tuple[str, list[str], float]] = [
+    ("--help", ["--help"], 20.0),
+    ("view --help", ["view", "--help"], 60.0),
+    ("view yelp", ["view", "yelp", "--limit", "0"], 60.0),
+    ("gensql", ["gensql"], 40.0),
+]
+
+SLOWEST_IMPORTS = 5
+
+
+def _time_ms(cmd: list[str], cwd: str, repeat: int) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def slowest_imports(args: list[str], cwd: str) -> list[tuple[int, str]]:
+    """Top-level imports by cumulative microseconds, via -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "leaselens", *args],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False,
+    )
+    found: list[tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        # One leading space marks a module imported directly by user code.
+        if cumulative.strip().isdigit() and name.startswith(" ") and not name.startswith("  "):
+            found.append((int(cumulative), name.strip()))
+    return sorted(found, reverse=True)[:SLOWEST_IMPORTS]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — CLI startup-time benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per case (default: 10)")
+    args = parser.parse_args()
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print("leaselens.startup_bench — CLI startup time\n")
+
+    # Run from an empty directory so `view` and `gensql` don't read or write repo data.
+    with tempfile.TemporaryDirectory() as scratch:
+        env_path = os.pathsep.join(filter(None, [repo, os.environ.get("PYTHONPATH")]))
+        os.environ["PYTHONPATH"] = env_path
+
+        baseline = _time_ms([sys.executable, "-c", "pass"], scratch, args.repeat)
+        print(f"  • interpreter baseline: {baseline:.1f} ms\n")
+
+        header = f"{'case':<14} {'median ms':>10} {'+ startup':>10} {'budget':>8}"
+        print(header)
+        print("─" * len(header))
+        over = []
+        for label, cli_args, budget in CASES:
+            total = _time_ms([sys.executable, "-m", "leaselens", *cli_args], scratch, args.repeat)
+            extra = total - baseline
+            mark = "✓" if extra <= budget else "✗"
+            print(f"{label:<14} {total:>10.1f} {extra:>10.1f} {budget:>7.0f}  {mark}")
+            if extra > budget:
+                over.append(label)
+            for micros, module in slowest_imports(cli_args, scratch):
+                print(f"{'':<14}   {micros / 1000:>7.1f} ms  {module}")
+
+    if over:
+        print(f"\n✗ Over budget: {', '.join(over)}")
+        sys.exit(1)
+    print("\n✓ All cases within budget")
+
+
+if __name__ == "__main__":
+    main()
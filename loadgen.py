@@ -0,0 +1,390 @@
+"""
+loadgen.py — HTTP load generator for the Supabase REST endpoints.
+
+Replays the two workloads the app and pipeline put on PostgREST and reports
+latency percentiles and throughput. Point it at the local stand-in
+(`python local_stack.py up`, then `eval "$(python local_stack.py env)"`)
+rather than the hosted project.
+
+    pan    Map sessions: each worker is a user panning and zooming a phone
+           map around Davis; every view change calls the map RPC with the
+           visible bounding box (random walk, seeded, so runs are comparable).
+    seed   Bulk seeding: each worker POSTs batches of synthetic properties
+           plus violations for them, as seed_properties.py does. Rows are
+           tagged with a run id and deleted afterwards unless --keep.
+
+Usage:
+    python loadgen.py pan --concurrency 16 --duration 30
+    python loadgen.py pan --rpc properties_in_view --requests 2000
+    python loadgen.py seed --concurrency 4 --batch 500 --requests 40
+
+Options:
+    --concurrency N   Parallel workers, each with its own keep-alive connection
+                      (default: 8)
+    --duration S      Run for S seconds (default: 20)
+    --requests N      Stop after N requests in total (overrides --duration)
+    --rpc NAME        pan: properties_clustered_in_view (default) or
+                      properties_in_view
+    --batch N         seed: properties per POST (default: 200; each gets 0–3
+                      violations)
+    --keep            seed: keep the inserted rows
+    --random-seed N   Random seed for the sessions (default: 7)
+    --json            Print the summary as JSON instead of a table
+
+Environment: SUPABASE_REST_URL / SUPABASE_URL and SUPABASE_SERVICE_KEY, as
+for supabase_api.py.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import math
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from dataclasses import dataclass, field
+
+import instrument
+from geo import viewport_bbox
+from supabase_api import API, HEADERS
+
+
+# Davis, CA — the map's default centre (see PRD), and the area sessions roam
+CENTER_LAT = 38.5382
+CENTER_LONG = -121.7617
+ROAM_LAT = 0.10
+ROAM_LONG = 0.15
+
+# Viewport of a typical phone map, in screen pixels
+SCREEN_W = 390
+SCREEN_H = 844
+MIN_ZOOM = 11
+MAX_ZOOM = 17
+
+RPCS = ("properties_clustered_in_view", "properties_in_view")
+VIOLATION_TYPES = ("Mold", "Plumbing", "Pest Infestation", "Electrical", "Structural", "Fire Safety")
+TAG_PREFIX = "Loadgen"
+
+
+# ── HTTP ────────────────────────────────────────────────────────────────────────
+
+class Client:
+    """One keep-alive connection to the REST endpoint (one per worker thread)."""
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+    # What a reused connection raises when the server already closed it while idle.
+    STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+    def __init__(self, base_url: str, headers: dict[str, str]):
+        parts = urllib.parse.urlsplit(base_url)
+        self.path = parts.path.rstrip("/")
+        self.headers = headers
+        conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._connect = lambda: conn_cls(parts.netloc, timeout=30)
+        self.conn = self._connect()
+        self._reused = False
+
+    def _send(self, method: str, path: str, data: bytes | None, headers: dict) -> tuple[int, bytes]:
+        self.conn.request(method, self.path + path, body=data, headers=headers)
+        resp = self.conn.getresponse()
+        body = resp.read()
+        self._reused = True
+        return resp.status, body
+
+    def request(self, method: str, path: str, body=None, headers: dict | None = None,
+                idempotent: bool | None = None) -> tuple[int, bytes]:
+        """
+        Send one request. If a reused connection turns out to be stale, the
+        request is retried once on a fresh one, but only when it is safe to
+        repeat: idempotent methods, or callers passing idempotent=True (e.g.
+        read-only RPCs). A POST that may have reached the server is never
+        sent twice; its error is raised after reconnecting.
+        """
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        merged = {**self.headers, **(headers or {})}
+        if idempotent is None:
+            idempotent = method in self.IDEMPOTENT_METHODS
+        try:
+            return self._send(method, path, data, merged)
+        except (http.client.HTTPException, OSError) as e:
+            retry = idempotent and self._reused and isinstance(e, self.STALE_ERRORS)
+            self.reconnect()
+            if not retry:
+                raise
+        return self._send(method, path, data, merged)
+
+    def reconnect(self) -> None:
+        self.conn.close()
+        self.conn = self._connect()
+        self._reused = False
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# ── Results ─────────────────────────────────────────────────────────────────────
+
+@dataclass
+class OpStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    rows: int = 0
+    bytes: int = 0
+
+
+class Recorder:
+    """Thread-safe per-operation latency / row / byte tallies."""
+
+    def __init__(self):
+        self.ops: dict[str, OpStats] = {}
+        self._lock = threading.Lock()
+
+    def add(self, op: str, ms: float, ok: bool, rows: int = 0, nbytes: int = 0) -> None:
+        with self._lock:
+            s = self.ops.setdefault(op, OpStats())
+            s.latencies_ms.append(ms)
+            s.errors += not ok
+            s.rows += rows
+            s.bytes += nbytes
+
+
+def percentile(sorted_ms: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, max(0, math.ceil(q * len(sorted_ms)) - 1))]
+
+
+def summarise(recorder: Recorder, wall_s: float) -> list[dict]:
+    out = []
+    for op, s in sorted(recorder.ops.items()):
+        ms = sorted(s.latencies_ms)
+        out.append({
+            "op": op,
+            "requests": len(ms),
+            "errors": s.errors,
+            "p50_ms": round(percentile(ms, 0.50), 2),
+            "p95_ms": round(percentile(ms, 0.95), 2),
+            "p99_ms": round(percentile(ms, 0.99), 2),
+            "mean_ms": round(statistics.fmean(ms), 2) if ms else 0.0,
+            "max_ms": round(ms[-1], 2) if ms else 0.0,
+            "req_per_s": round(len(ms) / wall_s, 1) if wall_s else 0.0,
+            "rows_per_s": round(s.rows / wall_s, 1) if wall_s else 0.0,
+            "bytes": s.bytes,
+        })
+    return out
+
+
+def _format_bytes(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def print_table(rows: list[dict]) -> None:
+    header = (
+        f"{'op':<34} {'reqs':>7} {'errs':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'req/s':>8} {'rows/s':>9} {'bytes':>10}"
+    )
+    print(header)
+    print("─" * len(header))
+    for r in rows:
+        print(
+            f"{r['op']:<34} {r['requests']:>7} {r['errors']:>5} {r['p50_ms']:>8.2f} "
+            f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['req_per_s']:>8.1f} "
+            f"{r['rows_per_s']:>9.1f} {_format_bytes(r['bytes']):>10}"
+        )
+
+
+# ── Workloads ───────────────────────────────────────────────────────────────────
+
+class Budget:
+    """Shared stop condition: a request count or a deadline."""
+
+    def __init__(self, requests: int | None, duration_s: float):
+        self._tickets = itertools.count() if requests else None
+        self.requests = requests
+        self.deadline = time.monotonic() + duration_s
+
+    def take(self) -> bool:
+        if self._tickets is not None:
+            return next(self._tickets) < self.requests
+        return time.monotonic() < self.deadline
+
+
+def timed(client: Client, recorder: Recorder, op: str, method: str, path: str,
+          body=None, headers: dict | None = None, idempotent: bool | None = None) -> list | None:
+    start = time.perf_counter()
+    try:
+        status, payload = client.request(method, path, body, headers, idempotent)
+    except (http.client.HTTPException, OSError):
+        recorder.add(op, (time.perf_counter() - start) * 1000, ok=False)
+        return None
+    ms = (time.perf_counter() - start) * 1000
+    ok = 200 <= status < 300
+    rows = json.loads(payload) if ok and payload else []
+    recorder.add(op, ms, ok, len(rows) if isinstance(rows, list) else 0, len(payload))
+    return rows if ok else None
+
+
+def pan_session(client: Client, recorder: Recorder, budget: Budget, rpc_name: str, rng: random.Random) -> None:
+    """One user: start somewhere in town, then pan by part of a screen or zoom a level."""
+    lon = CENTER_LONG + rng.uniform(-ROAM_LONG, ROAM_LONG) / 2
+    lat = CENTER_LAT + rng.uniform(-ROAM_LAT, ROAM_LAT) / 2
+    zoom = rng.randint(13, 15)
+    while budget.take():
+        box = viewport_bbox(lon, lat, zoom, SCREEN_W, SCREEN_H)
+        params = dict(box)
+        if rpc_name == "properties_clustered_in_view":
+            params["zoom"] = zoom
+        # The map RPCs only read, so a stale keep-alive connection may retry them.
+        timed(client, recorder, f"rpc/{rpc_name} z{zoom}", "POST", f"/rpc/{rpc_name}", params,
+              idempotent=True)
+
+        if rng.random() < 0.25:
+            zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom + rng.choice((-1, 1))))
+        else:
+            # Drag by up to half a screen in any direction.
+            lon += (box["max_long"] - box["min_long"]) * rng.uniform(-0.5, 0.5)
+            lat += (box["max_lat"] - box["min_lat"]) * rng.uniform(-0.5, 0.5)
+        lon = min(CENTER_LONG + ROAM_LONG, max(CENTER_LONG - ROAM_LONG, lon))
+        lat = min(CENTER_LAT + ROAM_LAT, max(CENTER_LAT - ROAM_LAT, lat))
+
+
+def seed_worker(client: Client, recorder: Recorder, budget: Budget, run_id: str,
+                batch: int, rng: random.Random, worker: int) -> None:
+    """POST property batches, then violations for the inserted ids."""
+    serial = itertools.count()
+    while budget.take():
+        props = []
+        for _ in range(batch):
+            n = next(serial)
+            lon = CENTER_LONG + rng.uniform(-ROAM_LONG, ROAM_LONG)
+            lat = CENTER_LAT + rng.uniform(-ROAM_LAT, ROAM_LAT)
+            props.append({
+                "name": f"{TAG_PREFIX} {run_id} {worker}-{n}",
+                "address_normalized": f"{n} Loadgen Way, Davis, CA 95616",
+                "location": f"SRID=4326;POINT({lon:.6f} {lat:.6f})",
+                "risk_score": round(rng.uniform(0, 10), 2),
+            })
+        inserted = timed(client, recorder, "POST properties", "POST", "/properties?select=id", props)
+        if not inserted:
+            continue
+
+        violations = [
+            {
+                "property_id": row["id"],
+                "case_number": f"LG-{run_id}-{row['id']}-{k}",
+                "type": rng.choice(VIOLATION_TYPES),
+                "status": rng.choice(("open", "closed")),
+                "date": f"202{rng.randint(0, 5)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            }
+            for row in inserted
+            for k in range(rng.randint(0, 3))
+        ]
+        if violations:
+            timed(client, recorder, "POST violations", "POST", "/violations", violations,
+                  {"Prefer": "return=minimal"})
+
+
+def run_workers(target, concurrency: int, headers: dict[str, str], *args) -> float:
+    """Run `target(client, worker_index, *args)` on `concurrency` threads; return wall seconds."""
+    def worker(i: int) -> None:
+        client = Client(API, headers)
+        try:
+            target(client, i, *args)
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def cleanup(run_id: str, log=sys.stdout) -> None:
+    """Delete this run's properties (violations cascade)."""
+    client = Client(API, HEADERS)
+    pattern = urllib.parse.quote(f"{TAG_PREFIX} {run_id} *")
+    try:
+        status, _ = client.request("DELETE", f"/properties?name=like.{pattern}", headers={"Prefer": "return=minimal"})
+    finally:
+        client.close()
+    if 200 <= status < 300:
+        print(f"✓ Deleted run {run_id} rows", file=log)
+    else:
+        print(f"⚠ Cleanup returned HTTP {status}; delete rows named '{TAG_PREFIX} {run_id} …' by hand", file=log)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Load generator for the Supabase REST endpoints",
+    )
+    parser.add_argument("workload", choices=["pan", "seed"])
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel workers")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Total requests (overrides --duration)")
+    parser.add_argument("--rpc", choices=RPCS, default=RPCS[0], help="pan: map RPC to call")
+    parser.add_argument("--batch", type=int, default=200, help="seed: properties per POST")
+    parser.add_argument("--keep", action="store_true", help="seed: keep the inserted rows")
+    parser.add_argument("--random-seed", type=int, default=7, help="Random seed for the sessions")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    budget = Budget(args.requests, args.duration)
+    limit = f"{args.requests} requests" if args.requests else f"{args.duration:g}s"
+    log = sys.stderr if args.json else sys.stdout
+    print(f"loadgen.py — {args.workload} · {args.concurrency} workers · {limit} · {API}\n", file=log)
+
+    if args.workload == "pan":
+        wall = run_workers(
+            lambda client, i: pan_session(
+                client, recorder, budget, args.rpc, random.Random(args.random_seed * 1000 + i)
+            ),
+            args.concurrency, HEADERS,
+        )
+    else:
+        run_id = uuid.uuid4().hex[:8]
+        headers = {**HEADERS, "Prefer": "return=representation"}
+        try:
+            wall = run_workers(
+                lambda client, i: seed_worker(
+                    client, recorder, budget, run_id, args.batch,
+                    random.Random(args.random_seed * 1000 + i), i,
+                ),
+                args.concurrency, headers,
+            )
+        finally:
+            if not args.keep:
+                cleanup(run_id, log)
+
+    rows = summarise(recorder, wall)
+    total = sum(r["requests"] for r in rows)
+    errors = sum(r["errors"] for r in rows)
+    instrument.count("loadgen.requests", total)
+    instrument.count("loadgen.errors", errors)
+
+    if args.json:
+        print(json.dumps({"workload": args.workload, "wall_s": round(wall, 3), "ops": rows}, indent=2))
+        return
+
+    print_table(rows)
+    print(f"\n  • {total} requests in {wall:.1f}s ({total / wall:.1f} req/s overall)")
+    if errors:
+        print(f"  ⚠ {errors} failed requests")
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "loadgen")
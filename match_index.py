@@ -0,0 +1,508 @@
+"""
+match_index.py — Persistent Yelp ↔ violation address index for LeaseLens.
+
+normalize_data.py writes this SQLite file alongside its JSON output. It holds:
+
+    records        one row per normalized record: source, ordinal, the byte
+                   span of the record in its JSON file, the lowercase
+                   normalized address used as the join key, and the
+                   secondary keys view_data.py filters on (street name,
+                   ISO date, violation type, Yelp rating), each B-tree indexed
+    sources        size / mtime of each JSON file when it was indexed, so
+                   readers can tell whether the index is still current
+    address_cache  raw address → normalized address, so re-running the
+                   normalizer only sends never-seen addresses to usaddress
+
+view_data.py answers `matches` with a single indexed join instead of
+rebuilding the address dictionaries from both files on every run, and turns
+its --since/--until/--type/--street/--address/--min-rating options into
+index range scans (see RecordFilter) rather than full scans of the JSON.
+
+Usage:
+    python match_index.py           Rebuild the index from the normalized files
+    python match_index.py --check   Fail if the match join stops scaling linearly
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+
+import instrument
+from address_maps import street_key
+from json_records import dump_json_array, iter_json_array, read_span
+
+
+INDEX_FILE = "match_index.sqlite"
+
+YELP_SOURCE = "yelp"
+VIOLATIONS_SOURCE = "violations"
+
+# Bump whenever normalize_address() changes its output, so cached
+# normalizations from an older version are discarded instead of reused.
+NORMALIZER_VERSION = "1"
+
+# Bump whenever the records / sources layout changes. Both tables are derived
+# data, so an old index is simply dropped and rebuilt on the next write.
+SCHEMA_VERSION = "2"
+
+_SCHEMA = """
+create table if not exists meta (
+  key    text primary key,
+  value  text not null
+);
+
+create table if not exists sources (
+  name      text primary key,
+  path      text not null,
+  size      integer not null,
+  mtime_ns  integer not null
+);
+
+create table if not exists records (
+  source       text not null,
+  ordinal      integer not null,
+  offset       integer not null,
+  length       integer not null,
+  address_key  text not null,
+  street_key   text not null,
+  date_key     text,
+  type_key     text,
+  rating       real,
+  primary key (source, ordinal)
+) without rowid;
+
+create index if not exists idx_records_address on records (address_key, source);
+create index if not exists idx_records_street  on records (source, street_key);
+create index if not exists idx_records_date    on records (source, date_key);
+create index if not exists idx_records_type    on records (source, type_key, date_key);
+create index if not exists idx_records_rating  on records (source, rating);
+
+create table if not exists address_cache (
+  raw         text primary key,
+  normalized  text not null
+) without rowid;
+"""
+
+
+# ── Connection ─────────────────────────────────────────────────────────────────
+
+def open_index(path: str = INDEX_FILE) -> sqlite3.Connection:
+    """Open (creating if needed) the index database."""
+    conn = sqlite3.connect(path)
+    conn.execute("create table if not exists meta (key text primary key, value text not null)")
+    row = conn.execute("select value from meta where key = 'schema_version'").fetchone()
+    if row is None or row[0] != SCHEMA_VERSION:
+        with conn:
+            conn.execute("drop table if exists records")
+            conn.execute("drop table if exists sources")
+            conn.execute(
+                "insert or replace into meta (key, value) values ('schema_version', ?)",
+                (SCHEMA_VERSION,),
+            )
+    conn.executescript(_SCHEMA)
+    row = conn.execute(
+        "select value from meta where key = 'normalizer_version'"
+    ).fetchone()
+    if row is None or row[0] != NORMALIZER_VERSION:
+        with conn:
+            conn.execute("delete from address_cache")
+            conn.execute(
+                "insert or replace into meta (key, value) values ('normalizer_version', ?)",
+                (NORMALIZER_VERSION,),
+            )
+    return conn
+
+
+def open_existing_index(path: str = INDEX_FILE) -> sqlite3.Connection | None:
+    """Open the index read-only if it exists with the current schema, otherwise return None."""
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        row = conn.execute("select value from meta where key = 'schema_version'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row is None or row[0] != SCHEMA_VERSION:
+        conn.close()
+        return None
+    return conn
+
+
+# ── Secondary keys ─────────────────────────────────────────────────────────────
+
+_DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d", "%m-%d-%Y"]
+
+
+def date_key(value) -> str | None:
+    """Parse a violation date in any of the city's formats into ISO YYYY-MM-DD."""
+    text = str(value or "").strip()
+    # Drop a trailing time component ("2024-01-15T00:00:00", "1/15/2024 9:30 AM")
+    text = re.split(r"[T ]", text, maxsplit=1)[0]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def type_key(value) -> str | None:
+    """Case- and whitespace-insensitive key for a violation type."""
+    text = " ".join(str(value or "").split()).lower()
+    return text or None
+
+
+def rating_key(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _index_keys(rec: dict) -> tuple[str, str, str | None, str | None, float | None]:
+    """(address_key, street_key, date_key, type_key, rating) for one record."""
+    address = rec.get("normalized_address") or ""
+    return (
+        address.lower(),
+        street_key(address),
+        date_key(rec.get("date")),
+        type_key(rec.get("violation_type")),
+        rating_key(rec.get("star_rating")),
+    )
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with `prefix`."""
+    return prefix + "\U0010ffff"
+
+
+@dataclass(frozen=True)
+class RecordFilter:
+    """
+    Query predicates for view_data.py. Each one maps onto an indexed column,
+    so `where()` yields range / equality conditions SQLite can answer with
+    an index seek; `accepts()` evaluates the same predicates in Python for
+    the full-scan fallback.
+
+    Violation-only predicates (dates, types) are ignored for Yelp records and
+    the rating predicate is ignored for violations.
+    """
+    since: str | None = None            # ISO date, inclusive
+    until: str | None = None            # ISO date, inclusive
+    types: tuple[str, ...] = ()         # type_key() values
+    street: str | None = None           # query_key() street-name prefix
+    address: str | None = None          # query_key() normalized-address prefix
+    min_rating: float | None = None
+
+    def is_empty(self) -> bool:
+        return self == RecordFilter()
+
+    def where(self, source: str, alias: str = "records") -> tuple[str, list]:
+        """SQL conditions (joined with AND) and parameters for `source` rows."""
+        clauses = [f"{alias}.source = ?"]
+        params: list = [source]
+        if self.street:
+            clauses.append(f"{alias}.street_key >= ? and {alias}.street_key < ?")
+            params += [self.street, _prefix_upper_bound(self.street)]
+        if self.address:
+            clauses.append(f"{alias}.address_key >= ? and {alias}.address_key < ?")
+            params += [self.address, _prefix_upper_bound(self.address)]
+        if source == VIOLATIONS_SOURCE:
+            if self.since:
+                clauses.append(f"{alias}.date_key >= ?")
+                params.append(self.since)
+            if self.until:
+                clauses.append(f"{alias}.date_key <= ?")
+                params.append(self.until)
+            if self.types:
+                clauses.append(f"{alias}.type_key in ({','.join('?' * len(self.types))})")
+                params += list(self.types)
+        if source == YELP_SOURCE and self.min_rating is not None:
+            clauses.append(f"{alias}.rating >= ?")
+            params.append(self.min_rating)
+        return " and ".join(clauses), params
+
+    def accepts(self, source: str, rec: dict) -> bool:
+        address, street, date, vtype, rating = _index_keys(rec)
+        if self.street and not street.startswith(self.street):
+            return False
+        if self.address and not address.startswith(self.address):
+            return False
+        if source == VIOLATIONS_SOURCE:
+            if self.since and (date is None or date < self.since):
+                return False
+            if self.until and (date is None or date > self.until):
+                return False
+            if self.types and vtype not in self.types:
+                return False
+        if source == YELP_SOURCE and self.min_rating is not None:
+            if rating is None or rating < self.min_rating:
+                return False
+        return True
+
+
+# ── Address cache ──────────────────────────────────────────────────────────────
+
+def cached_addresses(conn: sqlite3.Connection, raw_addresses: Iterable[str]) -> dict[str, str]:
+    """Return the cached normalization for each raw address that has one."""
+    found: dict[str, str] = {}
+    batch: list[str] = []
+
+    def flush() -> None:
+        placeholders = ",".join("?" * len(batch))
+        found.update(conn.execute(
+            f"select raw, normalized from address_cache where raw in ({placeholders})",
+            batch,
+        ))
+        batch.clear()
+
+    for raw in set(raw_addresses):
+        batch.append(raw)
+        if len(batch) >= 500:
+            flush()
+    if batch:
+        flush()
+    return found
+
+
+def cache_addresses(conn: sqlite3.Connection, pairs: dict[str, str]) -> None:
+    """Remember raw → normalized address pairs for the next run."""
+    with conn:
+        conn.executemany(
+            "insert or replace into address_cache (raw, normalized) values (?, ?)",
+            pairs.items(),
+        )
+
+
+# ── Records ────────────────────────────────────────────────────────────────────
+
+def _file_stamp(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def save_indexed(
+    conn: sqlite3.Connection,
+    source: str,
+    records: list[dict],
+    path: str,
+) -> None:
+    """
+    Write `records` to `path` as a JSON array and index them under `source`.
+
+    Rows are upserted by ordinal and any ordinals past the end of the new
+    record list are dropped, so the index tracks the file as it grows.
+    """
+    with instrument.span("dump_json_array"):
+        spans = dump_json_array(records, path)
+    rows = (
+        (source, i, offset, length, *_index_keys(rec))
+        for i, (rec, (offset, length)) in enumerate(zip(records, spans))
+    )
+    size, mtime_ns = _file_stamp(path)
+    with conn:
+        conn.executemany(
+            "insert or replace into records "
+            "(source, ordinal, offset, length, address_key, street_key, date_key, type_key, rating) "
+            "values (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            "delete from records where source = ? and ordinal >= ?",
+            (source, len(records)),
+        )
+        conn.execute(
+            "insert or replace into sources (name, path, size, mtime_ns) values (?, ?, ?, ?)",
+            (source, path, size, mtime_ns),
+        )
+
+
+def is_current(conn: sqlite3.Connection, source: str, path: str) -> bool:
+    """True if `source` was indexed from `path` and the file hasn't changed since."""
+    row = conn.execute(
+        "select path, size, mtime_ns from sources where name = ?", (source,)
+    ).fetchone()
+    if row is None or not os.path.exists(path):
+        return False
+    return row[0] == path and tuple(row[1:]) == _file_stamp(path)
+
+
+# ── Queries ────────────────────────────────────────────────────────────────────
+
+def iter_filtered(
+    conn: sqlite3.Connection,
+    source: str,
+    path: str,
+    flt: RecordFilter,
+) -> Iterator[dict]:
+    """Yield the `source` records accepted by `flt`, in file order."""
+    where, params = flt.where(source)
+    cursor = conn.execute(
+        f"select offset, length from records where {where} order by ordinal",
+        params,
+    )
+    with open(path, "rb") as f:
+        for offset, length in cursor:
+            yield read_span(f, offset, length)
+
+
+def _matches_sql(flt: RecordFilter) -> tuple[str, list]:
+    """
+    FROM/WHERE tail shared by the match queries, with `flt` applied to both sides.
+
+    The violations side is pinned to idx_records_address: without ANALYZE
+    statistics SQLite otherwise walks every violation by primary key once
+    per distinct Yelp address, which is quadratic in practice.
+    """
+    yelp_where, yelp_params = flt.where(YELP_SOURCE, alias="yy")
+    viol_where, viol_params = flt.where(VIOLATIONS_SOURCE, alias="v")
+    sql = f"""
+  from records v indexed by idx_records_address
+  join (
+    select yy.address_key, max(yy.ordinal) as ordinal
+    from   records yy
+    where  {yelp_where} and yy.address_key != ''
+    group  by yy.address_key
+  ) latest on latest.address_key = v.address_key
+  join records y on y.source = ? and y.ordinal = latest.ordinal
+  where {viol_where}
+"""
+    return sql, [*yelp_params, YELP_SOURCE, *viol_params]
+
+
+_MATCH_COLUMNS = "select v.address_key, y.offset, y.length, v.offset, v.length"
+_MATCH_ORDER = "order by v.address_key, v.ordinal"
+
+
+def matched_addresses(conn: sqlite3.Connection, flt: RecordFilter = RecordFilter()) -> list[str]:
+    """Return the lowercase normalized addresses present in both datasets."""
+    tail, params = _matches_sql(flt)
+    return [
+        row[0] for row in conn.execute(
+            "select distinct v.address_key" + tail + "order by v.address_key",
+            params,
+        )
+    ]
+
+
+def iter_matches(
+    conn: sqlite3.Connection,
+    yelp_path: str,
+    violations_path: str,
+    flt: RecordFilter = RecordFilter(),
+) -> Iterator[tuple[str, dict, dict]]:
+    """
+    Yield (address_key, yelp_record, violation_record) for every violation
+    whose address also appears in the Yelp data, ordered by address.
+
+    When an address has several Yelp listings the last one wins, matching
+    the original dictionary-based join. Records are read by seeking to their
+    indexed byte span, so only matched records are ever decoded.
+    """
+    tail, params = _matches_sql(flt)
+    cursor = conn.execute(_MATCH_COLUMNS + tail + _MATCH_ORDER, params)
+    with open(yelp_path, "rb") as yf, open(violations_path, "rb") as vf:
+        last_yelp: tuple[int, dict] | None = None
+        for key, y_off, y_len, v_off, v_len in cursor:
+            if last_yelp is None or last_yelp[0] != y_off:
+                last_yelp = (y_off, read_span(yf, y_off, y_len))
+            yield key, last_yelp[1], read_span(vf, v_off, v_len)
+
+
+# ── Scale check ───────────────────────────────────────────────────────────────
+
+CHECK_SIZES = (20_000, 80_000)      # violations; Yelp listings are 1/20 of that
+CHECK_MAX_GROWTH = 2.0              # allowed time growth relative to data growth
+
+
+def _check_records(n_violations: int) -> tuple[list[dict], list[dict]]:
+    n_addresses = max(1, n_violations // 20)
+    address = [f"{100 + i} Sycamore Lane, Davis, CA 95616" for i in range(n_addresses)]
+    yelp = [{"property_name": f"Listing {i}", "normalized_address": a} for i, a in enumerate(address)]
+    violations = [
+        {"normalized_address": address[(i * 7919) % n_addresses], "date": "2024-01-01",
+         "violation_type": "Plumbing/Mold"}
+        for i in range(n_violations)
+    ]
+    return yelp, violations
+
+
+def uses_address_index(conn: sqlite3.Connection) -> bool:
+    """True if the match query seeks violations through idx_records_address."""
+    tail, params = _matches_sql(RecordFilter())
+    plan = [row[-1] for row in conn.execute(
+        "explain query plan " + _MATCH_COLUMNS + tail + _MATCH_ORDER, params,
+    )]
+    return any("idx_records_address" in step for step in plan if " v " in f" {step} ")
+
+
+def check_scaling(sizes: tuple[int, int] = CHECK_SIZES) -> bool:
+    """
+    Time the match join on two synthetic sizes. A linear join grows with the
+    data; the primary-key nested loop this guards against grows with its
+    square, so the ratio separates them clearly even on a noisy machine.
+    """
+    import tempfile
+
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            yelp, violations = _check_records(n)
+            conn = open_index(os.path.join(tmp, f"check_{n}.sqlite"))
+            yelp_path = os.path.join(tmp, f"yelp_{n}.json")
+            violations_path = os.path.join(tmp, f"violations_{n}.json")
+            save_indexed(conn, YELP_SOURCE, yelp, yelp_path)
+            save_indexed(conn, VIOLATIONS_SOURCE, violations, violations_path)
+            if not uses_address_index(conn):
+                print("  ✗ match query does not use idx_records_address")
+                conn.close()
+                return False
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                matched = sum(1 for _ in iter_matches(conn, yelp_path, violations_path))
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+            conn.close()
+            print(f"  • {n:>9,} violations: {matched:,} matches in {timings[-1] * 1000:.0f} ms")
+
+    growth = timings[1] / max(timings[0], 1e-9)
+    allowed = CHECK_MAX_GROWTH * sizes[1] / sizes[0]
+    if growth > allowed:
+        print(f"  ✗ {growth:.1f}× slower for {sizes[1] / sizes[0]:.0f}× the data (allowed {allowed:.0f}×)")
+        return False
+    print(f"  ✓ {growth:.1f}× the time for {sizes[1] / sizes[0]:.0f}× the data")
+    return True
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    from normalize_data import VIOLATIONS_OUTPUT, YELP_OUTPUT
+
+    if "--check" in sys.argv[1:]:
+        print("match_index.py — Match join scale check\n")
+        sys.exit(0 if check_scaling() else 1)
+
+    print("match_index.py — Rebuild the LeaseLens match index\n")
+    conn = open_index()
+    for source, path in [(YELP_SOURCE, YELP_OUTPUT), (VIOLATIONS_SOURCE, VIOLATIONS_OUTPUT)]:
+        try:
+            records = list(iter_json_array(path))
+        except FileNotFoundError:
+            print(f"  ⚠  {path} not found — skipping.")
+            continue
+        save_indexed(conn, source, records, path)
+        print(f"  ✓ Indexed {len(records)} {source} records from {path}")
+
+    print(f"\n✓ {len(matched_addresses(conn))} matched address(es) → {INDEX_FILE}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    instrument.run(main, "match_index")
@@ -0,0 +1,347 @@
+"""
+neighbors.py — Precompute each property's nearest lower-risk alternatives.
+
+For every property, finds the k closest other properties within --radius
+metres whose risk_score is lower, and stores them in `property_neighbors`
+via the apply_property_neighbors RPC, so the property screen can list
+"similar nearby properties" without a spatial query per tap (the live
+equivalent is the nearby_properties RPC). Lists depend on risk scores, so
+re-run after risk_score.py.
+
+Properties are projected to metres (equirectangular around their mean
+latitude, accurate to well under 1% at city scale) and put in a KD-tree;
+each query walks the tree nearest-first and skips subtrees that can't beat
+the current k-th distance, and leaves are scanned with NumPy. Reported
+distances are great-circle (geo.haversine_m).
+
+Usage:
+    python neighbors.py                        Properties from Supabase, write back
+    python neighbors.py --properties props.json --dry-run
+    python neighbors.py --k 5 --radius 1500 --any-risk
+    python neighbors.py --benchmark            100k synthetic properties
+
+Options:
+    --k N            Neighbours per property (default: 5)
+    --radius M       Maximum distance in metres (default: 2000)
+    --any-risk       Don't require a lower risk score
+    --output FILE    Also write the rows as JSON
+    --dry-run        Don't write to Supabase
+"""
+
+import argparse
+import heapq
+import json
+import math
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+import instrument
+from geo import METRES_PER_DEGREE_LAT, haversine_m, parse_point
+from json_records import iter_json_array
+
+
+DEFAULT_K = 5
+DEFAULT_RADIUS_M = 2000.0
+LEAF_SIZE = 32
+CANDIDATE_SLACK = 2         # extra tree candidates per query, re-checked with haversine
+WRITE_BATCH = 500           # properties per apply_property_neighbors call
+
+
+class Place(NamedTuple):
+    id: int
+    lon: float
+    lat: float
+    risk: float
+
+
+# ── KD-tree ────────────────────────────────────────────────────────────────────
+
+class KDTree:
+    """
+    Static 2-D KD-tree over points with a scalar value each (here: risk).
+
+    Nodes are contiguous slices of the reordered point arrays; every node
+    keeps its bounding box so a query can prune by the distance to the box.
+    """
+
+    def __init__(self, xy: np.ndarray, values: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.leaf_size = leaf_size
+        self.perm = np.arange(len(xy))
+        self._xy = np.asarray(xy, dtype=float)
+        self._lo: list[int] = []
+        self._hi: list[int] = []
+        self._children: list[tuple[int, int] | None] = []
+        self._boxes: list[tuple[float, float, float, float]] = []
+        if len(xy):
+            self._build(0, len(xy))
+        self.xy = self._xy[self.perm]
+        self.values = np.asarray(values, dtype=float)[self.perm]
+
+    def _build(self, lo: int, hi: int) -> int:
+        node = len(self._lo)
+        pts = self._xy[self.perm[lo:hi]]
+        mins, maxs = pts.min(axis=0), pts.max(axis=0)
+        self._lo.append(lo)
+        self._hi.append(hi)
+        self._boxes.append((mins[0], mins[1], maxs[0], maxs[1]))
+        self._children.append(None)
+        if hi - lo > self.leaf_size:
+            dim = int(np.argmax(maxs - mins))
+            mid = (hi - lo) // 2
+            part = np.argpartition(pts[:, dim], mid)
+            self.perm[lo:hi] = self.perm[lo:hi][part]
+            left = self._build(lo, lo + mid)
+            right = self._build(lo + mid, hi)
+            self._children[node] = (left, right)
+        return node
+
+    def _box_d2(self, node: int, x: float, y: float) -> float:
+        x0, y0, x1, y1 = self._boxes[node]
+        dx = x0 - x if x < x0 else (x - x1 if x > x1 else 0.0)
+        dy = y0 - y if y < y0 else (y - y1 if y > y1 else 0.0)
+        return dx * dx + dy * dy
+
+    def query(
+        self,
+        x: float,
+        y: float,
+        k: int,
+        max_dist: float = math.inf,
+        below: float | None = None,
+        exclude: int | None = None,
+    ) -> list[tuple[float, int]]:
+        """
+        Up to k nearest points as (distance, original index), nearest first.
+        `below` keeps only points whose value is strictly lower; `exclude`
+        drops one original index (the query point itself).
+        """
+        if not self._lo:
+            return []
+        best: list[tuple[float, int]] = []       # max-heap via negated d²
+        worst = max_dist * max_dist
+        stack = [(0.0, 0)]
+        while stack:
+            bound, node = stack.pop()
+            if bound > worst:
+                continue
+            children = self._children[node]
+            if children is None:
+                lo, hi = self._lo[node], self._hi[node]
+                d = self.xy[lo:hi] - (x, y)
+                d2 = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1]
+                keep = d2 <= worst
+                if below is not None:
+                    keep &= self.values[lo:hi] < below
+                for j in np.flatnonzero(keep):
+                    idx = int(self.perm[lo + j])
+                    if idx == exclude:
+                        continue
+                    item = (-float(d2[j]), idx)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+                    if len(best) == k:
+                        worst = -best[0][0]
+                continue
+            a, b = children
+            da, db = self._box_d2(a, x, y), self._box_d2(b, x, y)
+            # Push the farther child first so the nearer one is explored next.
+            if da <= db:
+                stack.append((db, b))
+                stack.append((da, a))
+            else:
+                stack.append((da, a))
+                stack.append((db, b))
+        return [(math.sqrt(-nd2), idx) for nd2, idx in sorted(best, reverse=True)]
+
+
+# ── Neighbours ─────────────────────────────────────────────────────────────────
+
+def project(places: list[Place]) -> np.ndarray:
+    """Equirectangular metres around the mean latitude."""
+    lon = np.array([p.lon for p in places], dtype=float)
+    lat = np.array([p.lat for p in places], dtype=float)
+    ref = math.radians(float(lat.mean())) if len(places) else 0.0
+    return np.column_stack((
+        lon * METRES_PER_DEGREE_LAT * math.cos(ref),
+        lat * METRES_PER_DEGREE_LAT,
+    ))
+
+
+def _projection_margin(places: list[Place]) -> float:
+    """
+    Factor by which projected distances can overstate great-circle ones:
+    east-west metres are scaled by cos(mean latitude), which is too much for
+    points nearer the pole. At least 1.01 so rounding never drops a point
+    just inside the radius.
+    """
+    if not places:
+        return 1.01
+    lat = np.array([p.lat for p in places], dtype=float)
+    ref = math.cos(math.radians(float(lat.mean())))
+    widest = math.cos(math.radians(float(np.abs(lat).max())))
+    return max(1.01, 1.01 * ref / widest) if widest > 0 else math.inf
+
+
+def nearest_neighbors(
+    places: list[Place],
+    k: int = DEFAULT_K,
+    radius_m: float = DEFAULT_RADIUS_M,
+    lower_risk_only: bool = True,
+) -> list[dict]:
+    """
+    property_neighbors rows for every place, nearest (great-circle) first.
+
+    The tree works in projected metres, so it is asked for CANDIDATE_SLACK
+    more points than needed within a radius widened by the projection error
+    (_projection_margin); candidates are
+    then re-measured with haversine_m, filtered to radius_m and only then cut
+    to k. If too many fall outside the radius the query is widened again, so
+    a property only gets fewer than k rows when fewer than k qualify.
+    """
+    xy = project(places)
+    tree = KDTree(xy, np.array([p.risk for p in places], dtype=float))
+    search_m = radius_m * _projection_margin(places)
+    rows = []
+    for i, place in enumerate(places):
+        want = k + CANDIDATE_SLACK
+        while True:
+            hits = tree.query(
+                xy[i, 0], xy[i, 1], want, search_m,
+                below=place.risk if lower_risk_only else None,
+                exclude=i,
+            )
+            kept = []
+            for _, j in hits:
+                other = places[j]
+                distance = haversine_m(place.lon, place.lat, other.lon, other.lat)
+                if distance <= radius_m:
+                    kept.append((distance, j))
+            if len(kept) >= k or len(hits) < want:
+                break
+            want *= 2
+        kept.sort()
+        for rank, (distance, j) in enumerate(kept[:k], 1):
+            rows.append({
+                "property_id": place.id,
+                "rank": rank,
+                "neighbor_id": places[j].id,
+                "distance_m": round(distance, 1),
+            })
+    return rows
+
+
+# ── I/O ────────────────────────────────────────────────────────────────────────
+
+def _place(row: dict) -> Place | None:
+    point = parse_point(row.get("location"))
+    if point is None and row.get("longitude") is not None and row.get("latitude") is not None:
+        point = (float(row["longitude"]), float(row["latitude"]))
+    if point is None:
+        return None
+    return Place(int(row["id"]), point[0], point[1], float(row.get("risk_score") or 0))
+
+
+def load_places_file(path: str) -> list[Place]:
+    return [p for p in map(_place, iter_json_array(path)) if p is not None]
+
+
+def load_places_remote() -> list[Place]:
+    from risk_score import fetch_all
+    return [p for p in map(_place, fetch_all("properties", "location,risk_score")) if p is not None]
+
+
+def write_rows(places: list[Place], rows: list[dict]) -> int:
+    """
+    Replace the stored lists WRITE_BATCH properties at a time; exits non-zero
+    on the first batch that fails.
+    """
+    from supabase_api import rpc_count
+    by_property: dict[int, list[dict]] = {}
+    for row in rows:
+        by_property.setdefault(row["property_id"], []).append(row)
+    ids = [p.id for p in places]
+    written = 0
+    for i in range(0, len(ids), WRITE_BATCH):
+        chunk = ids[i:i + WRITE_BATCH]
+        batch = [row for pid in chunk for row in by_property.get(pid, ())]
+        written += rpc_count("apply_property_neighbors", {"ids": chunk, "rows": batch})
+    return written
+
+
+def benchmark(n: int, k: int, radius_m: float, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    lon = rng.uniform(-121.81, -121.68, n)
+    lat = rng.uniform(38.52, 38.58, n)
+    risk = rng.uniform(0, 10, n).round(2)
+    places = [Place(i + 1, float(lon[i]), float(lat[i]), float(risk[i])) for i in range(n)]
+
+    start = time.perf_counter()
+    rows = nearest_neighbors(places, k, radius_m)
+    elapsed = time.perf_counter() - start
+    print(f"  • {n:,} properties, k={k}, radius {radius_m:.0f} m: "
+          f"{len(rows):,} neighbour rows in {elapsed:.2f}s ({n / elapsed:,.0f} properties/s)")
+
+    # Spot-check against brute force.
+    xy = project(places)
+    for i in rng.integers(0, n, 20):
+        d = np.hypot(*(xy - xy[i]).T)
+        ok = (risk < risk[i]) & (np.arange(n) != i) & (d <= radius_m)
+        expected = [places[j].id for j in np.flatnonzero(ok)[np.argsort(d[ok], kind="stable")][:k]]
+        got = [r["neighbor_id"] for r in rows if r["property_id"] == places[i].id]
+        if got != expected:
+            print(f"  ✗ property {places[i].id}: {got} ≠ brute force {expected}")
+            return
+    print("  ✓ matches brute force on 20 sampled properties")
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Precompute nearest lower-risk properties",
+    )
+    parser.add_argument("--properties", help="Properties JSON file (default: fetch from Supabase)")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="Neighbours per property")
+    parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS_M, help="Maximum distance in metres")
+    parser.add_argument("--any-risk", action="store_true", help="Don't require a lower risk score")
+    parser.add_argument("--output", help="Also write the rows as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="Don't write to Supabase")
+    parser.add_argument("--benchmark", action="store_true", help="Time synthetic properties instead")
+    parser.add_argument("--size", type=int, default=100_000, help="Benchmark properties")
+    args = parser.parse_args()
+
+    print("neighbors.py — Nearby lower-risk properties\n")
+    if args.benchmark:
+        benchmark(args.size, args.k, args.radius)
+        return
+
+    print("Loading properties…")
+    places = load_places_file(args.properties) if args.properties else load_places_remote()
+    print(f"  • {len(places)} properties with a location")
+    if not places:
+        sys.exit(1)
+
+    with instrument.span("neighbors"):
+        rows = nearest_neighbors(places, args.k, args.radius, not args.any_risk)
+    with_any = len({r["property_id"] for r in rows})
+    print(f"  • {len(rows)} neighbour rows; {with_any} of {len(places)} properties have at least one")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"  ✓ Saved {len(rows)} rows → {args.output}")
+
+    if not args.dry_run:
+        written = write_rows(places, rows)
+        print(f"  ✓ apply_property_neighbors wrote {written} row(s)")
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "neighbors")
@@ -5,63 +5,32 @@ Uses the `usaddress` library to parse raw address strings into components,
 expands common abbreviations, and reassembles each address into a canonical
 form so that records from different sources can be matched by address.
 
+Duplicate listings and repeated violation cases are then collapsed into one
+canonical record each (see dedupe.py) before saving and cross-matching, and
+violations get a `violation_category` / `violation_severity` from
+violation_classifier.py.
+
+Output is indexed in match_index.sqlite (see match_index.py), which also
+caches every raw → normalized address so re-runs only parse new addresses.
+
 Canonical format:
     {AddressNumber} {StreetName} {StreetSuffix}, {Unit}, {City}, {State} {Zip}
 """
 
 import json
 import re
+import sqlite3
 import sys
 from collections import OrderedDict
 
 import usaddress
 
+import dedupe
+import instrument
+import match_index
+import violation_classifier
+from address_maps import DIRECTIONAL_MAP, OCCUPANCY_MAP, STREET_SUFFIX_MAP
 
-# ── Abbreviation expansion map ─────────────────────────────────────────────────
-# Covers USPS Publication 28 standard abbreviations.
-STREET_SUFFIX_MAP: dict[str, str] = {
-    "st": "Street",
-    "str": "Street",
-    "ave": "Avenue",
-    "av": "Avenue",
-    "blvd": "Boulevard",
-    "bvd": "Boulevard",
-    "cir": "Circle",
-    "ct": "Court",
-    "dr": "Drive",
-    "drv": "Drive",
-    "hwy": "Highway",
-    "ln": "Lane",
-    "pkwy": "Parkway",
-    "pl": "Place",
-    "plz": "Plaza",
-    "rd": "Road",
-    "sq": "Square",
-    "ter": "Terrace",
-    "trl": "Trail",
-    "way": "Way",
-}
-
-DIRECTIONAL_MAP: dict[str, str] = {
-    "n": "North",
-    "s": "South",
-    "e": "East",
-    "w": "West",
-    "ne": "Northeast",
-    "nw": "Northwest",
-    "se": "Southeast",
-    "sw": "Southwest",
-}
-
-OCCUPANCY_MAP: dict[str, str] = {
-    "apt": "Apartment",
-    "ste": "Suite",
-    "bldg": "Building",
-    "fl": "Floor",
-    "rm": "Room",
-    "unit": "Unit",
-    "#": "Unit",
-}
 
 # File paths (defaults — can be overridden via CLI)
 YELP_INPUT = "yelp_data.json"
@@ -99,7 +68,8 @@ def normalize_address(raw_address: str) -> str:
     try:
         tagged: OrderedDict
         addr_type: str
-        tagged, addr_type = usaddress.tag(raw_address)
+        with instrument.span("usaddress.tag"):
+            tagged, addr_type = usaddress.tag(raw_address)
     except usaddress.RepeatedLabelError:
         # Ambiguous parse — return a best-effort cleaned version
         return raw_address.title()
@@ -143,14 +113,39 @@ def normalize_address(raw_address: str) -> str:
     return ", ".join(parts)
 
 
-def normalize_records(records: list[dict], address_key: str = "address") -> list[dict]:
-    """Add a 'normalized_address' field to each record."""
+def normalize_records(
+    records: list[dict],
+    address_key: str = "address",
+    memo: dict[str, str] | None = None,
+) -> list[dict]:
+    """
+    Add a 'normalized_address' field to each record.
+
+    `memo` maps raw → normalized addresses. Raw addresses already in it skip
+    the usaddress parse, and new results are added to it, so repeated
+    addresses (and addresses seen on a previous run) are parsed only once.
+    """
+    if memo is None:
+        memo = {}
     for rec in records:
         raw = rec.get(address_key, "") or ""
-        rec["normalized_address"] = normalize_address(raw)
+        normalized = memo.get(raw)
+        if normalized is None:
+            normalized = memo[raw] = normalize_address(raw)
+            instrument.count("addresses_parsed")
+        rec["normalized_address"] = normalized
+    instrument.count("records_normalized", len(records))
     return records
 
 
+def deduplicate(records: list[dict], rule: dedupe.Rule) -> list[dict]:
+    """Collapse duplicate records (see dedupe.py) and report how many merged."""
+    merged = dedupe.resolve(records, rule)
+    if len(merged) < len(records):
+        print(f"    Merged {len(records) - len(merged)} duplicate record(s) → {len(merged)} unique")
+    return merged
+
+
 def find_address_matches(
     yelp_records: list[dict],
     violation_records: list[dict],
@@ -179,24 +174,40 @@ def save_json(data: list[dict], path: str) -> None:
     print(f"  ✓ Saved {len(data)} records → {path}")
 
 
+def save_indexed_json(conn: sqlite3.Connection, source: str, data: list[dict], path: str) -> None:
+    """Save `data` like save_json() and record its layout in the match index."""
+    with instrument.span("save_indexed_json"):
+        match_index.save_indexed(conn, source, data, path)
+    print(f"  ✓ Saved {len(data)} records → {path} (indexed)")
+
+
 def main() -> None:
     print("normalize_data.py — Address normalization for LeaseLens\n")
 
     # ── Load datasets ──────────────────────────────────────────────────────
     print("Loading datasets…")
-    yelp = load_json(YELP_INPUT)
-    violations = load_json(VIOLATIONS_INPUT)
+    with instrument.span("load_json"):
+        yelp = load_json(YELP_INPUT)
+        violations = load_json(VIOLATIONS_INPUT)
 
     if not yelp and not violations:
         print("\n⚠  No data files found. Run scrape_yelp.py and/or "
               "ingest_city_data.py first.")
         sys.exit(1)
 
+    # ── Reuse normalizations from previous runs ───────────────────────────
+    conn = match_index.open_index()
+    raw_addresses = [r.get("address", "") or "" for r in yelp + violations]
+    memo = match_index.cached_addresses(conn, raw_addresses)
+    previously_cached = set(memo)
+    print(f"  • {len(memo)} distinct address(es) already normalized in {match_index.INDEX_FILE}")
+
     # ── Normalize ──────────────────────────────────────────────────────────
     print("\nNormalizing Yelp addresses…")
     if yelp:
-        yelp = normalize_records(yelp, address_key="address")
-        save_json(yelp, YELP_OUTPUT)
+        yelp = normalize_records(yelp, address_key="address", memo=memo)
+        yelp = deduplicate(yelp, dedupe.YELP)
+        save_indexed_json(conn, match_index.YELP_SOURCE, yelp, YELP_OUTPUT)
 
         # Show a sample
         sample = yelp[0]
@@ -204,15 +215,21 @@ def main() -> None:
 
     print("\nNormalizing violation addresses…")
     if violations:
-        violations = normalize_records(violations, address_key="address")
-        save_json(violations, VIOLATIONS_OUTPUT)
+        violations = normalize_records(violations, address_key="address", memo=memo)
+        violations = deduplicate(violations, dedupe.VIOLATIONS)
+        violations = violation_classifier.classify_records(violations)
+        save_indexed_json(conn, match_index.VIOLATIONS_SOURCE, violations, VIOLATIONS_OUTPUT)
 
         sample = violations[0]
         print(f"    Example: '{sample.get('address')}' → '{sample['normalized_address']}'")
 
+    match_index.cache_addresses(
+        conn, {raw: n for raw, n in memo.items() if raw not in previously_cached}
+    )
+
     # ── Cross-match ────────────────────────────────────────────────────────
     if yelp and violations:
-        matches = find_address_matches(yelp, violations)
+        matches = match_index.matched_addresses(conn)
         print(f"\n✓ {len(matches)} address(es) found in BOTH datasets:")
         for addr in matches[:20]:
             print(f"    • {addr}")
@@ -221,8 +238,9 @@ def main() -> None:
     else:
         print("\n(Cross-matching skipped — need both datasets loaded.)")
 
+    conn.close()
     print("\nDone.")
 
 
 if __name__ == "__main__":
-    main()
+    instrument.run(main, "normalize_data")
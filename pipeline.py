@@ -0,0 +1,371 @@
+"""
+pipeline.py — Run the LeaseLens data pipeline as a cached dependency graph.
+
+Each stage is one of the existing scripts, with its input and output files
+declared:
+
+    scrape      scrape_yelp.py        → yelp_data.json (needs Playwright; only when named)
+    ingest      ingest_city_data.py   davis_code_violations.csv → city_violations_clean.json
+    normalize   normalize_data.py     both of the above → normalized_*.json, match_index.sqlite
+    report      view_data.py report   normalized_*.json → violation_report.json
+    sql         generate_sql.py       → seed_new_properties.sql
+    seed        seed_properties.py    (writes to Supabase; only when named)
+
+normalize reads whatever yelp_data.json is on disk, so a default run works
+without Playwright; name `scrape` to refresh it first (normalize then waits
+for it).
+
+A stage is skipped when the content hashes of its inputs, its command line,
+and its outputs all match the last successful run recorded in
+.pipeline_state.json. A stage's inputs include its script and every
+project module that script imports, directly or through other project
+modules (found by parsing the imports, so the lists can't go stale).
+Stages whose dependencies are finished run concurrently (ingest and sql,
+report and sql), so a refresh only does the work that actually changed.
+Every stage's output is written to pipeline_logs/<stage>.log, along with
+the script's instrument.py metrics (<script>.json / .prom), and per-stage
+timings are printed at the end.
+
+Usage:
+    python pipeline.py                     Run every default stage that is stale
+    python pipeline.py report              Just what `report` needs
+    python pipeline.py scrape normalize    Re-scrape Yelp, then re-normalize
+    python pipeline.py --force normalize   Re-run normalize (and what it feeds)
+    python pipeline.py --dry-run           Show what would run
+
+Options:
+    --violations-csv PATH   City CSV for the ingest stage
+                            (default: davis_code_violations.csv)
+    --workers N             Stages run at once (default: 4)
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import instrument
+
+
+STATE_FILE = ".pipeline_state.json"
+LOG_DIR = "pipeline_logs"
+DEFAULT_CSV = "davis_code_violations.csv"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    command: tuple[str, ...]            # script + arguments, run with this interpreter
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    deps: tuple[str, ...] = ()
+    after: tuple[str, ...] = ()         # run after these if they are in the plan, but don't pull them in
+    stdout: str | None = None           # capture the command's stdout into this file
+    default: bool = True                # part of a plain `python pipeline.py` run
+
+
+@dataclass
+class Result:
+    status: str                         # "ran" | "skipped" | "failed" | "blocked"
+    seconds: float = 0.0
+    detail: str = ""
+    fingerprint: dict = field(default_factory=dict)
+
+
+def code_inputs(script: str) -> tuple[str, ...]:
+    """The script plus every project module it imports, transitively (sorted)."""
+    found: set[str] = set()
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except FileNotFoundError:
+            continue            # reported as a missing input when the stage runs
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = name.split(".")[0] + ".py"
+                if os.path.exists(module):
+                    pending.append(module)
+    return tuple(sorted(found))
+
+
+def build_stages(violations_csv: str) -> dict[str, Stage]:
+    stages = [
+        Stage(
+            "scrape",
+            ("scrape_yelp.py",),
+            inputs=code_inputs("scrape_yelp.py"),
+            outputs=("yelp_data.json",),
+            default=False,
+        ),
+        Stage(
+            "ingest",
+            ("ingest_city_data.py", violations_csv),
+            inputs=(*code_inputs("ingest_city_data.py"), violations_csv),
+            outputs=("city_violations_clean.json",),
+        ),
+        Stage(
+            "normalize",
+            ("normalize_data.py",),
+            inputs=(*code_inputs("normalize_data.py"), "yelp_data.json", "city_violations_clean.json"),
+            outputs=("normalized_yelp.json", "normalized_violations.json", "match_index.sqlite"),
+            deps=("ingest",),
+            after=("scrape",),
+        ),
+        Stage(
+            "report",
+            ("view_data.py", "report", "--format", "json"),
+            inputs=(*code_inputs("view_data.py"), "normalized_yelp.json", "normalized_violations.json"),
+            outputs=("violation_report.json",),
+            deps=("normalize",),
+            stdout="violation_report.json",
+        ),
+        Stage(
+            "sql",
+            ("generate_sql.py",),
+            inputs=code_inputs("generate_sql.py"),
+            outputs=("seed_new_properties.sql",),
+        ),
+        Stage(
+            "seed",
+            ("seed_properties.py",),
+            inputs=code_inputs("seed_properties.py"),
+            default=False,
+        ),
+    ]
+    return {s.name: s for s in stages}
+
+
+# ── Hashing / state ────────────────────────────────────────────────────────────
+
+def file_hash(path: str) -> str | None:
+    """SHA-256 of a file's contents, or None if it doesn't exist."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+def fingerprint(stage: Stage) -> dict:
+    return {
+        "command": list(stage.command),
+        "inputs": {path: file_hash(path) for path in stage.inputs},
+    }
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state: dict) -> None:
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def is_fresh(stage: Stage, state: dict) -> bool:
+    """True if the last successful run had the same inputs and its outputs are untouched."""
+    last = state.get(stage.name)
+    if last is None or last.get("fingerprint") != fingerprint(stage):
+        return False
+    return all(file_hash(path) == digest for path, digest in last.get("outputs", {}).items())
+
+
+# ── Planning ───────────────────────────────────────────────────────────────────
+
+def closure(stages: dict[str, Stage], targets: list[str]) -> list[str]:
+    """Targets plus everything they depend on, in dependency order."""
+    order: list[str] = []
+    visiting: set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"dependency cycle at stage '{name}'")
+        visiting.add(name)
+        for dep in stages[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in targets:
+        visit(name)
+    return order
+
+
+def downstream(stages: dict[str, Stage], roots: set[str]) -> set[str]:
+    """Roots plus every stage that (transitively) depends on one of them."""
+    found = set(roots)
+    changed = True
+    while changed:
+        changed = False
+        for stage in stages.values():
+            if stage.name not in found and found.intersection((*stage.deps, *stage.after)):
+                found.add(stage.name)
+                changed = True
+    return found
+
+
+# ── Execution ──────────────────────────────────────────────────────────────────
+
+def run_stage(stage: Stage) -> Result:
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{stage.name}.log")
+    fp = fingerprint(stage)
+    missing = [path for path, digest in fp["inputs"].items() if digest is None]
+    if missing:
+        return Result("failed", detail=f"missing input(s): {', '.join(missing)}")
+
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        out = open(stage.stdout, "w", encoding="utf-8") if stage.stdout else log
+        try:
+            proc = subprocess.run(
+                [sys.executable, *stage.command],
+                stdout=out,
+                stderr=log,
+                stdin=subprocess.DEVNULL,
+                env={**os.environ, "PYTHONUNBUFFERED": "1", instrument.METRICS_ENV: LOG_DIR},
+            )
+        finally:
+            if stage.stdout:
+                out.close()
+    seconds = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        return Result("failed", seconds, f"exit {proc.returncode}, see {log_path}")
+    absent = [path for path in stage.outputs if not os.path.exists(path)]
+    if absent:
+        return Result("failed", seconds, f"did not produce {', '.join(absent)}")
+    return Result("ran", seconds, fingerprint=fp)
+
+
+def execute(
+    stages: dict[str, Stage],
+    plan: list[str],
+    forced: set[str],
+    workers: int,
+    dry_run: bool,
+) -> dict[str, Result]:
+    state = load_state()
+    results: dict[str, Result] = {}
+    pending = list(plan)
+    running: dict[Future, str] = {}
+
+    def ready(name: str) -> bool:
+        return all(dep in results for dep in (*stages[name].deps, *stages[name].after) if dep in plan)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in [n for n in pending if ready(n)]:
+                pending.remove(name)
+                stage = stages[name]
+                failed_deps = [d for d in (*stage.deps, *stage.after)
+                               if results.get(d, Result("ran")).status in ("failed", "blocked")]
+                if failed_deps:
+                    results[name] = Result("blocked", detail=f"after {', '.join(failed_deps)}")
+                    print(f"  ✗ {name:<10} blocked ({results[name].detail})")
+                elif name not in forced and is_fresh(stage, state):
+                    results[name] = Result("skipped", detail="inputs unchanged")
+                    print(f"  • {name:<10} up to date")
+                elif dry_run:
+                    # Downstream stages can't be judged before this one runs; assume they will too.
+                    results[name] = Result("ran", detail="would run")
+                    forced |= downstream(stages, {name})
+                    print(f"  • {name:<10} would run")
+                else:
+                    print(f"  … {name:<10} started")
+                    running[pool.submit(run_stage, stage)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result = future.result()
+                results[name] = result
+                if result.status == "ran":
+                    state[name] = {
+                        "fingerprint": result.fingerprint,
+                        "outputs": {path: file_hash(path) for path in stages[name].outputs},
+                        "seconds": round(result.seconds, 3),
+                        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    }
+                    save_state(state)
+                    print(f"  ✓ {name:<10} done in {result.seconds:.2f}s")
+                else:
+                    print(f"  ✗ {name:<10} failed after {result.seconds:.2f}s ({result.detail})")
+    return results
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Run the data pipeline, skipping unchanged stages",
+    )
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all default stages)")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                        help="Re-run STAGE even if its inputs are unchanged (repeatable; 'all' for every stage)")
+    parser.add_argument("--violations-csv", default=DEFAULT_CSV,
+                        help=f"City violations CSV (default: {DEFAULT_CSV})")
+    parser.add_argument("--workers", type=int, default=4, help="Stages run at once (default: 4)")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would run without running it")
+    args = parser.parse_args()
+
+    stages = build_stages(args.violations_csv)
+    unknown = [n for n in [*args.targets, *args.force] if n not in stages and n != "all"]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(stages)})")
+
+    targets = args.targets or [s.name for s in stages.values() if s.default]
+    plan = closure(stages, targets)
+    forced = downstream(stages, set(plan) if "all" in args.force else set(args.force))
+
+    print("pipeline.py — LeaseLens pipeline\n")
+    print(f"Plan: {' → '.join(plan)}\n")
+
+    start = time.perf_counter()
+    results = execute(stages, plan, forced, max(1, args.workers), args.dry_run)
+    wall = time.perf_counter() - start
+
+    print(f"\n{'stage':<10} {'status':<8} {'seconds':>8}")
+    print("─" * 28)
+    for name in plan:
+        r = results[name]
+        print(f"{name:<10} {r.status:<8} {r.seconds:>8.2f}")
+    busy = sum(r.seconds for r in results.values())
+    print("─" * 28)
+    print(f"{'total':<10} {'':<8} {wall:>8.2f}  (stage time {busy:.2f}s)")
+
+    if any(r.status in ("failed", "blocked") for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    instrument.run(main, "pipeline")
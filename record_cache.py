@@ -0,0 +1,461 @@
+"""
+record_cache.py — Memory-mapped binary sidecars for the normalized JSON files.
+
+Parsing normalized_yelp.json / normalized_violations.json dominates
+view_data.py's startup, and the files rarely change between views. This
+module compiles each file once into `<file>.rcache` and maps it with mmap:
+
+    header    magic, version, record / column / value counts, section
+              offsets, and the source's size, mtime and BLAKE2 hash
+    columns   field names, in first-seen order (JSON)
+    cells     uint32 matrix (native byte order), one row per record, one
+              column per field: index into the value table, 0 = absent
+    offsets   uint64 (start, end) of every value in the blob
+    blob      a JSON array holding every distinct scalar once (addresses,
+              types, dates and ratings repeat a lot, so this is much
+              smaller than the pretty-printed source) and every list /
+              dict value separately
+
+Records come back with their fields in column order. The normalized files
+write every record with the same keys in the same order, so they round-trip
+exactly; in a file whose records order their keys differently, a record's
+fields follow the order in which each key first appeared in the file (the
+same fields and values, but serialising it may not give back the same bytes).
+
+Reading record i touches one row of cells and the values it points to, so
+a view that prints 20 rows pages in a few KB however big the file is.
+Iteration goes a block of records at a time (FIRST_BLOCK, doubling up to
+BLOCK): the values a block introduces are one contiguous slice of the blob,
+decoded with a single json.loads, and values it repeats from earlier blocks
+come from a table of at most about MEMO_LIMIT decoded values, so a full
+scan costs about one parse of the blob while holding only a bounded part
+of it. A sidecar is current while the source's size and mtime match; if only
+the mtime moved (a touch, a copy) the content hash is compared and the stamp
+refreshed instead of rebuilding.
+
+view_data.py imports this module at startup, so it sticks to cheap standard
+library imports (array / memoryview over the mmap, no NumPy) and defers the
+rest to the functions that need them.
+
+Set LEASELENS_RECORD_CACHE=off to read the JSON files directly.
+
+Usage:
+    python record_cache.py                  Build / refresh both sidecars
+    python record_cache.py --benchmark      view_data.py runs: JSON vs. cold vs. warm
+    python record_cache.py --benchmark --size 500000
+
+Options:
+    --size N     Benchmark records (default: 200000)
+    --rows N     Rows the benchmark's `violations` view prints (default: 20)
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Iterator
+from json.encoder import encode_basestring as _encode_str
+
+import instrument
+from json_records import dump_json_array, iter_json_array
+
+
+SUFFIX = ".rcache"
+MAGIC = b"LLRCACHE"
+VERSION = 1
+CACHE_ENV = "LEASELENS_RECORD_CACHE"       # "off" → iter_cached reads the JSON
+
+# magic, version, records, columns, values, columns_off, cells_off,
+# offsets_off, blob_off, source size, source mtime_ns, source hash
+_HEADER = struct.Struct("<8sIQIQQQQQQq16s")
+_ALIGN = 8
+FIRST_BLOCK = 32            # records decoded before the first yield
+BLOCK = 4096                # records per decode once a scan is under way
+MEMO_LIMIT = 1 << 16        # decoded values a scan keeps between blocks
+
+_ABSENT = object()          # value of id 0 while a block is assembled
+
+
+def sidecar_path(path: str) -> str:
+    return path + SUFFIX
+
+
+def _source_hash(path: str) -> bytes:
+    import hashlib      # only needed to build or re-validate; keeps view startup lean
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def _encode(value) -> bytes:
+    if value.__class__ is str:
+        return _encode_str(value).encode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _pad(n: int) -> int:
+    return -n % _ALIGN
+
+
+# ── Build ──────────────────────────────────────────────────────────────────────
+
+def build(path: str, out: str | None = None) -> int:
+    """Compile the JSON array at `path` into its sidecar; returns the record count."""
+    out = out or sidecar_path(path)
+    st = os.stat(path)
+    digest = _source_hash(path)
+
+    columns: dict[str, int] = {}
+    cells: list[list[int]] = []            # one list of value ids per column
+    interned: dict = {}
+    values: list[bytes] = [b"null"]        # id 0 = absent
+    n = 0
+    for rec in iter_json_array(path):
+        for field, value in rec.items():
+            col = columns.get(field)
+            if col is None:
+                col = columns[field] = len(cells)
+                cells.append([0] * n)
+            # Scalars intern by value (type included, so 1 / 1.0 / True stay
+            # apart). Lists and dicts are stored once per record, so no two
+            # records ever share a mutable value.
+            cls = value.__class__
+            if cls is list or cls is dict:
+                vid = len(values)
+                values.append(_encode(value))
+            else:
+                vid = interned.get((cls, value))
+                if vid is None:
+                    vid = interned[(cls, value)] = len(values)
+                    values.append(_encode(value))
+            column = cells[col]
+            if len(column) < n:
+                column.extend([0] * (n - len(column)))
+            column.append(vid)
+        n += 1
+    for column in cells:
+        column.extend([0] * (n - len(column)))
+
+    # Row-major: record i's value ids are matrix[i * len(cells):(i + 1) * len(cells)].
+    matrix = array("I", bytes(4 * n * len(cells)))
+    for col, column in enumerate(cells):
+        matrix[col::len(cells)] = array("I", column)
+    del cells
+    # The blob is "[v0,v1,…]", so every value is addressable on its own.
+    offsets = array("Q")
+    pos = 1
+    for v in values:
+        offsets.append(pos)
+        offsets.append(pos + len(v))
+        pos += len(v) + 1
+    names = json.dumps(list(columns), ensure_ascii=False).encode("utf-8")
+
+    columns_off = _HEADER.size
+    matrix_bytes = matrix.itemsize * len(matrix)
+    cells_off = columns_off + len(names) + _pad(columns_off + len(names))
+    offsets_off = cells_off + matrix_bytes + _pad(cells_off + matrix_bytes)
+    blob_off = offsets_off + offsets.itemsize * len(offsets)
+    header = _HEADER.pack(
+        MAGIC, VERSION, n, len(columns), len(values),
+        columns_off, cells_off, offsets_off, blob_off,
+        st.st_size, st.st_mtime_ns, digest,
+    )
+
+    import tempfile     # only needed to build; keeps view startup lean
+
+    # A private temp file per build, so two processes refreshing the same
+    # sidecar at once each rename a complete file instead of interleaving
+    # writes into one shared `.tmp`.
+    fd, tmp = tempfile.mkstemp(
+        prefix=os.path.basename(out) + ".", suffix=".tmp", dir=os.path.dirname(out) or ".",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(names)
+            f.write(b"\0" * (cells_off - columns_off - len(names)))
+            f.write(matrix.tobytes())
+            f.write(b"\0" * (offsets_off - cells_off - matrix_bytes))
+            f.write(offsets.tobytes())
+            f.write(b"[")
+            f.write(b",".join(values))
+            f.write(b"]")
+        os.chmod(tmp, st.st_mode & 0o666)      # mkstemp makes it owner-only
+        os.replace(tmp, out)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return n
+
+
+# ── Read ───────────────────────────────────────────────────────────────────────
+
+class RecordCache:
+    """Read-only, memory-mapped view of one sidecar."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, n, n_cols, n_values, columns_off, cells_off,
+         offsets_off, blob_off, *self.stamp) = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version-{VERSION} record cache")
+        self.columns: list[str] = json.loads(self._mm[columns_off:cells_off].rstrip(b"\0"))
+        self._n = n
+        self._width = n_cols
+        view = memoryview(self._mm)
+        self._cells = view[cells_off:cells_off + 4 * n * n_cols].cast("I")
+        self._offsets = view[offsets_off:offsets_off + 16 * n_values].cast("Q")
+        view.release()
+        self._blob_off = blob_off
+        self._memo: dict[int, object] = {}
+
+    def __len__(self) -> int:
+        return self._n
+
+    def close(self) -> None:
+        # Release the views first; mmap refuses to close while they exist.
+        self._cells.release()
+        self._offsets.release()
+        self._mm.close()
+
+    def _span(self, vid: int) -> tuple[int, int]:
+        return self._blob_off + self._offsets[2 * vid], self._blob_off + self._offsets[2 * vid + 1]
+
+    def value(self, vid: int):
+        try:
+            return self._memo[vid]
+        except KeyError:
+            pass
+        start, end = self._span(vid)
+        value = json.loads(self._mm[start:end])
+        if not isinstance(value, (list, dict)):      # callers may mutate containers
+            self._memo[vid] = value
+        return value
+
+    def _row(self, i: int) -> list[int]:
+        return self._cells[i * self._width:(i + 1) * self._width].tolist()
+
+    def record(self, i: int) -> dict:
+        return {name: self.value(vid) for name, vid in zip(self.columns, self._row(i)) if vid}
+
+    def __iter__(self) -> Iterator[dict]:
+        columns, width, mm, offsets = self.columns, self._width, self._mm, self._offsets
+        if not width:                                 # every record was {}
+            yield from ({} for _ in range(self._n))
+            return
+        # build() numbers values in record order, so the values a block sees
+        # for the first time are the contiguous ids (decoded, top] — one slice
+        # of the blob, already comma-separated. Everything decoded goes into
+        # `known`, which is reset once it passes MEMO_LIMIT entries; repeats
+        # of values decoded before a reset are fetched again in one batch.
+        known: dict[int, object] = {0: _ABSENT}
+        decoded = 0
+        start, size = 0, FIRST_BLOCK
+        while start < self._n:
+            stop = min(self._n, start + size)
+            vids = self._cells[start * width:stop * width].tolist()
+            if len(known) > MEMO_LIMIT:
+                known = {0: _ABSENT}
+            top = max(vids)
+            if top > decoded:
+                a, b = self._blob_off + offsets[2 * (decoded + 1)], self._blob_off + offsets[2 * top + 1]
+                known.update(zip(range(decoded + 1, top + 1), json.loads(b"[" + mm[a:b] + b"]")))
+                decoded = top
+            missing = sorted(set(vids).difference(known))
+            if missing:
+                spans = [self._span(vid) for vid in missing]
+                known.update(zip(missing, json.loads(b"[" + b",".join([mm[a:b] for a, b in spans]) + b"]")))
+            fields = [list(map(known.__getitem__, vids[c::width])) for c in range(width)]
+            for row in zip(*fields):
+                if _ABSENT in row:
+                    yield {name: v for name, v in zip(columns, row) if v is not _ABSENT}
+                else:
+                    yield dict(zip(columns, row))
+            start, size = stop, min(BLOCK, size * 2)
+
+    def column(self, name: str) -> list:
+        """One field of every record (None where absent), without building dicts."""
+        vids = self._cells[self.columns.index(name)::self._width].tolist()
+        return [self.value(v) if v else None for v in vids]
+
+
+def _restamp(sidecar: str, mtime_ns: int) -> None:
+    """Record the source's new mtime after a hash match, so the next open is cheap."""
+    with open(sidecar, "r+b") as f:
+        f.seek(_HEADER.size - 16 - 8)
+        f.write(struct.pack("<q", mtime_ns))
+
+
+def open_cache(path: str, rebuild: bool = True) -> RecordCache | None:
+    """
+    The mapped sidecar for `path`, (re)building it if it is missing or stale
+    and `rebuild` is set. None if `path` doesn't exist or the sidecar can't
+    be written (e.g. a read-only directory) — callers fall back to the JSON.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    sidecar = sidecar_path(path)
+    try:
+        cache = RecordCache(sidecar)
+    except (OSError, ValueError, struct.error):
+        cache = None
+    if cache is not None:
+        size, mtime_ns, digest = cache.stamp
+        if (size, mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return cache
+        if size == st.st_size and digest == _source_hash(path):
+            try:
+                _restamp(sidecar, st.st_mtime_ns)
+            except OSError:
+                pass
+            return cache
+        cache.close()
+    if not rebuild:
+        return None
+    try:
+        with instrument.span("record_cache.build"):
+            build(path, sidecar)
+    except OSError:
+        return None
+    return RecordCache(sidecar)
+
+
+def iter_cached(path: str) -> Iterator[dict]:
+    """Records of `path`, through its sidecar when possible (and not disabled)."""
+    cache = None if os.environ.get(CACHE_ENV) == "off" else open_cache(path)
+    if cache is None:
+        yield from iter_json_array(path)
+        return
+    try:
+        yield from cache
+    finally:
+        cache.close()
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+def _synthetic(n: int, seed: int = 7) -> Iterator[dict]:
+    import random
+    from datetime import date, timedelta
+
+    rng = random.Random(seed)
+    streets = ["Sycamore Ln", "Russell Blvd", "Anderson Rd", "Alvarado Ave", "J St", "Olive Dr"]
+    types = ["Plumbing/Mold", "Pest Infestation", "Electrical Hazard", "Noise Complaint",
+             "Sanitation Issue", "Fire Safety Violation"]
+    base = date(2015, 1, 1)
+    for i in range(n):
+        street = f"{rng.randint(100, 1999)} {rng.choice(streets)}"
+        yield {
+            "case_number": f"CE-{i:07d}",
+            "address": street,
+            "normalized_address": f"{street}, Davis, CA 95616",
+            "violation_type": rng.choice(types),
+            "status": "Open" if i % 3 == 0 else "Closed",
+            "date": (base + timedelta(days=rng.randrange(3650))).isoformat(),
+        }
+
+
+def _run_view(workdir: str, args: list[str], env: dict[str, str]) -> tuple[float, float]:
+    """Wall seconds and peak RSS (MB) of one `python view_data.py …` process."""
+    import subprocess
+
+    metrics = os.path.join(workdir, "metrics")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "view_data.py"), *args],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        env={**os.environ, **env, instrument.METRICS_ENV: metrics},
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        print(proc.stderr.rstrip(), file=sys.stderr)
+        print(f"  ✗ view_data.py {' '.join(args)} exited {proc.returncode}")
+        sys.exit(1)
+    with open(os.path.join(metrics, "view_data.json"), encoding="utf-8") as f:
+        return wall, json.load(f)["peak_rss_bytes"] / 1e6
+
+
+def benchmark(n: int, rows: int) -> None:
+    """Time real view_data.py processes on a synthetic normalized_violations.json."""
+    import tempfile
+
+    page = ["violations", "--limit", str(rows), "--format", "csv"]
+    report = ["report", "--format", "json"]
+    json_only = {CACHE_ENV: "off"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "normalized_violations.json")
+        dump_json_array(_synthetic(n), path)
+        sidecar = sidecar_path(path)
+        print(f"  • {n:,} records, {os.path.getsize(path) / 1e6:.1f} MB of JSON")
+
+        def drop_sidecar() -> None:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+
+        runs = [
+            (f"JSON, violations --limit {rows}", page, json_only, None),
+            ("JSON, report", report, json_only, None),
+            (f"cold (builds sidecar), violations --limit {rows}", page, {}, drop_sidecar),
+            (f"warm, violations --limit {rows}", page, {}, None),
+            ("warm, report", report, {}, None),
+            (f"touched source, violations --limit {rows}", page, {}, lambda: os.utime(path)),
+        ]
+        results = []
+        for label, args, env, before in runs:
+            if before:
+                before()
+            results.append((label, *_run_view(tmp, args, env)))
+        print(f"  • sidecar {os.path.getsize(sidecar) / 1e6:.1f} MB\n")
+
+        print(f"    {'view_data.py process':<44} {'wall':>9} {'peak RSS':>10}")
+        for label, seconds, rss_mb in results:
+            print(f"    {label:<44} {seconds * 1000:>6.0f} ms {rss_mb:>7.0f} MB")
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    from view_data import VIOLATIONS_FILE, YELP_FILE
+
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Binary sidecar caches for the normalized JSON files",
+    )
+    parser.add_argument("--benchmark", action="store_true", help="Time cold / warm startup on synthetic data")
+    parser.add_argument("--size", type=int, default=200_000, help="Benchmark records")
+    parser.add_argument("--rows", type=int, default=20, help="Rows the benchmark view renders")
+    args = parser.parse_args()
+
+    print("record_cache.py — Binary record caches\n")
+    if args.benchmark:
+        benchmark(args.size, args.rows)
+        return
+
+    for path in (YELP_FILE, VIOLATIONS_FILE):
+        if not os.path.exists(path):
+            print(f"  ⚠  {path} not found — run normalize_data.py first.")
+            continue
+        cache = open_cache(path)
+        if cache is None:
+            print(f"  ✗ Could not write {sidecar_path(path)}")
+            continue
+        print(f"  ✓ {path} → {sidecar_path(path)} ({len(cache)} records, "
+              f"{len(cache.columns)} fields)")
+        cache.close()
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "record_cache")
@@ -0,0 +1,308 @@
+"""
+risk_score.py — Batch risk-score engine for LeaseLens properties.
+
+Replaces the hand-typed `risk_score` literals with a score computed from each
+property's violation history and review ratings. All properties are scored in
+one vectorized NumPy pass:
+
+    violation load   Σ severity (violation_classifier.py) × recency decay × (OPEN_MULTIPLIER if open)
+                     per property, with recency halving every HALF_LIFE_DAYS
+    violation part   10 × (1 − e^(−load / LOAD_SCALE)), saturating at 10
+    rating part      (5 − mean rating) / 4 × 10, i.e. 1★ → 10, 5★ → 0
+    risk_score       VIOLATION_WEIGHT × violation part + RATING_WEIGHT ×
+                     rating part, or the violation part alone when a property
+                     has no reviews — on the 0–10 scale the app displays
+
+Incremental mode only rescores properties whose `property_summary` row (kept
+current by triggers on violations / reviews) changed since the last run.
+Scores are written back through the `apply_risk_scores` RPC in batches.
+
+Usage:
+    python risk_score.py                 Rescore properties changed since last run
+    python risk_score.py --full          Rescore every property
+    python risk_score.py --dry-run       Compute and print, don't write
+    python risk_score.py --benchmark     Time the scoring pass on synthetic data
+                                         (100k properties, 1M violations)
+"""
+
+import argparse
+import json
+import time
+import urllib.parse
+import urllib.request
+from collections.abc import Iterator
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+import instrument
+from supabase_api import API, HEADERS, rpc_count
+from violation_classifier import classify, is_open
+
+
+STATE_FILE = "risk_state.json"
+
+HALF_LIFE_DAYS = 365.0
+OPEN_MULTIPLIER = 1.5
+LOAD_SCALE = 6.0
+VIOLATION_WEIGHT = 0.7
+RATING_WEIGHT = 0.3
+
+PAGE_SIZE = 1000        # rows per REST page
+ID_CHUNK = 200          # property ids per `in.(…)` filter
+WRITE_BATCH = 1000      # scores per apply_risk_scores call
+
+
+# ── Scoring ────────────────────────────────────────────────────────────────────
+
+def severity_of(violation_type: str | None) -> float:
+    return classify(violation_type).severity
+
+
+def compute_scores(
+    property_ids: np.ndarray,
+    v_property_ids: np.ndarray,
+    v_severity: np.ndarray,
+    v_age_days: np.ndarray,
+    v_open: np.ndarray,
+    r_property_ids: np.ndarray,
+    r_ratings: np.ndarray,
+) -> np.ndarray:
+    """
+    Score every property in `property_ids` in one pass.
+
+    Violation / review rows are matched to properties by id; rows for ids not
+    in `property_ids` are ignored. Returns scores rounded to 2 decimals, in
+    the order of `property_ids`.
+    """
+    order = np.argsort(property_ids, kind="stable")
+    sorted_ids = property_ids[order]
+    n = len(property_ids)
+
+    def dense(ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Map ids → positions in `property_ids`; also return the known-id mask."""
+        pos = np.searchsorted(sorted_ids, ids)
+        pos = np.minimum(pos, max(n - 1, 0))
+        known = (sorted_ids[pos] == ids) if n else np.zeros(len(ids), dtype=bool)
+        return order[pos[known]], known
+
+    v_idx, v_known = dense(v_property_ids)
+    decay = np.exp2(-np.maximum(v_age_days[v_known], 0) / HALF_LIFE_DAYS)
+    weight = v_severity[v_known] * decay * np.where(v_open[v_known], OPEN_MULTIPLIER, 1.0)
+    load = np.bincount(v_idx, weights=weight, minlength=n)
+    violation_part = 10.0 * (1.0 - np.exp(-load / LOAD_SCALE))
+
+    r_idx, r_known = dense(r_property_ids)
+    rating_sum = np.bincount(r_idx, weights=r_ratings[r_known], minlength=n)
+    rating_count = np.bincount(r_idx, minlength=n)
+    has_reviews = rating_count > 0
+    mean_rating = np.divide(rating_sum, rating_count, out=np.zeros(n), where=has_reviews)
+    rating_part = np.clip((5.0 - mean_rating) / 4.0 * 10.0, 0.0, 10.0)
+
+    score = np.where(
+        has_reviews,
+        VIOLATION_WEIGHT * violation_part + RATING_WEIGHT * rating_part,
+        violation_part,
+    )
+    return np.round(score, 2)
+
+
+def score_rows(
+    property_ids: list[int],
+    violations: list[dict],
+    reviews: list[dict],
+    today: date | None = None,
+) -> dict[int, float]:
+    """Score properties from REST rows of violations and reviews."""
+    today = today or date.today()
+
+    types = [v.get("type") for v in violations]
+    distinct, inverse = np.unique(np.array(types, dtype=object).astype(str), return_inverse=True)
+    severity_table = np.array([severity_of(t) for t in distinct], dtype=float)
+
+    dates = np.array([v.get("date") or today.isoformat() for v in violations], dtype="datetime64[D]")
+    ages = (np.datetime64(today, "D") - dates).astype(float)
+
+    scores = compute_scores(
+        np.array(property_ids, dtype=np.int64),
+        np.array([v["property_id"] for v in violations], dtype=np.int64),
+        severity_table[inverse] if len(violations) else np.zeros(0),
+        ages,
+        np.array([is_open(v.get("status")) for v in violations], dtype=bool),
+        np.array([r["property_id"] for r in reviews], dtype=np.int64),
+        np.array([float(r["rating"]) for r in reviews], dtype=float),
+    )
+    return dict(zip(property_ids, scores.tolist()))
+
+
+# ── Supabase I/O ───────────────────────────────────────────────────────────────
+
+def _get(path: str) -> list[dict]:
+    req = urllib.request.Request(f"{API}/{path}", headers=HEADERS)
+    with instrument.span("http.get"), urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def fetch_all(table: str, select: str, filters: str = "") -> Iterator[dict]:
+    """Page through a table by id (keyset pagination), PAGE_SIZE rows at a time."""
+    last_id = 0
+    while True:
+        query = f"select=id,{select}&order=id&limit={PAGE_SIZE}&id=gt.{last_id}"
+        if filters:
+            query += f"&{filters}"
+        rows = _get(f"{table}?{query}")
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        last_id = rows[-1]["id"]
+
+
+def fetch_for_properties(table: str, select: str, property_ids: list[int]) -> list[dict]:
+    rows: list[dict] = []
+    for i in range(0, len(property_ids), ID_CHUNK):
+        chunk = ",".join(str(pid) for pid in property_ids[i:i + ID_CHUNK])
+        rows.extend(fetch_all(table, select, f"property_id=in.({chunk})"))
+    return rows
+
+
+def changed_property_ids(since: str) -> list[int]:
+    """Properties whose violations or reviews changed since `since` (ISO timestamp)."""
+    stamp = urllib.parse.quote(since)
+    return sorted({
+        row["property_id"]
+        for row in _paged_summary(f"updated_at=gt.{stamp}")
+    })
+
+
+def _paged_summary(filters: str) -> Iterator[dict]:
+    last_id = 0
+    while True:
+        rows = _get(
+            f"property_summary?select=property_id&order=property_id&limit={PAGE_SIZE}"
+            f"&property_id=gt.{last_id}&{filters}"
+        )
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        last_id = rows[-1]["property_id"]
+
+
+def write_scores(scores: dict[int, float]) -> int:
+    """
+    Store scores via apply_risk_scores in WRITE_BATCH-sized calls. Exits
+    non-zero on the first failed batch, before main() moves the watermark,
+    so the next run retries the same properties.
+    """
+    items = [{"id": pid, "risk_score": score} for pid, score in scores.items()]
+    updated = 0
+    for i in range(0, len(items), WRITE_BATCH):
+        updated += rpc_count("apply_risk_scores", {"scores": items[i:i + WRITE_BATCH]})
+    return updated
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state: dict) -> None:
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+def benchmark(n_properties: int, n_violations: int, n_reviews: int, seed: int = 7) -> None:
+    """Time compute_scores on synthetic arrays of the given sizes."""
+    rng = np.random.default_rng(seed)
+    property_ids = np.arange(1, n_properties + 1, dtype=np.int64)
+    rng.shuffle(property_ids)
+
+    v_pids = rng.integers(1, n_properties + 1, n_violations)
+    v_severity = rng.choice([1.0, 2.0, 3.0], n_violations)
+    v_age = rng.uniform(0, 3650, n_violations)
+    v_open = rng.random(n_violations) < 0.3
+    r_pids = rng.integers(1, n_properties + 1, n_reviews)
+    r_ratings = rng.uniform(1.0, 5.0, n_reviews).round(1)
+
+    print(f"Scoring {n_properties:,} properties / {n_violations:,} violations / "
+          f"{n_reviews:,} reviews…")
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        scores = compute_scores(property_ids, v_pids, v_severity, v_age, v_open, r_pids, r_ratings)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"  ✓ best of 5: {best * 1000:.1f} ms "
+          f"({n_violations / best / 1e6:.1f}M violations/s)")
+    print(f"  • score range {scores.min():.2f} – {scores.max():.2f}, mean {scores.mean():.2f}")
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Compute property risk scores from violations and reviews",
+    )
+    parser.add_argument("--full", action="store_true", help="Rescore every property")
+    parser.add_argument("--dry-run", action="store_true", help="Don't write scores back")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark on synthetic data")
+    parser.add_argument("--properties", type=int, default=100_000, help="Benchmark property count")
+    parser.add_argument("--violations", type=int, default=1_000_000, help="Benchmark violation count")
+    parser.add_argument("--reviews", type=int, default=200_000, help="Benchmark review count")
+    args = parser.parse_args()
+
+    print("risk_score.py — LeaseLens risk scoring\n")
+
+    if args.benchmark:
+        benchmark(args.properties, args.violations, args.reviews)
+        return
+
+    state = load_state()
+    run_started = datetime.now(timezone.utc).isoformat()
+
+    if args.full or "watermark" not in state:
+        print("Scoring all properties…")
+        property_ids = [p["id"] for p in fetch_all("properties", "name")]
+        violations = list(fetch_all("violations", "property_id,type,status,date"))
+        reviews = list(fetch_all("reviews", "property_id,rating"))
+    else:
+        print(f"Scoring properties changed since {state['watermark']}…")
+        property_ids = changed_property_ids(state["watermark"])
+        violations = fetch_for_properties("violations", "property_id,type,status,date", property_ids)
+        reviews = fetch_for_properties("reviews", "property_id,rating", property_ids)
+
+    print(f"  • {len(property_ids)} properties, {len(violations)} violations, {len(reviews)} reviews")
+    if not property_ids:
+        print("\n✓ Nothing to rescore.")
+        state["watermark"] = run_started
+        save_state(state)
+        return
+
+    start = time.perf_counter()
+    with instrument.span("score_rows"):
+        scores = score_rows(property_ids, violations, reviews)
+    instrument.count("properties_scored", len(scores))
+    print(f"  ✓ Scored in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    worst = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    for pid, score in worst:
+        print(f"    • property {pid}: {score:.2f}")
+
+    if args.dry_run:
+        print("\n(dry run — scores not written)")
+        return
+
+    updated = write_scores(scores)
+    print(f"\n✓ {updated} risk score(s) updated")
+    # Only reached when every batch was written.
+    state["watermark"] = run_started
+    save_state(state)
+
+
+if __name__ == "__main__":
+    instrument.run(main, "risk_score")
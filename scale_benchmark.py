@@ -0,0 +1,295 @@
+"""
+scale_benchmark.py — End-to-end pipeline timings on synthetic cities.
+
+For each scale, generates a city with synthetic_city.py in a scratch
+directory and runs the real scripts there, one process per stage, exactly
+as pipeline.py does (the Yelp scrape is replaced by the generated
+yelp_data.json):
+
+    ingest        ingest_city_data.py davis_code_violations.csv
+    normalize     normalize_data.py
+    report-cold   view_data.py report --format json   (builds the record caches)
+    report-warm   view_data.py report --format json   (reads them)
+    page          view_data.py violations --limit 20
+    matches       view_data.py matches --format csv   (match index)
+    gensql        generate_sql.py --seed-file synthetic_seed.json
+
+Each stage's wall time and peak RSS come from the script's own instrument.py
+metrics (LEASELENS_METRICS_DIR), so they cover that stage alone. A failed
+stage blocks the stages that need its output, and the end of its log is
+printed (the whole log stays in DIR/<scale>/logs/ with --keep).
+
+Between consecutive scales every stage should grow about as fast as its
+input (the larger of the property and violation ratios). A stage whose time
+grows more than --max-growth times faster than that is reported as a
+scaling regression and the run exits non-zero; a quadratic join, like the
+one match_index.py once had, fails this at the default scales. Stages under
+MIN_CHECK_SECONDS at the larger scale are skipped, since interpreter startup
+dominates them.
+
+The 50k × 2M scale takes about eight minutes and peaks near 3.4 GB (in
+normalize) on one core.
+
+Usage:
+    python scale_benchmark.py                               Default scales
+    python scale_benchmark.py --scales 1000:20000,50000:2000000
+    python scale_benchmark.py --stages ingest,normalize --keep bench_runs
+
+Options:
+    --scales LIST     Comma-separated PROPERTIES:VIOLATIONS pairs
+                      (default: 2000:40000,10000:200000)
+    --stages LIST     Only these stages (default: all)
+    --keep DIR        Keep each scale's files and logs in DIR/<scale>/
+                      (default: a temporary directory, removed afterwards)
+    --seed N          Generator seed (default: 7)
+    --max-growth X    Allowed time growth per unit of input growth between
+                      consecutive scales (default: 2.0; 0 disables the check)
+    --json FILE       Also write the results as JSON
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+
+import instrument
+import synthetic_city
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCALES = "2000:40000,10000:200000"
+DEFAULT_MAX_GROWTH = 2.0
+MIN_CHECK_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    script: str
+    args: tuple[str, ...] = ()
+    needs: tuple[str, ...] = ()
+
+
+STEPS = (
+    Step("ingest", "ingest_city_data.py", ("davis_code_violations.csv",)),
+    Step("normalize", "normalize_data.py", needs=("ingest",)),
+    Step("report-cold", "view_data.py", ("report", "--format", "json"), needs=("normalize",)),
+    Step("report-warm", "view_data.py", ("report", "--format", "json"), needs=("report-cold",)),
+    Step("page", "view_data.py", ("violations", "--limit", "20"), needs=("normalize",)),
+    Step("matches", "view_data.py", ("matches", "--format", "csv"), needs=("normalize",)),
+    Step("gensql", "generate_sql.py", ("--seed-file", synthetic_city.SEED_FILE)),
+)
+
+
+@dataclass
+class Timing:
+    scale: str
+    stage: str
+    status: str                  # "ok" | "failed" | "blocked"
+    seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+    detail: str = ""
+
+
+def parse_scales(text: str) -> list[tuple[int, int]]:
+    scales = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        try:
+            props, viols = part.split(":")
+            scales.append((int(props), int(viols)))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid scale '{part}' (use PROPERTIES:VIOLATIONS)")
+    return scales
+
+
+def _label(n: int) -> str:
+    for unit, size in (("M", 1_000_000), ("k", 1_000)):
+        if n >= size and n % (size // 10) == 0:
+            return f"{n / size:g}{unit}"
+    return str(n)
+
+
+def scale_label(n_properties: int, n_violations: int) -> str:
+    return f"{_label(n_properties)} × {_label(n_violations)}"
+
+
+def run_step(step: Step, workdir: str, scale: str) -> Timing:
+    """Run one stage in `workdir`; timings from the script's own metrics file."""
+    metrics_dir = os.path.join(workdir, "metrics", step.name)
+    log_path = os.path.join(workdir, "logs", f"{step.name}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run(
+            [sys.executable, os.path.join(ROOT, step.script), *step.args],
+            cwd=workdir,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            env={**os.environ, "PYTHONUNBUFFERED": "1", instrument.METRICS_ENV: metrics_dir},
+        )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        with open(log_path, encoding="utf-8", errors="replace") as log:
+            tail = "".join(log.readlines()[-5:])
+        print(tail.rstrip(), file=sys.stderr)
+        return Timing(scale, step.name, "failed", wall, detail=f"exit {proc.returncode}")
+
+    script = os.path.splitext(step.script)[0]
+    try:
+        with open(os.path.join(metrics_dir, f"{script}.json"), encoding="utf-8") as f:
+            report = json.load(f)
+        return Timing(scale, step.name, "ok", report["wall_seconds"], report["peak_rss_bytes"] / 1e6)
+    except (OSError, KeyError, ValueError):
+        return Timing(scale, step.name, "ok", wall, detail="no metrics file; process wall time")
+
+
+def run_scale(
+    n_properties: int,
+    n_violations: int,
+    steps: list[Step],
+    workdir: str,
+    seed: int,
+) -> list[Timing]:
+    scale = scale_label(n_properties, n_violations)
+    print(f"\n{scale}: {n_properties:,} properties, {n_violations:,} violations")
+
+    start = time.perf_counter()
+    written = synthetic_city.write_all(workdir, n_properties, n_violations, seed)
+    generated = time.perf_counter() - start
+    size_mb = sum(os.path.getsize(os.path.join(workdir, name)) for name in written) / 1e6
+    print(f"  • generated {size_mb:.0f} MB of input in {generated:.1f}s")
+
+    timings: list[Timing] = []
+    status: dict[str, str] = {}
+    for step in steps:
+        failed = [n for n in step.needs if status.get(n, "ok") != "ok"]
+        if failed:
+            timing = Timing(scale, step.name, "blocked", detail=f"after {', '.join(failed)}")
+            print(f"  ✗ {step.name:<12} blocked ({timing.detail})")
+        else:
+            timing = run_step(step, workdir, scale)
+            if timing.status == "ok":
+                print(f"  ✓ {step.name:<12} {timing.seconds:>8.2f}s  {timing.peak_rss_mb:>8.0f} MB")
+            else:
+                print(f"  ✗ {step.name:<12} failed after {timing.seconds:.2f}s ({timing.detail})")
+        status[step.name] = timing.status
+        timings.append(timing)
+    return timings
+
+
+def print_summary(timings: list[Timing]) -> None:
+    scales = list(dict.fromkeys(t.scale for t in timings))
+    stages = list(dict.fromkeys(t.stage for t in timings))
+    by_key = {(t.scale, t.stage): t for t in timings}
+    width = max(14, *(len(s) for s in scales))
+
+    print(f"\n{'stage':<12}" + "".join(f"  {s:>{width}}" for s in scales))
+    print("─" * (12 + (width + 2) * len(scales)))
+    for stage in stages:
+        cells = []
+        for scale in scales:
+            t = by_key.get((scale, stage))
+            if t is None:
+                cells.append("")
+            elif t.status != "ok":
+                cells.append(t.status)
+            else:
+                cells.append(f"{t.seconds:.2f}s {t.peak_rss_mb:.0f}MB")
+        print(f"{stage:<12}" + "".join(f"  {c:>{width}}" for c in cells))
+
+
+def check_growth(
+    timings: list[Timing],
+    sizes: dict[str, tuple[int, int]],
+    max_growth: float,
+) -> list[str]:
+    """Stages whose time outgrows their input between consecutive scales."""
+    by_key = {(t.scale, t.stage): t for t in timings if t.status == "ok"}
+    scales = list(dict.fromkeys(t.scale for t in timings))
+    problems = []
+    for small, large in zip(scales, scales[1:]):
+        (p0, v0), (p1, v1) = sizes[small], sizes[large]
+        work = max(p1 / p0, v1 / v0)
+        for stage in dict.fromkeys(t.stage for t in timings):
+            a, b = by_key.get((small, stage)), by_key.get((large, stage))
+            if a is None or b is None or b.seconds < MIN_CHECK_SECONDS or a.seconds <= 0:
+                continue
+            growth = b.seconds / a.seconds
+            if growth > work * max_growth:
+                problems.append(
+                    f"{stage}: {a.seconds:.2f}s → {b.seconds:.2f}s ({growth:.1f}×) "
+                    f"for {work:.1f}× the input ({small} → {large})"
+                )
+    return problems
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Pipeline time and peak memory on synthetic cities",
+    )
+    parser.add_argument("--scales", type=parse_scales, default=parse_scales(DEFAULT_SCALES),
+                        help=f"PROPERTIES:VIOLATIONS pairs (default: {DEFAULT_SCALES})")
+    parser.add_argument("--stages", help="Comma-separated stages to run (default: all)")
+    parser.add_argument("--keep", help="Keep each scale's files in DIR/<scale>/")
+    parser.add_argument("--seed", type=int, default=7, help="Generator seed (default: 7)")
+    parser.add_argument("--max-growth", type=float, default=DEFAULT_MAX_GROWTH,
+                        help="Allowed time growth per unit of input growth (default: "
+                             f"{DEFAULT_MAX_GROWTH}; 0 disables the check)")
+    parser.add_argument("--json", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    steps = list(STEPS)
+    if args.stages:
+        wanted = [s.strip() for s in args.stages.split(",") if s.strip()]
+        unknown = [s for s in wanted if s not in {step.name for step in STEPS}]
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(unknown)} "
+                         f"(choose from {', '.join(s.name for s in STEPS)})")
+        steps = [s for s in STEPS if s.name in wanted]
+
+    print("scale_benchmark.py — LeaseLens pipeline at scale")
+    timings: list[Timing] = []
+    sizes: dict[str, tuple[int, int]] = {}
+    for n_properties, n_violations in args.scales:
+        sizes[scale_label(n_properties, n_violations)] = (n_properties, n_violations)
+        if args.keep:
+            workdir = os.path.join(args.keep, f"{n_properties}x{n_violations}")
+            if os.path.isdir(workdir):
+                shutil.rmtree(workdir)
+            os.makedirs(workdir)
+        else:
+            workdir = tempfile.mkdtemp(prefix="leaselens-scale-")
+        try:
+            timings += run_scale(n_properties, n_violations, steps, workdir, args.seed)
+        finally:
+            if not args.keep:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    print_summary(timings)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(t) for t in timings], f, indent=2)
+        print(f"\n  ✓ Saved {len(timings)} timings → {args.json}")
+
+    problems = check_growth(timings, sizes, args.max_growth) if args.max_growth and len(sizes) > 1 else []
+    if problems:
+        print(f"\n✗ Scaling regression (more than {args.max_growth:g}× the input growth):")
+        for problem in problems:
+            print(f"    • {problem}")
+    elif args.max_growth and len(sizes) > 1:
+        print(f"\n✓ Every stage grew within {args.max_growth:g}× of its input")
+
+    if problems or any(t.status != "ok" for t in timings):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    instrument.run(main, "scale_benchmark")
@@ -13,6 +13,8 @@ import time
 from playwright.sync_api import sync_playwright, TimeoutError as PwTimeout
 from playwright_stealth import stealth_sync
 
+import instrument
+
 SEARCH_URL = (
     "https://www.yelp.com/search"
     "?find_desc=Apartments"
@@ -122,12 +124,15 @@ def scrape_yelp(headless: bool = True) -> list[dict]:
             print(f"→ Loading page {page_num + 1}: {url}")
 
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=30_000)
+                with instrument.span("page.goto"):
+                    page.goto(url, wait_until="domcontentloaded", timeout=30_000)
             except PwTimeout:
                 print(f"  ⚠  Page {page_num + 1} timed out, skipping.")
                 continue
 
-            results = scrape_page(page)
+            with instrument.span("scrape_page"):
+                results = scrape_page(page)
+            instrument.count("listings", len(results))
             print(f"  ✓ Extracted {len(results)} listings")
             all_results.extend(results)
 
@@ -159,4 +164,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    instrument.run(main, "scrape_yelp")
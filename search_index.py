@@ -0,0 +1,194 @@
+"""
+search_index.py — In-memory trigram index for offline fuzzy search.
+
+The Python counterpart of the `search_properties` RPC (pg_trgm): text is
+split into words, each word is padded ("  word ") and cut into trigrams the
+way pg_trgm does, and a document's score for a query is the fraction of the
+query's trigrams it contains. Typos and abbreviations ("lexingtn",
+"sycamore ln") still share most trigrams with the intended text.
+
+Postings are compact uint32 arrays of document numbers. A query counts its
+trigrams' postings with one NumPy bincount instead of a per-document Python
+loop, keeps documents with at least ⌈threshold × query trigrams⌉ hits, and
+only ranks the handful that can make the top `limit`.
+
+Used by `view_data.py search`.
+
+Usage:
+    python search_index.py --benchmark             100k synthetic properties
+    python search_index.py --benchmark --size 250000
+    python search_index.py --check                 Regression cases (exit 1 on failure)
+"""
+
+import argparse
+import math
+import random
+import re
+import statistics
+import sys
+import time
+from array import array
+from collections import defaultdict
+from collections.abc import Hashable
+
+import numpy as np
+
+import instrument
+
+
+DEFAULT_THRESHOLD = 0.3     # same as the RPC's pg_trgm.word_similarity_threshold
+DEFAULT_LIMIT = 20
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm-style trigram set: lowercase words, padded '  word '."""
+    grams: set[str] = set()
+    for word in _WORD.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NGramIndex:
+    """Trigram inverted index over short texts, each with an arbitrary payload."""
+
+    def __init__(self):
+        self._postings: dict[str, array] = defaultdict(lambda: array("I"))
+        self._texts: list[str] = []
+        self._payloads: list[Hashable] = []
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str, payload: Hashable) -> None:
+        doc = len(self._texts)
+        self._texts.append(text.lower())
+        self._payloads.append(payload)
+        # Documents are numbered in insertion order, so postings stay sorted.
+        for gram in trigrams(text):
+            self._postings[gram].append(doc)
+
+    def search(
+        self,
+        query: str,
+        limit: int = DEFAULT_LIMIT,
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> list[tuple[float, Hashable]]:
+        """Best matches as (score, payload), highest score first; [] for limit <= 0."""
+        grams = trigrams(query)
+        if limit <= 0 or not grams or not self._texts:
+            return []
+        need = max(1, math.ceil(threshold * len(grams)))
+        lists = [np.frombuffer(self._postings[g], dtype=np.uint32) for g in grams if g in self._postings]
+        if not lists:
+            return []
+
+        counts = np.bincount(np.concatenate(lists), minlength=len(self._texts))
+        best = np.flatnonzero(counts >= need)
+        if len(best) > limit:
+            # Keep everything tied with the limit-th best score for the tie-breaks below.
+            cutoff = np.partition(counts[best], len(best) - limit)[len(best) - limit]
+            best = best[counts[best] >= cutoff]
+
+        needle = query.strip().lower()
+        # Rank: score, then a literal substring match, then insertion order.
+        ranked = sorted(
+            (-int(counts[doc]), needle not in self._texts[doc], int(doc))
+            for doc in best
+        )
+        return [
+            (round(-neg_hits / len(grams), 3), self._payloads[doc])
+            for neg_hits, _, doc in ranked[:limit]
+        ]
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+NAME_WORDS = [
+    "Lexington", "Sycamore", "Almondwood", "Arbors", "Cranbrook", "Fountain Circle",
+    "Greystone", "Tanglewood", "Oak Shade", "University Court", "Wildhorse", "Aspen",
+    "Cambridge", "Drummond", "Pinecrest", "Willowbank", "Saratoga", "Olive Tree",
+]
+NAME_KINDS = ["Apartments", "Commons", "Village", "Place", "Terrace", "Townhomes", "Gardens"]
+STREETS = [
+    "Sycamore Lane", "Russell Boulevard", "Anderson Road", "Alvarado Avenue", "Lake Boulevard",
+    "Arthur Street", "Cantrill Drive", "Pole Line Road", "Covell Boulevard", "Drew Circle",
+    "Oak Avenue", "J Street", "5th Street", "8th Street", "Olive Drive", "Villanova Drive",
+]
+BENCH_QUERIES = [
+    "lexington", "sycamore ln", "lexingtn", "russell blvd", "1204 anderson",
+    "tanglewood apartments", "oak shade", "covell", "pole line rd", "greystone terrace",
+]
+
+
+def synthetic_index(size: int, seed: int = 7) -> NGramIndex:
+    rng = random.Random(seed)
+    index = NGramIndex()
+    for i in range(1, size + 1):
+        name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_KINDS)}"
+        address = f"{rng.randint(1, 4999)} {rng.choice(STREETS)}, Davis, CA 95616"
+        index.add(f"{name} {address}", i)
+    return index
+
+
+def benchmark(size: int, repeat: int = 20) -> None:
+    print(f"Building index over {size:,} synthetic properties…")
+    start = time.perf_counter()
+    index = synthetic_index(size)
+    print(f"  • built in {time.perf_counter() - start:.2f}s\n")
+
+    header = f"{'query':<24} {'hits':>5} {'p50 ms':>8} {'p95 ms':>8}"
+    print(header)
+    print("─" * len(header))
+    for query in BENCH_QUERIES:
+        timings_ms: list[float] = []
+        results: list = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = index.search(query)
+            timings_ms.append((time.perf_counter() - start) * 1000)
+        timings_ms.sort()
+        p95 = timings_ms[min(len(timings_ms) - 1, math.ceil(0.95 * len(timings_ms)) - 1)]
+        print(f"{query:<24} {len(results):>5} {statistics.median(timings_ms):>8.2f} {p95:>8.2f}")
+
+
+# ── Check ──────────────────────────────────────────────────────────────────────
+
+def check() -> bool:
+    """Edge cases of NGramIndex.search on a small synthetic index; True if all pass."""
+    index = synthetic_index(2_000)
+    limited = [len(index.search("sycamore", limit=n)) for n in (5, 1)]
+    cases = [
+        ("limit 0 returns nothing", index.search("sycamore", limit=0) == []),
+        ("negative limit returns nothing", index.search("sycamore", limit=-3) == []),
+        ("limit caps the results", limited == [5, 1]),
+        ("query without trigrams returns nothing", index.search("  ") == []),
+        ("empty index returns nothing", NGramIndex().search("sycamore") == []),
+    ]
+    for description, passed in cases:
+        print(f"  {'✓' if passed else '✗'} {description}")
+    return all(passed for _, passed in cases)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Trigram search index benchmark",
+    )
+    parser.add_argument("--benchmark", action="store_true", help="Time index build and queries")
+    parser.add_argument("--size", type=int, default=100_000, help="Synthetic properties (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query (default: 20)")
+    parser.add_argument("--check", action="store_true", help="Run the regression cases and exit")
+    args = parser.parse_args()
+    if not (args.benchmark or args.check):
+        parser.error("nothing to do — pass --benchmark or --check (search from the CLI with `view_data.py search`)")
+
+    print("search_index.py — Trigram search benchmark\n")
+    if args.check:
+        sys.exit(0 if check() else 1)
+    benchmark(args.size, args.repeat)
+
+
+if __name__ == "__main__":
+    instrument.run(main, "search_index")
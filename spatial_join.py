@@ -0,0 +1,240 @@
+"""
+spatial_join.py — Assign violations to properties by proximity.
+
+Exact address matching (normalize_data.find_address_matches / the match
+index) misses violations filed against a different building number of the
+same complex. Once violations are geocoded (geocode.py), this stage assigns
+each one to a property:
+
+    address     the violation's normalized address equals a property's
+    proximity   otherwise, the nearest property within --radius metres
+
+Properties are loaded into a uniform-grid spatial index (geo.GridIndex), so
+each violation only visits the cells around it — roughly O(n + m) for n
+violations and m properties at city density, instead of O(n × m).
+
+Tie-break when several properties are equally near (within TIE_M metres of
+the closest): a property on the same street wins, then the lowest id.
+
+Each violation record gains `property_id`, `property_match` ("address" /
+"proximity") and `property_distance_m`; unassigned violations are listed
+with the reason and the distance to the nearest property, if any.
+
+Usage:
+    python spatial_join.py                        Properties from Supabase
+    python spatial_join.py --properties props.json
+    python spatial_join.py --radius 150 --dry-run
+    python spatial_join.py --benchmark            Synthetic 20k × 200k join
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from typing import NamedTuple
+
+import instrument
+import match_index
+from address_maps import street_key
+from geo import GridIndex, parse_point
+from json_records import iter_json_array
+
+
+VIOLATIONS_FILE = "normalized_violations.json"
+
+DEFAULT_RADIUS_M = 120.0
+TIE_M = 1.0                 # distances closer than this count as a tie
+NEAR_MISS_FACTOR = 5.0      # report nearest property up to radius × this
+
+
+class Property(NamedTuple):
+    id: int
+    name: str
+    address: str
+    street: str
+    lon: float
+    lat: float
+
+
+class Assignment(NamedTuple):
+    property_id: int | None
+    method: str             # "address" | "proximity" | "no_location" | "out_of_range"
+    distance_m: float | None
+
+
+# ── Loading ────────────────────────────────────────────────────────────────────
+
+def _property(row: dict) -> Property | None:
+    point = parse_point(row.get("location"))
+    if point is None and row.get("longitude") is not None and row.get("latitude") is not None:
+        point = (float(row["longitude"]), float(row["latitude"]))
+    if point is None:
+        return None
+    address = (row.get("address_normalized") or row.get("normalized_address") or "").lower()
+    return Property(int(row["id"]), row.get("name") or "", address, street_key(address), *point)
+
+
+def load_properties_file(path: str) -> list[Property]:
+    """Properties from a JSON array (id, name, address_normalized, location or lon/lat)."""
+    return [p for p in map(_property, iter_json_array(path)) if p is not None]
+
+
+def load_properties_remote() -> list[Property]:
+    from risk_score import fetch_all
+    rows = fetch_all("properties", "name,address_normalized,location")
+    return [p for p in map(_property, rows) if p is not None]
+
+
+# ── Join ───────────────────────────────────────────────────────────────────────
+
+class SpatialJoin:
+    def __init__(self, properties: list[Property], radius_m: float = DEFAULT_RADIUS_M):
+        self.radius_m = radius_m
+        self.by_address = {}
+        for prop in sorted(properties, key=lambda p: p.id):
+            if prop.address:
+                self.by_address.setdefault(prop.address, prop)
+        # Cells about the size of the search radius keep each query to a 3×3 block.
+        self.grid = GridIndex(cell_m=max(radius_m, 25.0))
+        self.grid.extend((p.lon, p.lat, p) for p in properties)
+
+    def assign(self, violation: dict) -> Assignment:
+        address = (violation.get("normalized_address") or "").lower()
+        exact = self.by_address.get(address) if address else None
+        if exact is not None:
+            return Assignment(exact.id, "address", None)
+
+        lon, lat = violation.get("longitude"), violation.get("latitude")
+        if lon is None or lat is None:
+            return Assignment(None, "no_location", None)
+
+        hits = self.grid.within(lon, lat, self.radius_m)
+        if not hits:
+            near = self.grid.nearest(lon, lat, self.radius_m * NEAR_MISS_FACTOR)
+            return Assignment(None, "out_of_range", near[0] if near else None)
+
+        street = street_key(address)
+        closest = hits[0][0]
+        tied = [(d, p) for d, p in hits if d - closest <= TIE_M]
+        distance, best = min(tied, key=lambda hit: (hit[1].street != street, hit[1].id))
+        return Assignment(best.id, "proximity", round(distance, 1))
+
+
+def join(violations: list[dict], spatial: SpatialJoin) -> list[Assignment]:
+    assignments = []
+    for rec in violations:
+        result = spatial.assign(rec)
+        rec["property_id"] = result.property_id
+        rec["property_match"] = result.method if result.property_id is not None else None
+        rec["property_distance_m"] = result.distance_m if result.method == "proximity" else None
+        assignments.append(result)
+    return assignments
+
+
+def report(violations: list[dict], assignments: list[Assignment], limit: int = 20) -> None:
+    methods = Counter(a.method for a in assignments)
+    assigned = methods["address"] + methods["proximity"]
+    total = len(assignments)
+    print(f"  ✓ {assigned}/{total} violation(s) assigned "
+          f"({methods['address']} by address, {methods['proximity']} by proximity)")
+
+    unassigned = [(v, a) for v, a in zip(violations, assignments) if a.property_id is None]
+    if not unassigned:
+        return
+    print(f"  ⚠  {len(unassigned)} unassigned: "
+          f"{methods['no_location']} without coordinates, "
+          f"{methods['out_of_range']} with no property in range")
+    for v, a in unassigned[:limit]:
+        if a.method == "no_location":
+            reason = "not geocoded"
+        elif a.distance_m is not None:
+            reason = f"nearest property {a.distance_m:.0f} m away"
+        else:
+            reason = "no property nearby"
+        label = v.get("case_number") or v.get("normalized_address") or "(no address)"
+        print(f"    • {label}: {reason}")
+    if len(unassigned) > limit:
+        print(f"    … and {len(unassigned) - limit} more")
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+def benchmark(n_properties: int, n_violations: int, radius_m: float, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    min_lon, min_lat, max_lon, max_lat = -121.81, 38.52, -121.68, 38.58
+    properties = [
+        Property(i, f"P{i}", "", "", rng.uniform(min_lon, max_lon), rng.uniform(min_lat, max_lat))
+        for i in range(1, n_properties + 1)
+    ]
+    violations = [
+        {"longitude": rng.uniform(min_lon, max_lon), "latitude": rng.uniform(min_lat, max_lat)}
+        for _ in range(n_violations)
+    ]
+
+    start = time.perf_counter()
+    spatial = SpatialJoin(properties, radius_m)
+    built = time.perf_counter() - start
+    assignments = join(violations, spatial)
+    elapsed = time.perf_counter() - start - built
+
+    assigned = sum(a.property_id is not None for a in assignments)
+    print(f"  • index: {n_properties:,} properties in {built * 1000:.0f} ms")
+    print(f"  • join:  {n_violations:,} violations in {elapsed:.2f}s "
+          f"({n_violations / elapsed:,.0f}/s), {assigned:,} assigned within {radius_m:.0f} m")
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Spatial join of violations to properties",
+    )
+    parser.add_argument("--properties", help="Properties JSON file (default: fetch from Supabase)")
+    parser.add_argument("--violations", default=VIOLATIONS_FILE,
+                        help=f"Geocoded violations (default: {VIOLATIONS_FILE})")
+    parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS_M,
+                        help=f"Maximum distance in metres (default: {DEFAULT_RADIUS_M:.0f})")
+    parser.add_argument("--dry-run", action="store_true", help="Report only, don't rewrite violations")
+    parser.add_argument("--benchmark", action="store_true", help="Time the join on synthetic data")
+    args = parser.parse_args()
+
+    print("spatial_join.py — Violation → property spatial join\n")
+
+    if args.benchmark:
+        benchmark(20_000, 200_000, args.radius)
+        return
+
+    print("Loading properties…")
+    properties = (load_properties_file(args.properties) if args.properties
+                  else load_properties_remote())
+    print(f"  • {len(properties)} properties with a location")
+
+    try:
+        violations = list(iter_json_array(args.violations))
+    except FileNotFoundError:
+        print(f"\n⚠  {args.violations} not found. Run normalize_data.py and geocode.py first.")
+        sys.exit(1)
+    if not any(v.get("latitude") is not None for v in violations):
+        print(f"  ⚠  {args.violations} has no coordinates — run geocode.py first.")
+
+    print(f"\nJoining {len(violations)} violations (radius {args.radius:.0f} m)…")
+    start = time.perf_counter()
+    with instrument.span("spatial_join"):
+        spatial = SpatialJoin(properties, args.radius)
+        assignments = join(violations, spatial)
+    instrument.count("violations_joined", len(assignments))
+    print(f"  • done in {(time.perf_counter() - start) * 1000:.0f} ms")
+    report(violations, assignments)
+
+    if not args.dry_run:
+        conn = match_index.open_index()
+        match_index.save_indexed(conn, match_index.VIOLATIONS_SOURCE, violations, args.violations)
+        conn.close()
+        print(f"  ✓ Saved {len(violations)} records → {args.violations}")
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "spatial_join")
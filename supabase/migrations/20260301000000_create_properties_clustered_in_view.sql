@@ -0,0 +1,72 @@
+-- =============================================================================
+-- Migration: Stored Procedure — properties_clustered_in_view
+-- Description: Zoom-aware variant of properties_in_view. At low zoom levels
+--              nearby properties are aggregated server-side into grid
+--              clusters (count + max/avg risk); above cluster_max_zoom each
+--              property is returned as an individual point. Only the columns
+--              the map needs are returned.
+-- =============================================================================
+
+create or replace function public.properties_clustered_in_view(
+  min_lat          double precision,
+  min_long         double precision,
+  max_lat          double precision,
+  max_long         double precision,
+  zoom             integer,
+  cluster_px       integer default 60,  -- grid cell size in screen pixels
+  cluster_max_zoom integer default 15   -- above this zoom, never cluster
+)
+returns table (
+  id          bigint,            -- property id; null for multi-point clusters
+  name        text,              -- property name; null for multi-point clusters
+  longitude   double precision,  -- point, or centroid of the cluster members
+  latitude    double precision,
+  point_count integer,
+  max_risk    numeric,
+  avg_risk    numeric
+)
+language sql
+stable
+as $$
+  with visible as (
+    select p.id,
+           p.name,
+           extensions.st_x(p.location) as x,
+           extensions.st_y(p.location) as y,
+           p.risk_score
+    from   public.properties p
+    where  p.location operator(extensions.&&) extensions.st_makeenvelope(
+             min_long, min_lat,   -- lower-left  (x_min, y_min)
+             max_long, max_lat,   -- upper-right (x_max, y_max)
+             4326                 -- SRID: WGS-84
+           )
+  ),
+  grid as (
+    -- Degrees spanned by `cluster_px` pixels on a 256px Web-Mercator tile.
+    select 360.0 / (256 * power(2, greatest(zoom, 0))) * cluster_px as cell
+  )
+
+  -- Zoomed in: individual points
+  select v.id, v.name, v.x, v.y, 1, v.risk_score, v.risk_score
+  from   visible v
+  where  zoom > cluster_max_zoom
+
+  union all
+
+  -- Zoomed out: one row per occupied grid cell
+  select case when count(*) = 1 then min(v.id) end,
+         case when count(*) = 1 then min(v.name) end,
+         avg(v.x),
+         avg(v.y),
+         count(*)::integer,
+         max(v.risk_score),
+         round(avg(v.risk_score), 2)
+  from   visible v, grid g
+  where  zoom <= cluster_max_zoom
+  group  by floor(v.x / g.cell), floor(v.y / g.cell);
+$$;
+
+comment on function public.properties_clustered_in_view is
+  'Zoom-aware properties_in_view: aggregates properties in the bounding box into grid clusters '
+  '(count, max/avg risk) at zoom <= cluster_max_zoom and returns individual points above it. '
+  'Returns only id, name, coordinates and risk columns to keep map payloads small.';
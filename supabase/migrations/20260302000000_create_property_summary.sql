@@ -0,0 +1,196 @@
+-- =============================================================================
+-- Migration: Create property_summary
+-- Description: Precomputed per-property violation / review aggregates so the
+--              map and list views can read counts and ratings in one query
+--              instead of querying violations and reviews per pin.
+--              Kept current by statement-level triggers on violations,
+--              reviews and properties; refresh_property_summary() recomputes
+--              any set of properties (or all of them) in bulk.
+-- =============================================================================
+
+create table public.property_summary (
+  property_id            bigint primary key references public.properties (id) on delete cascade,
+  violation_count        integer not null default 0,
+  open_count             integer not null default 0,
+  latest_violation_date  date,
+  latest_violation_type  text,
+  review_count           integer not null default 0,
+  avg_rating             numeric(3, 2),                -- over all sources
+  avg_rating_by_source   jsonb not null default '{}',  -- e.g. {"yelp": 3.5, "google": 3.8}
+  updated_at             timestamptz default now()
+);
+
+comment on table public.property_summary is
+  'Per-property violation and review aggregates, maintained by triggers on violations / reviews.';
+
+alter table public.property_summary enable row level security;
+create policy "Anyone can view property summaries"
+  on public.property_summary for select using (true);
+
+-- ---------------------------------------------------------------------------
+-- Bulk / targeted recompute. `ids` = null recomputes every property.
+-- ---------------------------------------------------------------------------
+create or replace function public.refresh_property_summary(ids bigint[] default null)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  with target as (
+    select id from public.properties where ids is null or id = any (ids)
+  ),
+  -- Statuses are free text; "open" is violation_classifier.OPEN_PATTERN, the
+  -- rule the report and the temporal index use (pending / active count too).
+  v as (
+    select property_id,
+           count(*)                                   as violation_count,
+           count(*) filter (where lower(status) ~ 'open|active|pending|in progress') as open_count
+    from   public.violations
+    where  property_id in (select id from target)
+    group  by property_id
+  ),
+  latest as (
+    select distinct on (property_id) property_id, date, type
+    from   public.violations
+    where  property_id in (select id from target)
+    order  by property_id, date desc, id desc
+  ),
+  r as (
+    select property_id, count(*) as review_count, round(avg(rating), 2) as avg_rating
+    from   public.reviews
+    where  property_id in (select id from target)
+    group  by property_id
+  ),
+  rs as (
+    select property_id, jsonb_object_agg(source, avg_rating) as by_source
+    from (
+      select property_id, source, round(avg(rating), 2) as avg_rating
+      from   public.reviews
+      where  property_id in (select id from target)
+      group  by property_id, source
+    ) per_source
+    group  by property_id
+  ),
+  upserted as (
+    insert into public.property_summary as s (
+      property_id, violation_count, open_count, latest_violation_date,
+      latest_violation_type, review_count, avg_rating, avg_rating_by_source, updated_at
+    )
+    select t.id,
+           coalesce(v.violation_count, 0),
+           coalesce(v.open_count, 0),
+           latest.date,
+           latest.type,
+           coalesce(r.review_count, 0),
+           r.avg_rating,
+           coalesce(rs.by_source, '{}'),
+           now()
+    from   target t
+    left   join v      on v.property_id      = t.id
+    left   join latest on latest.property_id = t.id
+    left   join r      on r.property_id      = t.id
+    left   join rs     on rs.property_id     = t.id
+    on conflict (property_id) do update set
+      violation_count       = excluded.violation_count,
+      open_count            = excluded.open_count,
+      latest_violation_date = excluded.latest_violation_date,
+      latest_violation_type = excluded.latest_violation_type,
+      review_count          = excluded.review_count,
+      avg_rating            = excluded.avg_rating,
+      avg_rating_by_source  = excluded.avg_rating_by_source,
+      updated_at            = excluded.updated_at
+    returning 1
+  )
+  select count(*)::integer from upserted;
+$$;
+
+comment on function public.refresh_property_summary is
+  'Recomputes property_summary rows for the given property ids (all properties when null). '
+  'Returns the number of rows written.';
+
+-- Only the triggers below (security definer) and property_summary.py (direct
+-- database connection) call it; a client must not be able to force a recompute.
+revoke execute on function public.refresh_property_summary(bigint[]) from public, anon, authenticated;
+
+-- ---------------------------------------------------------------------------
+-- Incremental maintenance: each statement on violations / reviews recomputes
+-- only the properties it touched, once per statement (not per row).
+-- ---------------------------------------------------------------------------
+create or replace function public.property_summary_sync()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  ids bigint[];
+begin
+  if tg_op = 'INSERT' then
+    select array_agg(distinct property_id) into ids from new_rows;
+  elsif tg_op = 'UPDATE' then
+    select array_agg(distinct property_id) into ids
+    from (select property_id from new_rows
+          union
+          select property_id from old_rows) touched;
+  else
+    select array_agg(distinct property_id) into ids from old_rows;
+  end if;
+
+  if ids is not null then
+    perform public.refresh_property_summary(ids);
+  end if;
+  return null;
+end;
+$$;
+
+create or replace function public.property_summary_init()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  insert into public.property_summary (property_id)
+  select id from new_rows
+  on conflict (property_id) do nothing;
+  return null;
+end;
+$$;
+
+create trigger trg_violations_summary_insert
+  after insert on public.violations
+  referencing new table as new_rows
+  for each statement execute function public.property_summary_sync();
+
+create trigger trg_violations_summary_update
+  after update on public.violations
+  referencing old table as old_rows new table as new_rows
+  for each statement execute function public.property_summary_sync();
+
+create trigger trg_violations_summary_delete
+  after delete on public.violations
+  referencing old table as old_rows
+  for each statement execute function public.property_summary_sync();
+
+create trigger trg_reviews_summary_insert
+  after insert on public.reviews
+  referencing new table as new_rows
+  for each statement execute function public.property_summary_sync();
+
+create trigger trg_reviews_summary_update
+  after update on public.reviews
+  referencing old table as old_rows new table as new_rows
+  for each statement execute function public.property_summary_sync();
+
+create trigger trg_reviews_summary_delete
+  after delete on public.reviews
+  referencing old table as old_rows
+  for each statement execute function public.property_summary_sync();
+
+create trigger trg_properties_summary_insert
+  after insert on public.properties
+  referencing new table as new_rows
+  for each statement execute function public.property_summary_init();
+
+-- Backfill existing data
+select public.refresh_property_summary();
@@ -0,0 +1,33 @@
+-- =============================================================================
+-- Migration: Risk-score write-back
+-- Description: Batch RPC used by risk_score.py to store computed scores, and
+--              a corrected comment on the column's scale (the seeded and
+--              computed values are 0–10, not 0–100).
+-- =============================================================================
+
+comment on column public.properties.risk_score is
+  'Computed risk score (0–10) from violation history and review ratings; see risk_score.py.';
+
+create or replace function public.apply_risk_scores(scores jsonb)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  with updated as (
+    update public.properties p
+    set    risk_score = s.risk_score,
+           updated_at = now()
+    from   jsonb_to_recordset(scores) as s (id bigint, risk_score numeric)
+    where  p.id = s.id
+      and  p.risk_score is distinct from s.risk_score
+    returning 1
+  )
+  select count(*)::integer from updated;
+$$;
+
+comment on function public.apply_risk_scores is
+  'Sets risk_score for a batch of properties given as [{"id": …, "risk_score": …}, …]. '
+  'Rows whose score is unchanged are skipped. Returns the number of rows updated.';
+
+revoke execute on function public.apply_risk_scores(jsonb) from public, anon, authenticated;
@@ -0,0 +1,43 @@
+-- =============================================================================
+-- Migration: Stored Procedure — property_tile
+-- Description: Returns the properties inside one z/x/y Web-Mercator tile as
+--              a Mapbox Vector Tile (layer "properties"), so the map can
+--              draw pins from a compact binary tile instead of per-row JSON
+--              with a serialized geometry. Called over PostgREST with
+--              `Accept: application/octet-stream` (see bake_tiles.py).
+-- =============================================================================
+
+create or replace function public.property_tile(z integer, x integer, y integer)
+returns bytea
+language sql
+stable
+parallel safe
+as $$
+  with bounds as (
+    -- Tile envelope in EPSG:3857, plus a 64/4096 margin so pins straddling
+    -- the tile edge are drawn on both neighbouring tiles.
+    select extensions.st_tileenvelope(z, x, y)                           as tile,
+           extensions.st_tileenvelope(z, x, y, margin => 64.0 / 4096)    as padded
+  ),
+  features as (
+    select extensions.st_asmvtgeom(
+             extensions.st_transform(p.location, 3857),
+             b.tile,
+             4096,   -- extent
+             64,     -- buffer
+             true    -- clip
+           )                        as geom,
+           p.id,
+           p.name,
+           p.risk_score::float8     as risk_score
+    from   public.properties p, bounds b
+    where  p.location operator(extensions.&&) extensions.st_transform(b.padded, 4326)
+  )
+  select coalesce(extensions.st_asmvt(features, 'properties', 4096, 'geom', 'id'), ''::bytea)
+  from   features
+  where  geom is not null;
+$$;
+
+comment on function public.property_tile is
+  'Mapbox Vector Tile (layer "properties": id, name, risk_score) for tile z/x/y, '
+  'built with ST_AsMVTGeom / ST_AsMVT over the idx_properties_location GiST index.';
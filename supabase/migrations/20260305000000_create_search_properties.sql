@@ -0,0 +1,51 @@
+-- =============================================================================
+-- Migration: Stored Procedure — search_properties
+-- Description: Fuzzy, typo-tolerant search over property names and
+--              normalized addresses ("lexington", "sycamore ln") backed by
+--              pg_trgm GIN indexes. Results are ranked by trigram word
+--              similarity against either column.
+-- =============================================================================
+
+create extension if not exists pg_trgm with schema extensions;
+
+create index if not exists idx_properties_name_trgm
+  on public.properties using gin (name extensions.gin_trgm_ops);
+
+create index if not exists idx_properties_address_trgm
+  on public.properties using gin (address_normalized extensions.gin_trgm_ops);
+
+create or replace function public.search_properties(
+  query       text,
+  max_results integer default 20   -- capped at 100
+)
+returns table (
+  id                 bigint,
+  name               text,
+  address_normalized text,
+  risk_score         numeric,
+  score              real           -- best word similarity of the two columns, 0–1
+)
+language sql
+stable
+-- `<%` matches when word_similarity >= this; the default (0.6) is too strict
+-- for abbreviations such as "ln" vs. "Lane".
+set pg_trgm.word_similarity_threshold = 0.3
+as $$
+  select p.id,
+         p.name,
+         p.address_normalized,
+         p.risk_score,
+         greatest(
+           extensions.word_similarity(query, p.name),
+           extensions.word_similarity(query, p.address_normalized)
+         ) as score
+  from   public.properties p
+  where  query operator(extensions.<%) p.name
+     or  query operator(extensions.<%) p.address_normalized
+  order  by score desc, p.id
+  limit  least(greatest(max_results, 1), 100);
+$$;
+
+comment on function public.search_properties is
+  'Ranked fuzzy search over properties.name / address_normalized using the '
+  'idx_properties_name_trgm / idx_properties_address_trgm GIN indexes.';
@@ -0,0 +1,70 @@
+-- =============================================================================
+-- Migration: Create property_violation_windows
+-- Description: Rolling-window violation analytics per property (counts over
+--              the last 90 days / 1 year / 3 years, year-over-year trend and
+--              days since the last violation), computed as of a date by
+--              temporal_index.py and written back through
+--              apply_violation_windows(). Unlike property_summary these
+--              values depend on the current date, so they are recomputed on a
+--              schedule rather than by triggers.
+-- =============================================================================
+
+create table public.property_violation_windows (
+  property_id           bigint primary key references public.properties (id) on delete cascade,
+  as_of                 date not null,
+  violations_90d        integer not null default 0,
+  violations_1y         integer not null default 0,
+  violations_3y         integer not null default 0,
+  open_3y               integer not null default 0,
+  trend_1y              integer not null default 0,  -- last 365 days minus the 365 before
+  last_violation_date   date,
+  days_since_last       integer,
+  updated_at            timestamptz default now()
+);
+
+comment on table public.property_violation_windows is
+  'Per-property rolling-window violation counts and trend as of `as_of`; see temporal_index.py.';
+
+alter table public.property_violation_windows enable row level security;
+create policy "Anyone can view violation windows"
+  on public.property_violation_windows for select using (true);
+
+create or replace function public.apply_violation_windows(rows jsonb)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  with upserted as (
+    insert into public.property_violation_windows as w (
+      property_id, as_of, violations_90d, violations_1y, violations_3y, open_3y,
+      trend_1y, last_violation_date, days_since_last, updated_at
+    )
+    select r.property_id, r.as_of, r.violations_90d, r.violations_1y, r.violations_3y,
+           r.open_3y, r.trend_1y, r.last_violation_date, r.days_since_last, now()
+    from   jsonb_to_recordset(rows) as r (
+             property_id bigint, as_of date, violations_90d integer, violations_1y integer,
+             violations_3y integer, open_3y integer, trend_1y integer,
+             last_violation_date date, days_since_last integer
+           )
+    where  exists (select 1 from public.properties p where p.id = r.property_id)
+    on conflict (property_id) do update
+    set    as_of               = excluded.as_of,
+           violations_90d      = excluded.violations_90d,
+           violations_1y       = excluded.violations_1y,
+           violations_3y       = excluded.violations_3y,
+           open_3y             = excluded.open_3y,
+           trend_1y            = excluded.trend_1y,
+           last_violation_date = excluded.last_violation_date,
+           days_since_last     = excluded.days_since_last,
+           updated_at          = now()
+    returning 1
+  )
+  select count(*)::integer from upserted;
+$$;
+
+comment on function public.apply_violation_windows is
+  'Upserts rolling-window rows given as [{"property_id": …, "as_of": …, "violations_90d": …, …}, …]. '
+  'Rows for unknown properties are skipped. Returns the number of rows written.';
+
+revoke execute on function public.apply_violation_windows(jsonb) from public, anon, authenticated;
@@ -0,0 +1,115 @@
+-- =============================================================================
+-- Migration: Nearby lower-risk alternatives
+-- Description: "Similar nearby properties" for the property screen.
+--
+--   nearby_properties()   live k-NN query: the closest properties to a given
+--                         one, optionally only lower-risk ones, within a
+--                         distance. Ordered by the index-assisted `<->`
+--                         operator on idx_properties_location, so the GiST
+--                         index returns candidates nearest-first and the
+--                         scan stops after `max_results` rows.
+--   property_neighbors    the same list precomputed for every property by
+--                         neighbors.py (KD-tree batch job), so the app can
+--                         read it without a per-tap spatial query.
+-- =============================================================================
+
+create or replace function public.nearby_properties(
+  target_id        bigint,
+  max_results      integer          default 5,
+  max_distance_m   double precision default 2000,
+  lower_risk_only  boolean          default true
+)
+returns table (
+  id                 bigint,
+  name               text,
+  address_normalized text,
+  risk_score         numeric,
+  distance_m         double precision
+)
+language sql
+stable
+set search_path = public, extensions
+as $$
+  with target as (
+    select location, risk_score from public.properties where properties.id = target_id
+  )
+  select p.id,
+         p.name,
+         p.address_normalized,
+         p.risk_score,
+         st_distance(p.location::geography, t.location::geography) as distance_m
+  from   target t
+  cross  join lateral (
+           select c.*
+           from   public.properties c
+           where  c.id <> target_id
+             -- Bounding box of the search radius, so the index walk is bounded
+             -- even when few candidates pass the risk filter.
+             and  c.location && st_expand(
+                    t.location,
+                    max_distance_m / (111320.0 * cos(radians(st_y(t.location)))),
+                    max_distance_m / 111320.0
+                  )
+             and  (not lower_risk_only or c.risk_score < t.risk_score)
+             and  st_dwithin(c.location::geography, t.location::geography, max_distance_m)
+           order  by c.location <-> t.location
+           limit  least(greatest(max_results, 1), 50)
+         ) p;
+$$;
+
+comment on function public.nearby_properties is
+  'Up to max_results (≤ 50) properties nearest to target_id within max_distance_m metres, '
+  'lower-risk only by default, nearest first. Uses the <-> KNN operator on idx_properties_location.';
+
+-- ---------------------------------------------------------------------------
+-- Precomputed neighbours (written by neighbors.py)
+-- ---------------------------------------------------------------------------
+create table public.property_neighbors (
+  property_id  bigint   not null references public.properties (id) on delete cascade,
+  rank         smallint not null,                -- 1 = nearest
+  neighbor_id  bigint   not null references public.properties (id) on delete cascade,
+  distance_m   double precision not null,
+  computed_at  timestamptz default now(),
+  primary key (property_id, rank)
+);
+
+comment on table public.property_neighbors is
+  'k nearest lower-risk properties per property, precomputed by neighbors.py.';
+
+create index idx_property_neighbors_neighbor on public.property_neighbors (neighbor_id);
+
+alter table public.property_neighbors enable row level security;
+create policy "Anyone can view property neighbors"
+  on public.property_neighbors for select using (true);
+
+create or replace function public.apply_property_neighbors(ids bigint[], rows jsonb)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  inserted integer;
+begin
+  delete from public.property_neighbors where property_id = any (ids);
+
+  insert into public.property_neighbors (property_id, rank, neighbor_id, distance_m)
+  select r.property_id, r.rank, r.neighbor_id, r.distance_m
+  from   jsonb_to_recordset(rows) as r (
+           property_id bigint, rank smallint, neighbor_id bigint, distance_m double precision
+         )
+  where  r.property_id = any (ids)
+    and  exists (select 1 from public.properties p where p.id = r.property_id)
+    and  exists (select 1 from public.properties p where p.id = r.neighbor_id);
+
+  get diagnostics inserted = row_count;
+  return inserted;
+end;
+$$;
+
+comment on function public.apply_property_neighbors is
+  'Replaces the neighbour lists of the properties in `ids` with `rows` '
+  '([{"property_id": …, "rank": …, "neighbor_id": …, "distance_m": …}, …]). '
+  'Returns the number of rows inserted.';
+
+revoke execute on function public.apply_property_neighbors(bigint[], jsonb) from public, anon, authenticated;
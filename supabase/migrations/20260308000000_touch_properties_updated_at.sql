@@ -0,0 +1,29 @@
+-- =============================================================================
+-- Migration: Keep properties.updated_at current
+-- Description: updated_at was only set on insert (column default) and by
+--              apply_risk_scores, so editing a property's name or location
+--              left it unchanged. bake_tiles.py versions its tile store by
+--              the latest updated_at, so such an edit kept serving stale
+--              tiles. A row trigger now stamps every update that actually
+--              changes the row; no-op updates (e.g. a re-run seed upsert)
+--              leave it alone, so they don't invalidate baked tiles.
+-- =============================================================================
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+comment on function public.touch_updated_at is
+  'Row trigger: sets updated_at = now() on the row being updated.';
+
+create trigger trg_properties_touch_updated_at
+  before update on public.properties
+  for each row
+  when (old is distinct from new)
+  execute function public.touch_updated_at();
@@ -0,0 +1,232 @@
+"""
+supabase_client.py — Cached read client for the Supabase REST API.
+
+Built on supabase_api's API / HEADERS. Reads go through one shared cache:
+
+    TTL + LRU     responses are reused for `ttl_s` seconds; at most
+                  `max_entries` are kept, least recently used evicted first
+    revalidation  once an entry is stale, it is re-requested with
+                  If-None-Match when the server sent an ETag; a 304 keeps the
+                  cached body (no transfer) and restarts its TTL. Without an
+                  ETag a stale entry is simply fetched again.
+    coalescing    concurrent calls for the same URL share one request: the
+                  first caller fetches, the others wait for its result
+
+Typed helpers cover what the scripts read (properties in a bounding box,
+violations / reviews of a property, whole-table keyset scans); `get` takes
+any table path. `stats()` reports hits, misses, revalidations, coalesced
+calls and the hit rate; the same counters go to instrument.py as
+`api_cache.*`.
+
+Writes (supabase_api.post / rpc) don't go through the cache — call
+`invalidate(table)` after writing a table you will read again.
+
+Usage:
+    from supabase_client import SupabaseClient
+    client = SupabaseClient(ttl_s=300)
+    rows = client.properties_in_bounds(38.52, -121.80, 38.57, -121.70)
+    print(client.stats())
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TypedDict
+
+import instrument
+from supabase_api import API, HEADERS
+
+
+DEFAULT_TTL_S = 60.0
+DEFAULT_MAX_ENTRIES = 512
+PAGE_SIZE = 1000
+
+
+class PropertyRow(TypedDict, total=False):
+    id: int
+    name: str
+    address_normalized: str
+    location: dict
+    risk_score: float
+    created_at: str
+    updated_at: str
+
+
+class ViolationRow(TypedDict, total=False):
+    id: int
+    property_id: int
+    case_number: str
+    type: str
+    status: str
+    date: str
+    created_at: str
+
+
+class ReviewRow(TypedDict, total=False):
+    id: int
+    property_id: int
+    source: str
+    rating: float
+    created_at: str
+
+
+@dataclass
+class _Entry:
+    body: list | dict
+    etag: str | None
+    fetched_at: float
+
+
+class SupabaseClient:
+    """Thread-safe cached GET client for PostgREST tables and read-only RPCs."""
+
+    def __init__(
+        self,
+        base_url: str = API,
+        headers: dict[str, str] | None = None,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {k: v for k, v in (headers or HEADERS).items() if k.lower() != "prefer"}
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("requests", "hits", "misses", "revalidated", "coalesced", "evictions", "bytes"), 0
+        )
+
+    # ── Cache ───────────────────────────────────────────────────────────────
+
+    def _count(self, name: str, n: int = 1) -> None:
+        self._stats[name] += n
+        instrument.count(f"api_cache.{name}", n)
+
+    def get(self, path: str, params: list[tuple[str, str]] | dict | None = None):
+        """GET `path` (e.g. "violations") with query `params`, through the cache."""
+        query = urllib.parse.urlencode(params or [])
+        url = f"{self.base_url}/{path}" + (f"?{query}" if query else "")
+
+        with self._lock:
+            self._stats["requests"] += 1
+            entry = self._cache.get(url)
+            if entry is not None and time.monotonic() - entry.fetched_at < self.ttl_s:
+                self._cache.move_to_end(url)
+                self._count("hits")
+                return entry.body
+            pending = self._inflight.get(url)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[url] = Future()
+            else:
+                self._count("coalesced")
+        if not leader:
+            return pending.result()
+
+        try:
+            body = self._fetch(url, entry)
+            pending.set_result(body)
+            return body
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def _fetch(self, url: str, stale: _Entry | None):
+        headers = dict(self.headers)
+        if stale is not None and stale.etag:
+            headers["If-None-Match"] = stale.etag
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with instrument.span("http.get"), urllib.request.urlopen(req) as resp:
+                raw = resp.read()
+                etag = resp.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or stale is None:
+                raise
+            with self._lock:
+                stale.fetched_at = time.monotonic()
+                self._cache[url] = stale
+                self._cache.move_to_end(url)
+                self._count("revalidated")
+            return stale.body
+
+        body = json.loads(raw.decode("utf-8"))
+        with self._lock:
+            self._count("misses")
+            self._count("bytes", len(raw))
+            self._cache[url] = _Entry(body, etag, time.monotonic())
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self._count("evictions")
+        return body
+
+    def invalidate(self, path_prefix: str = "") -> int:
+        """Drop cached responses whose path starts with `path_prefix` (all if empty)."""
+        prefix = f"{self.base_url}/{path_prefix}"
+        with self._lock:
+            stale = [url for url in self._cache if url.startswith(prefix)]
+            for url in stale:
+                del self._cache[url]
+        return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._cache)
+        served = out["hits"] + out["revalidated"] + out["coalesced"]
+        out["hit_rate"] = round(served / out["requests"], 3) if out["requests"] else 0.0
+        return out
+
+    # ── Typed reads ─────────────────────────────────────────────────────────
+
+    def scan(self, table: str, select: str, filters: list[tuple[str, str]] | None = None) -> Iterator[dict]:
+        """Every row of `table` by keyset pagination on id, each page cached."""
+        last_id = 0
+        columns = select if select == "*" or "id" in select.split(",") else f"id,{select}"
+        while True:
+            rows = self.get(table, [
+                ("select", columns), ("order", "id"), ("limit", str(PAGE_SIZE)),
+                ("id", f"gt.{last_id}"), *(filters or []),
+            ])
+            yield from rows
+            if len(rows) < PAGE_SIZE:
+                return
+            last_id = rows[-1]["id"]
+
+    def properties_in_bounds(
+        self, min_lat: float, min_long: float, max_lat: float, max_long: float
+    ) -> list[PropertyRow]:
+        """Properties inside a bounding box (the properties_in_view RPC, called with GET)."""
+        return self.get("rpc/properties_in_view", {
+            "min_lat": min_lat, "min_long": min_long, "max_lat": max_lat, "max_long": max_long,
+        })
+
+    def violations_by_property(self, property_id: int, select: str = "*") -> list[ViolationRow]:
+        return list(self.scan("violations", select, [("property_id", f"eq.{property_id}")]))
+
+    def reviews_by_property(self, property_id: int, select: str = "*") -> list[ReviewRow]:
+        return list(self.scan("reviews", select, [("property_id", f"eq.{property_id}")]))
+
+
+_default: SupabaseClient | None = None
+
+
+def default_client() -> SupabaseClient:
+    """Process-wide client, so separate callers share one cache."""
+    global _default
+    if _default is None:
+        _default = SupabaseClient()
+    return _default
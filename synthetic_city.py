@@ -0,0 +1,409 @@
+"""
+synthetic_city.py — Seeded large-city datasets in the pipeline's input shapes.
+
+Generates a city of N properties and M code-violation cases and writes them
+the way the real sources arrive, so the pipeline can be exercised at scale:
+
+    davis_code_violations.csv   the city export ingest_city_data.py reads:
+                                column names drawn from COLUMN_ALIASES with
+                                random case / padding, extra columns it must
+                                ignore, abbreviated / shouted / unit-suffixed
+                                addresses, a share of malformed ones ("N/A",
+                                no house number, PO boxes, blanks), mixed date
+                                formats and status spellings, and re-exported
+                                duplicate cases
+    yelp_data.json              scrape_yelp.py's output: listings for a share
+                                of the properties, some listed twice under
+                                name variants
+    synthetic_seed.json         properties / violations / reviews shaped like
+                                seed_data.py, for generate_sql.py --seed-file
+
+Violations are spread over properties with a heavy tail (a few properties
+collect most cases), dates span 2010–2025. The same --seed always produces
+the same files.
+
+Usage:
+    python synthetic_city.py                                50k properties, 2M violations → synthetic/
+    python synthetic_city.py --properties 2000 --violations 40000 --out /tmp/city
+
+Options:
+    --properties N     Properties (default: 50000)
+    --violations N     Violation cases (default: 2000000)
+    --out DIR          Output directory (default: synthetic/)
+    --seed N           Random seed (default: 7)
+    --yelp-share F     Share of properties with a Yelp listing (default: 0.5)
+    --malformed F      Share of violation addresses that are malformed (default: 0.015)
+    --dup-rate F       Share of violation rows that re-export an earlier case (default: 0.02)
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+import instrument
+from address_maps import DIRECTIONAL_MAP, STREET_SUFFIX_MAP
+from ingest_city_data import COLUMN_ALIASES, DEFAULT_CSV
+from violation_classifier import BENCH_PHRASES, BENCH_PREFIXES, BENCH_SUFFIXES, classify
+
+
+YELP_FILE = "yelp_data.json"
+SEED_FILE = "synthetic_seed.json"
+DEFAULT_OUT = "synthetic"
+
+CITY = "Davis, CA 95616"
+BBOX = (-121.81, 38.52, -121.68, 38.58)          # min lon, min lat, max lon, max lat
+FIRST_DAY, LAST_DAY = np.datetime64("2010-01-01"), np.datetime64("2025-12-31")
+WRITE_CHUNK = 50_000
+
+STREET_BASES = (
+    "Sycamore", "Russell", "Anderson", "Olive", "Covell", "Alvarado", "Lake", "Oak", "Pole Line",
+    "Loyola", "Fifth", "Eighth", "Villanova", "Cowell", "Drummond", "Arthur", "Catalina",
+    "Wake Forest", "Shasta", "Alhambra", "Mace", "Picasso", "Monarch", "Glacier", "Moore",
+    "Hanover", "Lillard", "Cantrill", "Valdora", "Orchard Park", "La Rue", "Sage", "Tulip",
+    "Sequoia", "Madrone", "Cedar", "Birch", "Chestnut", "Elm", "Maple", "Walnut", "Hawthorn",
+    "Poppy", "Lupine", "Redbud", "Manzanita", "Buckeye", "Juniper", "Cypress", "Almond",
+)
+SUFFIXES = ("st", "ave", "blvd", "cir", "ct", "dr", "ln", "pl", "rd", "ter", "way", "pkwy")
+DIRECTIONS = ("", "", "", "n", "s", "e", "w")
+NAME_WORDS = ("Lexington", "Aggie", "Willow", "Arbor", "Orchard", "Parkside", "Greenbriar",
+              "University", "Tanglewood", "Saratoga", "Fountain", "Meadow", "Almondwood")
+NAME_KINDS = ("Apartments", "Village", "Place", "Commons", "Court", "Terrace", "Square", "Gardens")
+
+STATUSES = ("Open", "Closed", "closed", "CLOSED", "open ", "Pending", "Closed - Corrected")
+EXTRA_COLUMNS = ("Inspector", "Parcel_APN", "Notes", "Council District")
+REVIEW_SOURCES = ("yelp", "google", "apartments.com")
+
+
+@dataclass
+class City:
+    """Properties as parallel arrays; violations as parallel arrays of indexes."""
+    numbers: np.ndarray
+    streets: list[tuple[str, str, str]]          # (direction, base, suffix) abbreviations
+    street_of: np.ndarray
+    lon: np.ndarray
+    lat: np.ndarray
+    names: list[str]
+    # violations
+    prop: np.ndarray
+    day: np.ndarray
+    phrase: np.ndarray                           # index into prefix × phrase × suffix
+    status: np.ndarray
+    variant: np.ndarray                          # address rendering, −1 = malformed
+    unit: np.ndarray
+    case: np.ndarray
+    duplicate: np.ndarray
+
+
+def _canonical(city: City, p: int) -> str:
+    direction, base, suffix = city.streets[city.street_of[p]]
+    parts = [str(city.numbers[p])]
+    if direction:
+        parts.append(DIRECTIONAL_MAP[direction])
+    parts += [base, STREET_SUFFIX_MAP[suffix]]
+    return f"{' '.join(parts)}, {CITY}"
+
+
+def _raw_address(city: City, p: int, variant: int, unit: int) -> str:
+    """One of the ways a city or Yelp export spells the property's address."""
+    direction, base, suffix = city.streets[city.street_of[p]]
+    num = city.numbers[p]
+    d = f"{direction.upper()} " if direction else ""
+    if variant == 0:
+        return _canonical(city, p)
+    if variant == 1:
+        return f"{num} {d}{base} {suffix.title()}"
+    if variant == 2:
+        return f"{num} {d}{base.upper()} {suffix.upper()}."
+    if variant == 3:
+        return f"{num} {d}{base} {suffix.title()} Apt {unit}"
+    if variant == 4:
+        return f"{num} {d}{base} {suffix.title()} #{unit}, Davis CA"
+    if variant == 5:
+        return f"  {num}  {d}{base}   {STREET_SUFFIX_MAP[suffix]}  davis ca 95616 "
+    return f"{num} {d.lower()}{base.lower()} {suffix}"
+
+
+N_VARIANTS = 7
+MALFORMED = (
+    lambda num, base, suffix: "",
+    lambda num, base, suffix: "N/A",
+    lambda num, base, suffix: f"{base} {suffix.title()}",
+    lambda num, base, suffix: str(num),
+    lambda num, base, suffix: f"PO Box {num}",
+    lambda num, base, suffix: f"{num} {base}",
+)
+
+
+def _malformed(city: City, p: int, which: int) -> str:
+    _, base, suffix = city.streets[city.street_of[p]]
+    return MALFORMED[which % len(MALFORMED)](city.numbers[p], base, suffix)
+
+
+def _violation_type(i: int) -> str:
+    n_suf = len(BENCH_SUFFIXES)
+    n_phr = len(BENCH_PHRASES)
+    pre, rest = divmod(int(i), n_phr * n_suf)
+    phr, suf = divmod(rest, n_suf)
+    text = f"{BENCH_PREFIXES[pre]}{BENCH_PHRASES[phr]}{BENCH_SUFFIXES[suf]}"
+    return text[0].upper() + text[1:]
+
+
+# ── Generation ─────────────────────────────────────────────────────────────────
+
+def generate(
+    n_properties: int,
+    n_violations: int,
+    seed: int = 7,
+    malformed: float = 0.015,
+    dup_rate: float = 0.02,
+) -> City:
+    rng = np.random.default_rng(seed)
+    streets = [
+        (d, b, s) for b in STREET_BASES for s in SUFFIXES for d in dict.fromkeys(DIRECTIONS)
+    ]
+    rng.shuffle(streets)
+    # Roughly 40 properties per street, never fewer streets than needed for
+    # unique (number, street) pairs.
+    streets = streets[:max(20, min(len(streets), n_properties // 40))]
+    street_of = rng.integers(0, len(streets), n_properties)
+    numbers = rng.integers(1, 10_000, n_properties)
+    # Collisions of (number, street) would merge two properties; nudge them apart.
+    key = street_of.astype(np.int64) * 100_000 + numbers
+    _, first = np.unique(key, return_index=True)
+    clash = np.setdiff1d(np.arange(n_properties), first)
+    numbers[clash] += 10_000 + np.arange(len(clash))
+
+    names = [
+        f"{NAME_WORDS[a]} {NAME_KINDS[b]} {i + 1}"
+        for i, (a, b) in enumerate(zip(
+            rng.integers(0, len(NAME_WORDS), n_properties),
+            rng.integers(0, len(NAME_KINDS), n_properties),
+        ))
+    ]
+
+    # Heavy tail: Pareto weights, so a few properties collect most cases.
+    weights = rng.pareto(1.2, n_properties) + 0.05
+    prop = rng.choice(n_properties, size=n_violations, p=weights / weights.sum())
+    span = int((LAST_DAY - FIRST_DAY).astype(int))
+    n_types = len(BENCH_PREFIXES) * len(BENCH_PHRASES) * len(BENCH_SUFFIXES)
+    variant = rng.integers(0, N_VARIANTS, n_violations)
+    variant[rng.random(n_violations) < malformed] = -1
+    case = np.arange(n_violations)
+    duplicate = rng.random(n_violations) < dup_rate
+    duplicate[0] = False
+    # A re-exported case repeats the case number and property of an earlier
+    # original (non-duplicate) row.
+    dup_idx = np.flatnonzero(duplicate)
+    originals = np.flatnonzero(~duplicate)
+    before = np.searchsorted(originals, dup_idx)
+    earlier = originals[(rng.random(len(dup_idx)) * before).astype(np.int64)]
+    case[dup_idx] = earlier
+    prop[dup_idx] = prop[earlier]
+
+    return City(
+        numbers=numbers,
+        streets=streets,
+        street_of=street_of,
+        lon=rng.uniform(BBOX[0], BBOX[2], n_properties).round(6),
+        lat=rng.uniform(BBOX[1], BBOX[3], n_properties).round(6),
+        names=names,
+        prop=prop,
+        day=rng.integers(0, span + 1, n_violations),
+        phrase=rng.integers(0, n_types, n_violations),
+        status=rng.integers(0, len(STATUSES), n_violations),
+        variant=variant,
+        unit=rng.integers(1, 400, n_violations),
+        case=case,
+        duplicate=duplicate,
+    )
+
+
+def _iso_dates(days: np.ndarray) -> list[str]:
+    return np.datetime_as_string(FIRST_DAY + days.astype("timedelta64[D]")).tolist()
+
+
+def _case_number(case: int, iso: str) -> str:
+    return f"CE{iso[2:4]}-{case:07d}"
+
+
+# ── Writers ────────────────────────────────────────────────────────────────────
+
+def write_violations_csv(city: City, path: str, seed: int = 7) -> int:
+    """The city export, with aliased headers and messy values."""
+    rng = np.random.default_rng(seed + 1)
+
+    def header(field: str) -> str:
+        alias = COLUMN_ALIASES[field][rng.integers(0, len(COLUMN_ALIASES[field]))]
+        return rng.choice([alias, alias.upper(), alias.title(), f" {alias} "])
+
+    fields = ["case_number", "address", "violation_type", "date", "status"]
+    columns = [header(f) for f in fields] + list(EXTRA_COLUMNS)
+    date_style = rng.random(len(city.prop))
+    # Dates keep the original case's date on a re-export.
+    iso = _iso_dates(city.day[city.case])
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for start in range(0, len(city.prop), WRITE_CHUNK):
+            rows = []
+            for i in range(start, min(start + WRITE_CHUNK, len(city.prop))):
+                p = int(city.prop[i])
+                v = int(city.variant[i])
+                d = iso[i]
+                style = date_style[i]
+                if style < 0.25:
+                    shown_date = f"{int(d[5:7])}/{int(d[8:10])}/{d[:4]}"
+                elif style < 0.28:
+                    shown_date = ""
+                elif style < 0.29:
+                    shown_date = "TBD"
+                else:
+                    shown_date = d
+                rows.append([
+                    _case_number(int(city.case[i]), d),
+                    _raw_address(city, p, v, int(city.unit[i])) if v >= 0 else _malformed(city, p, i),
+                    _violation_type(city.phrase[i]),
+                    shown_date,
+                    STATUSES[city.status[i]],
+                    f"INSP-{i % 37:02d}",
+                    f"{p:03d}-{p % 97:03d}-0{p % 10}",
+                    "",
+                    str(1 + p % 5),
+                ])
+            writer.writerows(rows)
+            written += len(rows)
+    return written
+
+
+def write_yelp(city: City, path: str, share: float = 0.5, seed: int = 7) -> int:
+    """scrape_yelp.py-shaped listings for `share` of the properties."""
+    rng = np.random.default_rng(seed + 2)
+    n = len(city.names)
+    listed = np.flatnonzero(rng.random(n) < share)
+    relisted = listed[rng.random(len(listed)) < 0.05]
+    ratings = [None, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]
+    listings = []
+    for p in np.concatenate((listed, relisted)).tolist():
+        name = city.names[p]
+        if len(listings) >= len(listed):                 # a re-listing under a variant name
+            name = rng.choice([f"The {name}", name.replace(" Apartments", ""), f"{name} Apts"])
+        listings.append({
+            "property_name": name,
+            "address": _raw_address(city, p, int(rng.integers(0, N_VARIANTS)), int(rng.integers(1, 400))),
+            "star_rating": ratings[rng.integers(0, len(ratings))],
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(listings, f, indent=2, ensure_ascii=False)
+    return len(listings)
+
+
+def write_seed(city: City, path: str, seed: int = 7) -> int:
+    """seed_data.py-shaped JSON for generate_sql.py --seed-file, streamed per property."""
+    rng = np.random.default_rng(seed + 3)
+    n = len(city.names)
+    keep = np.flatnonzero(~city.duplicate)
+    counts = np.bincount(city.prop[keep], minlength=n)
+    risk = np.minimum(10.0, np.log1p(counts) * 1.6).round(1)
+    order = keep[np.argsort(city.prop[keep], kind="stable")]
+    bounds = np.searchsorted(city.prop[order], np.arange(n + 1))
+    iso = _iso_dates(city.day)
+    status_of = ["open" if s.strip().lower() in ("open", "pending") else "closed" for s in STATUSES]
+    category: dict[int, str] = {}
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n"properties": [\n')
+        for p in range(n):
+            f.write(",\n" if p else "")
+            f.write(json.dumps({
+                "name": city.names[p],
+                "address_normalized": _canonical(city, p),
+                "location": f"SRID=4326;POINT({city.lon[p]} {city.lat[p]})",
+                "risk_score": float(risk[p]),
+            }, ensure_ascii=False))
+        f.write('\n],\n"violations": {\n')
+        for p in range(n):
+            rows = []
+            for i in order[bounds[p]:bounds[p + 1]].tolist():
+                t = int(city.phrase[i])
+                if t not in category:
+                    category[t] = classify(_violation_type(t)).category
+                rows.append({
+                    "case_number": _case_number(int(city.case[i]), iso[i]),
+                    "type": category[t],
+                    "status": status_of[city.status[i]],
+                    "date": iso[i],
+                })
+            f.write(",\n" if p else "")
+            f.write(f"{json.dumps(city.names[p])}: {json.dumps(rows, ensure_ascii=False)}")
+        f.write('\n},\n"reviews": {\n')
+        for p in range(n):
+            reviews = [
+                {"source": REVIEW_SOURCES[j], "rating": float(rng.integers(2, 11)) / 2}
+                for j in range(int(rng.integers(0, len(REVIEW_SOURCES) + 1)))
+            ]
+            f.write(",\n" if p else "")
+            f.write(f"{json.dumps(city.names[p])}: {json.dumps(reviews)}")
+        f.write("\n}\n}\n")
+    return n
+
+
+def write_all(
+    out: str,
+    n_properties: int,
+    n_violations: int,
+    seed: int = 7,
+    yelp_share: float = 0.5,
+    malformed: float = 0.015,
+    dup_rate: float = 0.02,
+) -> dict[str, int]:
+    """Generate a city and write all three files into `out`; returns rows per file."""
+    os.makedirs(out, exist_ok=True)
+    with instrument.span("synthetic.generate"):
+        city = generate(n_properties, n_violations, seed, malformed, dup_rate)
+    written = {}
+    with instrument.span("synthetic.csv"):
+        written[DEFAULT_CSV] = write_violations_csv(city, os.path.join(out, DEFAULT_CSV), seed)
+    with instrument.span("synthetic.yelp"):
+        written[YELP_FILE] = write_yelp(city, os.path.join(out, YELP_FILE), yelp_share, seed)
+    with instrument.span("synthetic.seed"):
+        written[SEED_FILE] = write_seed(city, os.path.join(out, SEED_FILE), seed)
+    return written
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Generate a synthetic large-city dataset",
+    )
+    parser.add_argument("--properties", type=int, default=50_000, help="Properties (default: 50000)")
+    parser.add_argument("--violations", type=int, default=2_000_000, help="Violation cases (default: 2000000)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"Output directory (default: {DEFAULT_OUT}/)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed (default: 7)")
+    parser.add_argument("--yelp-share", type=float, default=0.5, help="Share of properties listed on Yelp")
+    parser.add_argument("--malformed", type=float, default=0.015, help="Share of malformed violation addresses")
+    parser.add_argument("--dup-rate", type=float, default=0.02, help="Share of re-exported duplicate cases")
+    args = parser.parse_args()
+
+    print("synthetic_city.py — Synthetic city dataset\n")
+    print(f"Generating {args.properties:,} properties and {args.violations:,} violations "
+          f"(seed {args.seed}) → {args.out}/")
+    start = time.perf_counter()
+    written = write_all(
+        args.out, args.properties, args.violations, args.seed,
+        args.yelp_share, args.malformed, args.dup_rate,
+    )
+    for name, rows in written.items():
+        path = os.path.join(args.out, name)
+        print(f"  ✓ {name:<26} {rows:>10,} rows  {os.path.getsize(path) / 1e6:>8.1f} MB")
+    print(f"\nDone in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "synthetic_city")
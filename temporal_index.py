@@ -0,0 +1,270 @@
+"""
+temporal_index.py — Rolling-window violation analytics per property.
+
+Builds one time index over every violation: rows are grouped by property
+and sorted by date, and each row gets the composite key
+`group × STRIDE + day`, so the whole index is a single sorted NumPy array.
+A window [start, end] for *every* property is then two vectorized
+`searchsorted` calls, and "the last violation on or before a date" is one
+more — no per-property Python loop.
+
+For each property, as of a date (default today):
+
+    violations_90d / _1y / _3y   violations in the last 90 / 365 / 1095 days
+    open_3y                      open violations in the last 3 years (the
+                                 PRD's "last 3 years" window)
+    trend_1y                     last 365 days minus the 365 days before
+    last_violation_date          most recent violation on or before as_of
+    days_since_last              as_of − last_violation_date
+
+Properties are keyed by `property_id` when the violations carry one
+(spatial_join.py, or the violations table) and by normalized address
+otherwise.
+
+Usage:
+    python temporal_index.py                       From normalized_violations.json
+    python temporal_index.py --as-of 2024-12-31
+    python temporal_index.py --remote --write      From / to Supabase
+    python temporal_index.py --benchmark           1M violations × 100k properties
+
+Options:
+    --as-of DATE     Evaluate the windows as of DATE (YYYY-MM-DD)
+    --output FILE    Where to write the rows (default: violation_timeline.json)
+    --remote         Read violations from Supabase instead of the local file
+    --write          Store the rows via the apply_violation_windows RPC
+                     (needs property ids, i.e. --remote or a spatially joined file)
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+import instrument
+from json_records import iter_json_array
+from match_index import date_key
+from violation_classifier import is_open
+
+
+VIOLATIONS_FILE = "normalized_violations.json"
+OUTPUT_FILE = "violation_timeline.json"
+
+WINDOWS_DAYS = {"violations_90d": 90, "violations_1y": 365, "violations_3y": 1095}
+OPEN_WINDOW_DAYS = 1095
+TREND_DAYS = 365
+WRITE_BATCH = 1000
+
+# Day numbers (days since 1970-01-01) stay far below this for any real date.
+STRIDE = 1 << 32
+
+
+def day_number(d: date | str) -> int:
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+class TemporalIndex:
+    """Violations of many properties, sorted by (property, date)."""
+
+    def __init__(self, keys: list, dates: list[str | None], open_flags: list[bool] | None = None):
+        memo: dict[str, int | None] = {}
+        days = np.empty(len(dates), dtype=np.int64)
+        valid = np.ones(len(dates), dtype=bool)
+        for i, raw in enumerate(dates):
+            if raw not in memo:
+                iso = date_key(raw)
+                memo[raw] = day_number(iso) if iso else None
+            d = memo[raw]
+            if d is None:
+                valid[i] = False
+            else:
+                days[i] = d
+        self.skipped = int((~valid).sum())
+
+        key_array = np.array(keys, dtype=object)[valid]
+        self.keys, first, group = np.unique(
+            key_array.astype(str), return_index=True, return_inverse=True
+        )
+        # The original key values (ints stay ints), for output.
+        self.key_values = key_array[first].tolist()
+
+        composite = group.astype(np.int64) * STRIDE + days[valid]
+        order = np.argsort(composite, kind="stable")
+        self.composite = composite[order]
+        if open_flags is None:
+            opened = np.zeros(len(composite), dtype=bool)
+        else:
+            opened = np.asarray(open_flags, dtype=bool)[valid]
+        self._open_cum = np.concatenate(([0], np.cumsum(opened[order])))
+        self._base = np.arange(len(self.keys), dtype=np.int64) * STRIDE
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _bounds(self, start_day: int, end_day: int) -> tuple[np.ndarray, np.ndarray]:
+        lo = np.searchsorted(self.composite, self._base + start_day, side="left")
+        hi = np.searchsorted(self.composite, self._base + end_day, side="right")
+        return lo, hi
+
+    def count_between(self, start_day: int, end_day: int) -> np.ndarray:
+        """Violations per property with start_day ≤ day ≤ end_day."""
+        lo, hi = self._bounds(start_day, end_day)
+        return hi - lo
+
+    def open_between(self, start_day: int, end_day: int) -> np.ndarray:
+        lo, hi = self._bounds(start_day, end_day)
+        return self._open_cum[hi] - self._open_cum[lo]
+
+    def last_day(self, as_of_day: int) -> np.ndarray:
+        """Day number of each property's latest violation on or before as_of (−1 if none)."""
+        pos = np.searchsorted(self.composite, self._base + as_of_day, side="right") - 1
+        group_start = np.searchsorted(self.composite, self._base, side="left")
+        has = pos >= group_start
+        return np.where(has, self.composite[np.maximum(pos, 0)] - self._base, -1)
+
+    def windows(self, as_of: date | str) -> dict[str, np.ndarray]:
+        """Every analytic for every property, as arrays aligned with self.keys."""
+        end = day_number(as_of)
+        out = {
+            name: self.count_between(end - days + 1, end)
+            for name, days in WINDOWS_DAYS.items()
+        }
+        out["open_3y"] = self.open_between(end - OPEN_WINDOW_DAYS + 1, end)
+        recent = self.count_between(end - TREND_DAYS + 1, end)
+        prior = self.count_between(end - 2 * TREND_DAYS + 1, end - TREND_DAYS)
+        out["trend_1y"] = recent - prior
+        last = self.last_day(end)
+        out["last_day"] = last
+        out["days_since_last"] = np.where(last >= 0, end - last, -1)
+        return out
+
+    def rows(self, as_of: date | str, key_name: str = "property_id") -> list[dict]:
+        """windows() as one dict per property, ready for JSON or the RPC."""
+        w = self.windows(as_of)
+        as_of_iso = str(np.datetime64(as_of, "D"))
+        last_iso = np.datetime_as_string(np.maximum(w["last_day"], 0).astype("datetime64[D]"))
+        rows = []
+        for i, key in enumerate(self.key_values):
+            has_last = w["last_day"][i] >= 0
+            row = {key_name: key, "as_of": as_of_iso}
+            for name in (*WINDOWS_DAYS, "open_3y", "trend_1y"):
+                row[name] = int(w[name][i])
+            row["last_violation_date"] = str(last_iso[i]) if has_last else None
+            row["days_since_last"] = int(w["days_since_last"][i]) if has_last else None
+            rows.append(row)
+        return rows
+
+
+def from_records(records: list[dict]) -> tuple[TemporalIndex, str]:
+    """Index violation records; returns the index and the key field used."""
+    has_ids = any(r.get("property_id") is not None for r in records)
+    key_name = "property_id" if has_ids else "normalized_address"
+    kept = [r for r in records if r.get(key_name) not in (None, "")]
+    index = TemporalIndex(
+        [r[key_name] for r in kept],
+        [r.get("date") for r in kept],
+        [is_open(r.get("status")) for r in kept],
+    )
+    return index, key_name
+
+
+def fetch_remote() -> list[dict]:
+    # Imported here so the local path doesn't need Supabase settings.
+    from risk_score import fetch_all
+    return list(fetch_all("violations", "property_id,date,status"))
+
+
+def write_rows(rows: list[dict]) -> int:
+    """
+    Store rows via apply_violation_windows in WRITE_BATCH-sized calls; exits
+    non-zero on the first batch that fails.
+    """
+    from supabase_api import rpc_count
+    written = 0
+    for i in range(0, len(rows), WRITE_BATCH):
+        written += rpc_count("apply_violation_windows", {"rows": rows[i:i + WRITE_BATCH]})
+    return written
+
+
+def benchmark(n_properties: int, n_violations: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(1, n_properties + 1, n_violations).tolist()
+    start_day = day_number("2015-01-01")
+    days = rng.integers(start_day, start_day + 3650, n_violations)
+    dates = np.datetime_as_string(days.astype("datetime64[D]")).tolist()
+    opened = (rng.random(n_violations) < 0.3).tolist()
+
+    print(f"Indexing {n_violations:,} violations over {n_properties:,} properties…")
+    t0 = time.perf_counter()
+    index = TemporalIndex(keys, dates, opened)
+    built = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    w = index.windows("2024-12-31")
+    queried = time.perf_counter() - t0
+    print(f"  • build:   {built:.2f}s")
+    print(f"  • windows: {queried * 1000:.1f} ms for all {len(index):,} properties "
+          f"(mean {w['violations_1y'].mean():.2f} violations in the last year)")
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Rolling-window violation analytics per property",
+    )
+    parser.add_argument("--as-of", default=date.today().isoformat(), help="Evaluate as of DATE")
+    parser.add_argument("--input", default=VIOLATIONS_FILE, help="Violations JSON file")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Where to write the rows")
+    parser.add_argument("--remote", action="store_true", help="Read violations from Supabase")
+    parser.add_argument("--write", action="store_true", help="Store rows via apply_violation_windows")
+    parser.add_argument("--benchmark", action="store_true", help="Time synthetic data instead")
+    args = parser.parse_args()
+
+    print("temporal_index.py — Violation time windows for LeaseLens\n")
+    if args.benchmark:
+        benchmark(100_000, 1_000_000)
+        return
+
+    try:
+        as_of = date.fromisoformat(args.as_of)
+    except ValueError:
+        print(f"✗ --as-of must be YYYY-MM-DD, got {args.as_of!r}")
+        sys.exit(1)
+
+    if args.remote:
+        print("Fetching violations from Supabase…")
+        records = fetch_remote()
+    else:
+        try:
+            records = list(iter_json_array(args.input))
+        except FileNotFoundError:
+            print(f"  ⚠  {args.input} not found — run normalize_data.py first.")
+            sys.exit(1)
+
+    with instrument.span("temporal_index.build"):
+        index, key_name = from_records(records)
+    with instrument.span("temporal_index.windows"):
+        rows = index.rows(as_of, key_name)
+    print(f"  • {len(records)} violations → {len(rows)} properties (by {key_name}), as of {as_of}")
+    if index.skipped:
+        print(f"  ⚠ {index.skipped} violation(s) without a readable date skipped")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+    print(f"  ✓ Saved {len(rows)} rows → {args.output}")
+
+    if args.write:
+        if key_name != "property_id":
+            print("  ✗ Violations have no property_id — run spatial_join.py first or use --remote")
+            sys.exit(1)
+        else:
+            written = write_rows(rows)
+            print(f"  ✓ apply_violation_windows wrote {written} row(s)")
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "temporal_index")
@@ -5,128 +5,513 @@ Usage:
     python view_data.py yelp          Show normalized Yelp listings
     python view_data.py violations    Show normalized violation records
     python view_data.py matches       Show addresses appearing in both datasets
-    python view_data.py all           Show all three views
+    python view_data.py all           Show all three views (--format json:
+                                      one object keyed by view)
+    python view_data.py report        Aggregate statistics (counts by type,
+                                      status and year, worst addresses,
+                                      Yelp rating distribution)
+    python view_data.py search --query "sycamore ln"
+                                      Fuzzy search over listing names and
+                                      addresses (trigram index)
+    python view_data.py timeline      Violations per address in the last
+                                      90 days / 1 year / 3 years, trend and
+                                      time since the last one (as of
+                                      --until, default today)
+
+The matches view reads match_index.sqlite (written by normalize_data.py) when
+it is current, and falls back to joining the JSON files in memory otherwise.
+Unfiltered reads go through the memory-mapped sidecars of record_cache.py
+(normalized_*.json.rcache), built on first use and rebuilt when a JSON file
+changes; LEASELENS_RECORD_CACHE=off reads the JSON files directly.
 
 Options:
-    --format FORMAT    Table format: grid (default), simple, github, html
+    --format FORMAT    Table format: grid (default), simple, github, html,
+                       or csv / json for machine-readable output
+    --limit N          Show at most N rows (report: top-N worst addresses,
+                       default 10; 0 lists every address; search: default 20)
+    --offset N         Skip the first N rows
+    --stream           Read records lazily and print the table in pages
+    --page-size N      Rows per page in --stream mode (default: 100)
+    --query TEXT       Search text for the search view
+
+Filters (combinable; use the match index when it is current):
+    --since DATE       Violations on or after DATE (YYYY, YYYY-MM, YYYY-MM-DD)
+    --until DATE       Violations on or before DATE
+    --type TYPE        Violation type, case-insensitive (repeatable)
+    --street PREFIX    Street-name prefix, e.g. "Sycamore Ln"
+    --address PREFIX   Normalized-address prefix, e.g. "600 Sycamore"
+    --min-rating N     Minimum Yelp star rating
+
+Example:
+    python view_data.py violations --street sycamore --since 2023 --type Plumbing/Mold
 """
 
 import argparse
+import calendar
+import csv
+import io
 import json
+import os
+import sqlite3
 import sys
+from collections.abc import Iterable, Iterator
+from contextlib import redirect_stdout
+from dataclasses import dataclass, replace
+from datetime import date
+from itertools import islice
 
-from tabulate import tabulate
+import instrument
+import match_index
+from address_maps import query_key
+from record_cache import iter_cached
 
 
 # ── File paths (normalized output from normalize_data.py) ──────────────────────
 YELP_FILE = "normalized_yelp.json"
 VIOLATIONS_FILE = "normalized_violations.json"
 
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_REPORT_TOP = 10
+DEFAULT_SEARCH_LIMIT = 20
+
+TABLE_FORMATS = ("grid", "simple", "github", "html")
+DATA_FORMATS = ("csv", "json")
+
+
+@dataclass(frozen=True)
+class ViewOptions:
+    """Rendering options shared by every view."""
+    fmt: str = "grid"
+    limit: int | None = None
+    offset: int = 0
+    stream: bool = False
+    page_size: int = DEFAULT_PAGE_SIZE
+    filters: match_index.RecordFilter = match_index.RecordFilter()
+    query: str | None = None
+
+
+def iter_json(path: str) -> Iterator[dict] | None:
+    """
+    Lazily iterate a JSON array file, through its record_cache.py sidecar.
+    Returns None if the file is missing.
+    """
+    try:
+        records = iter_cached(path)
+        first = next(records, None)
+    except FileNotFoundError:
+        print(f"⚠  {path} not found. Run the pipeline first.\n", file=sys.stderr)
+        return None
+    if first is None:
+        return None
+
+    def chained() -> Iterator[dict]:
+        yield first
+        yield from records
+
+    return chained()
+
 
 def load_json(path: str) -> list[dict]:
     """Load a JSON array from a file. Returns [] on failure."""
+    records = iter_json(path)
+    return list(records) if records is not None else []
+
+
+def _open_current_index(*sources: tuple[str, str]) -> sqlite3.Connection | None:
+    """Open the match index if it is up to date with every (source, path) given."""
+    conn = match_index.open_existing_index()
+    if conn is None:
+        return None
+    if all(match_index.is_current(conn, source, path) for source, path in sources):
+        return conn
+    conn.close()
+    print(f"⚠  {match_index.INDEX_FILE} is out of date — falling back to a full scan. "
+          "Re-run normalize_data.py or match_index.py to rebuild it.\n", file=sys.stderr)
+    return None
+
+
+def _closing(conn: sqlite3.Connection, records: Iterator) -> Iterator:
+    """Yield from `records`, closing `conn` once they are exhausted."""
     try:
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"⚠  {path} not found. Run the pipeline first.\n")
-        return []
+        yield from records
+    finally:
+        conn.close()
+
+
+def iter_records(source: str, path: str, opts: ViewOptions) -> Iterator[dict] | None:
+    """
+    Records of one dataset with `opts.filters` applied. Filtered reads go
+    through the index's secondary keys when it is current and fall back to a
+    full scan otherwise.
+    """
+    flt = opts.filters
+    if flt.is_empty():
+        return iter_json(path)
+
+    conn = _open_current_index((source, path))
+    if conn is not None:
+        return _closing(conn, match_index.iter_filtered(conn, source, path, flt))
+
+    records = iter_json(path)
+    if records is None:
+        return None
+    return (r for r in records if flt.accepts(source, r))
+
+
+# ── Rendering ──────────────────────────────────────────────────────────────────
+
+def _banner(title: str, opts: ViewOptions) -> None:
+    if opts.fmt in DATA_FORMATS:
+        return
+    print("═" * 70)
+    print(f"  {title}")
+    print("═" * 70)
+
+
+def _footer(text: str, opts: ViewOptions) -> None:
+    """Print a summary line under a table; omitted for CSV / JSON output."""
+    if opts.fmt not in DATA_FORMATS:
+        print(f"\n  {text}\n")
+
+
+def _write_csv(headers: list[str], rows: Iterable[list]) -> int:
+    writer = csv.writer(sys.stdout)
+    writer.writerow(headers)
+    shown = 0
+    for row in rows:
+        writer.writerow(row)
+        shown += 1
+    return shown
+
+
+def _json_default(value):
+    """Serialise numpy scalars (from the report's DataFrames) and anything else as text."""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _write_json(headers: list[str], rows: Iterable[list]) -> int:
+    """Write rows as a JSON array of objects, one element per line, as they arrive."""
+    shown = 0
+    sys.stdout.write("[")
+    for row in rows:
+        sys.stdout.write(",\n" if shown else "\n")
+        sys.stdout.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False, default=_json_default))
+        shown += 1
+    sys.stdout.write("\n]\n" if shown else "]\n")
+    return shown
+
+
+def tabulate(rows: Iterable[list], headers: list[str], tablefmt: str) -> str:
+    # tabulate takes ~25 ms to import; only table output needs it.
+    from tabulate import tabulate as _tabulate
+    return _tabulate(rows, headers=headers, tablefmt=tablefmt)
+
+
+def _window(rows: Iterable[list], opts: ViewOptions) -> Iterator[list]:
+    """Apply --offset / --limit to a row stream without materialising it."""
+    stop = None if opts.limit is None else opts.offset + opts.limit
+    return islice(rows, opts.offset, stop)
+
+
+def _render(
+    title: str,
+    headers: list[str],
+    rows: Iterable[list],
+    opts: ViewOptions,
+) -> int:
+    """
+    Print `rows` under a banner and return how many were shown.
+
+    In stream mode rows are pulled and printed `page_size` at a time, so the
+    first page appears as soon as it has been read regardless of file size.
+    """
+    rows = _window(rows, opts)
+    _banner(title, opts)
+
+    if opts.fmt == "csv":
+        return _write_csv(headers, rows)
+    if opts.fmt == "json":
+        return _write_json(headers, rows)
+
+    if not opts.stream:
+        table = list(rows)
+        print(tabulate(table, headers=headers, tablefmt=opts.fmt))
+        return len(table)
+
+    shown = 0
+    while True:
+        page = list(islice(rows, opts.page_size))
+        if not page:
+            break
+        if shown:
+            print()
+        print(tabulate(page, headers=headers, tablefmt=opts.fmt))
+        sys.stdout.flush()
+        shown += len(page)
+    return shown
 
 
 # ── View functions ─────────────────────────────────────────────────────────────
 
-def view_yelp(fmt: str) -> None:
+def view_yelp(opts: ViewOptions) -> None:
     """Display normalized Yelp apartment data."""
-    data = load_json(YELP_FILE)
-    if not data:
+    data = iter_records(match_index.YELP_SOURCE, YELP_FILE, opts)
+    if data is None:
         return
 
-    rows = [
+    rows = (
         [
             r.get("property_name", "—"),
             r.get("normalized_address") or r.get("address", "—"),
             r.get("star_rating", "—"),
         ]
         for r in data
-    ]
+    )
 
-    print("═" * 70)
-    print("  YELP APARTMENTS — Davis, CA")
-    print("═" * 70)
-    print(tabulate(rows, headers=["Property Name", "Address", "Rating"], tablefmt=fmt))
-    print(f"\n  {len(rows)} listing(s)\n")
+    shown = _render(
+        "YELP APARTMENTS — Davis, CA",
+        ["Property Name", "Address", "Rating"],
+        rows,
+        opts,
+    )
+    _footer(f"{shown} listing(s)", opts)
 
 
-def view_violations(fmt: str) -> None:
+def view_violations(opts: ViewOptions) -> None:
     """Display normalized violation data."""
-    data = load_json(VIOLATIONS_FILE)
-    if not data:
+    data = iter_records(match_index.VIOLATIONS_SOURCE, VIOLATIONS_FILE, opts)
+    if data is None:
         return
 
-    rows = [
+    rows = (
         [
             r.get("normalized_address") or r.get("address", "—"),
             r.get("violation_type", "—"),
             r.get("date", "—"),
         ]
         for r in data
-    ]
+    )
 
-    print("═" * 70)
-    print("  CODE COMPLIANCE VIOLATIONS — Davis, CA")
-    print("═" * 70)
-    print(tabulate(rows, headers=["Address", "Violation Type", "Date"], tablefmt=fmt))
-    print(f"\n  {len(rows)} violation(s)\n")
+    shown = _render(
+        "CODE COMPLIANCE VIOLATIONS — Davis, CA",
+        ["Address", "Violation Type", "Date"],
+        rows,
+        opts,
+    )
+    _footer(f"{shown} violation(s)", opts)
 
 
-def view_matches(fmt: str) -> None:
-    """Display addresses that appear in both datasets."""
+def _matches_by_scan(opts: ViewOptions) -> tuple[Iterable[tuple[str, dict, dict]], set[str]] | None:
+    """
+    Join the two datasets in memory. Used when the match index is missing
+    or older than the normalized files.
+
+    The Yelp side is small and is loaded up front; violations are streamed
+    and joined against it. In stream mode rows come out in violation-file
+    order instead of being grouped by address.
+    """
     yelp = load_json(YELP_FILE)
-    violations = load_json(VIOLATIONS_FILE)
+    violations = iter_json(VIOLATIONS_FILE)
 
-    if not yelp or not violations:
-        print("⚠  Both datasets are needed for matching.\n")
-        return
+    if not yelp or violations is None:
+        return None
 
+    flt = opts.filters
     yelp_addrs = {
-        (r.get("normalized_address") or "").lower(): r for r in yelp
+        (r.get("normalized_address") or "").lower(): r
+        for r in yelp
+        if flt.accepts(match_index.YELP_SOURCE, r)
     }
-    viol_by_addr: dict[str, list[dict]] = {}
-    for r in violations:
-        key = (r.get("normalized_address") or "").lower()
-        if key:
-            viol_by_addr.setdefault(key, []).append(r)
-
-    common = sorted(set(yelp_addrs.keys()) & set(viol_by_addr.keys()) - {""})
-
-    if not common:
-        print("═" * 70)
-        print("  ADDRESS MATCHES")
-        print("═" * 70)
-        print("  No matching addresses found between the two datasets.\n")
-        return
+    yelp_addrs.pop("", None)
+    matched_addrs: set[str] = set()
+
+    def matched_rows() -> Iterator[tuple[str, dict, dict]]:
+        for v in violations:
+            key = (v.get("normalized_address") or "").lower()
+            yelp_rec = yelp_addrs.get(key)
+            if yelp_rec is not None and flt.accepts(match_index.VIOLATIONS_SOURCE, v):
+                matched_addrs.add(key)
+                yield key, yelp_rec, v
+
+    matches: Iterable[tuple[str, dict, dict]] = matched_rows()
+    if not opts.stream:
+        matches = sorted(matches, key=lambda m: m[0])
+    return matches, matched_addrs
 
-    rows = []
-    for addr in common:
-        yelp_rec = yelp_addrs[addr]
-        viol_list = viol_by_addr[addr]
-        for v in viol_list:
-            rows.append([
+
+def view_matches(opts: ViewOptions) -> None:
+    """Display addresses that appear in both datasets."""
+    conn = _open_current_index(
+        (match_index.YELP_SOURCE, YELP_FILE),
+        (match_index.VIOLATIONS_SOURCE, VIOLATIONS_FILE),
+    )
+    try:
+        if conn is not None:
+            matched_addrs = set(match_index.matched_addresses(conn, opts.filters))
+            matches: Iterable[tuple[str, dict, dict]] = match_index.iter_matches(
+                conn, YELP_FILE, VIOLATIONS_FILE, opts.filters,
+            )
+        else:
+            scanned = _matches_by_scan(opts)
+            if scanned is None:
+                print("⚠  Both datasets are needed for matching.\n", file=sys.stderr)
+                return
+            matches, matched_addrs = scanned
+
+        rows = (
+            [
                 yelp_rec.get("property_name", "—"),
                 addr.title(),
                 v.get("violation_type", "—"),
                 v.get("date", "—"),
-            ])
+            ]
+            for addr, yelp_rec, v in matches
+        )
+
+        if (conn is not None or not opts.stream) and not matched_addrs and opts.fmt not in DATA_FORMATS:
+            _banner("ADDRESS MATCHES", opts)
+            print("  No matching addresses found between the two datasets.\n")
+            return
+
+        shown = _render(
+            "ADDRESS MATCHES — Properties with Violations",
+            ["Property", "Address", "Violation", "Date"],
+            rows,
+            opts,
+        )
+        _footer(f"{shown} match(es) across {len(matched_addrs)} address(es)", opts)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+REPORT_TITLES = {
+    "summary": "Summary",
+    "by_type": "Violations by Type",
+    "by_status": "Open vs. Closed",
+    "by_year": "Violations per Year",
+    "worst_addresses": "Worst Addresses",
+    "rating_distribution": "Yelp Rating Distribution",
+}
 
-    print("═" * 70)
-    print("  ADDRESS MATCHES — Properties with Violations")
-    print("═" * 70)
-    print(tabulate(
-        rows,
-        headers=["Property", "Address", "Violation", "Date"],
-        tablefmt=fmt,
-    ))
-    print(f"\n  {len(rows)} match(es) across {len(common)} address(es)\n")
+
+def view_report(opts: ViewOptions) -> None:
+    """
+    Display aggregate statistics (see violation_report.py). Filters narrow
+    the records that feed the report; --limit sets how many worst addresses
+    are listed.
+    """
+    # pandas is only needed here, so don't make the row views pay for it.
+    from violation_report import build_report
+
+    violations = iter_records(match_index.VIOLATIONS_SOURCE, VIOLATIONS_FILE, opts)
+    yelp = iter_records(match_index.YELP_SOURCE, YELP_FILE, opts)
+    report = build_report(
+        list(violations or []),
+        list(yelp or []),
+        top_n=DEFAULT_REPORT_TOP if opts.limit is None else opts.limit,
+    )
+
+    if opts.fmt == "json":
+        json.dump(
+            {
+                name: [dict(zip(headers, row)) for row in rows]
+                for name, (headers, rows) in report.items()
+            },
+            sys.stdout,
+            indent=2,
+            ensure_ascii=False,
+            default=_json_default,
+        )
+        print()
+        return
+
+    if opts.fmt == "csv":
+        for i, (name, (headers, rows)) in enumerate(report.items()):
+            if i:
+                print()
+            print(f"# {name}")
+            _write_csv(headers, rows)
+        return
+
+    _banner("VIOLATION REPORT — Davis, CA", opts)
+    for name, (headers, rows) in report.items():
+        print(f"\n  {REPORT_TITLES[name]}\n")
+        print(tabulate(rows, headers=headers, tablefmt=opts.fmt))
+    print()
+
+
+def view_search(opts: ViewOptions) -> None:
+    """
+    Fuzzy-search Yelp listings (name + address) and violation addresses with
+    the in-memory trigram index (see search_index.py). Filters narrow the
+    records that are indexed.
+    """
+    # NumPy is only needed here, as with pandas for the report.
+    from search_index import NGramIndex
+
+    if not opts.query:
+        print("\n  ⚠  search needs --query TEXT", file=sys.stderr)
+        return
+
+    index = NGramIndex()
+    for r in iter_records(match_index.YELP_SOURCE, YELP_FILE, opts) or ():
+        name = r.get("property_name") or ""
+        address = r.get("normalized_address") or r.get("address") or ""
+        index.add(f"{name} {address}", ("Yelp", name or "—", address or "—"))
+
+    violation_counts: dict[str, int] = {}
+    for r in iter_records(match_index.VIOLATIONS_SOURCE, VIOLATIONS_FILE, opts) or ():
+        address = r.get("normalized_address") or r.get("address") or ""
+        if address:
+            violation_counts[address] = violation_counts.get(address, 0) + 1
+    for address, count in violation_counts.items():
+        index.add(address, ("Violations", f"{count} violation(s)", address))
+
+    limit = DEFAULT_SEARCH_LIMIT if opts.limit is None else opts.limit
+    results = index.search(query_key(opts.query), limit=opts.offset + limit)
+    shown = _render(
+        f"SEARCH — \"{opts.query}\"",
+        ["Score", "Source", "Name", "Address"],
+        ([score, *payload] for score, payload in results),
+        replace(opts, limit=limit),
+    )
+    _footer(f"{shown} result(s) from {len(index)} indexed record(s)", opts)
+
+
+def view_timeline(opts: ViewOptions) -> None:
+    """
+    Rolling-window violation counts per address (see temporal_index.py),
+    busiest in the last year first. Evaluated as of --until, or today.
+    """
+    # NumPy is only needed here, as with pandas for the report.
+    from temporal_index import from_records
+
+    violations = iter_records(match_index.VIOLATIONS_SOURCE, VIOLATIONS_FILE, opts)
+    if violations is None:
+        return
+    index, key_name = from_records(list(violations))
+    as_of = opts.filters.until or date.today().isoformat()
+    rows = sorted(
+        index.rows(as_of, key_name),
+        key=lambda r: (-r["violations_1y"], -r["violations_3y"], str(r[key_name])),
+    )
+
+    shown = _render(
+        f"VIOLATION TIMELINE — as of {as_of}",
+        ["Address" if key_name == "normalized_address" else "Property",
+         "90 days", "1 year", "3 years", "Open (3y)", "Trend (1y)", "Last", "Days since"],
+        (
+            [
+                r[key_name], r["violations_90d"], r["violations_1y"], r["violations_3y"],
+                r["open_3y"], f"{r['trend_1y']:+d}", r["last_violation_date"] or "—",
+                "—" if r["days_since_last"] is None else r["days_since_last"],
+            ]
+            for r in rows
+        ),
+        opts,
+    )
+    _footer(f"{shown} of {len(rows)} address(es)", opts)
 
 
 # ── CLI ────────────────────────────────────────────────────────────────────────
@@ -137,6 +522,57 @@ VIEWS = {
     "matches": view_matches,
 }
 
+# Views that `all` doesn't include
+EXTRA_VIEWS = {
+    "report": view_report,
+    "search": view_search,
+    "timeline": view_timeline,
+}
+
+
+def view_all_json(opts: ViewOptions) -> None:
+    """`all --format json`: one object keyed by view, so the output stays a single JSON document."""
+    sys.stdout.write("{")
+    for i, (name, fn) in enumerate(VIEWS.items()):
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            fn(opts)
+        sys.stdout.write(",\n" if i else "\n")
+        sys.stdout.write(f"{json.dumps(name)}: {buf.getvalue().strip() or '[]'}")
+    sys.stdout.write("\n}\n")
+
+
+def _non_negative(value: str) -> int:
+    n = int(value)
+    if n < 0:
+        raise argparse.ArgumentTypeError("must be >= 0")
+    return n
+
+
+def _positive(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError("must be >= 1")
+    return n
+
+
+def _date_bound(value: str, end: bool) -> str:
+    """Expand YYYY / YYYY-MM / YYYY-MM-DD into an inclusive ISO date bound."""
+    parts = value.split("-")
+    try:
+        if len(parts) == 1:
+            year = int(parts[0])
+            return date(year, 12, 31).isoformat() if end else date(year, 1, 1).isoformat()
+        if len(parts) == 2:
+            year, month = int(parts[0]), int(parts[1])
+            if not end:
+                return date(year, month, 1).isoformat()
+            last_day = calendar.monthrange(year, month)[1]
+            return date(year, month, last_day).isoformat()
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (use YYYY, YYYY-MM or YYYY-MM-DD)")
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(
@@ -144,24 +580,114 @@ def main() -> None:
     )
     parser.add_argument(
         "view",
-        choices=["yelp", "violations", "matches", "all"],
+        choices=[*VIEWS, *EXTRA_VIEWS, "all"],
         help="Which dataset to display",
     )
     parser.add_argument(
         "--format",
         dest="fmt",
         default="grid",
-        choices=["grid", "simple", "github", "html"],
-        help="Table output format (default: grid)",
+        choices=[*TABLE_FORMATS, *DATA_FORMATS],
+        help="Output format: a table style, or csv / json (default: grid)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=_non_negative,
+        default=None,
+        help="Show at most N rows",
+    )
+    parser.add_argument(
+        "--offset",
+        type=_non_negative,
+        default=0,
+        help="Skip the first N rows (default: 0)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read records lazily and print the table in fixed-size pages",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=_positive,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Rows per page in --stream mode (default: {DEFAULT_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--query",
+        "-q",
+        help="Search text for the search view, e.g. 'lexington' or 'sycamore ln'",
+    )
+
+    filters = parser.add_argument_group(
+        "filters",
+        "Answered from match_index.sqlite's secondary indexes when it is current",
+    )
+    filters.add_argument(
+        "--since",
+        type=lambda v: _date_bound(v, end=False),
+        help="Violations on or after this date (YYYY, YYYY-MM or YYYY-MM-DD)",
+    )
+    filters.add_argument(
+        "--until",
+        type=lambda v: _date_bound(v, end=True),
+        help="Violations on or before this date (YYYY, YYYY-MM or YYYY-MM-DD)",
+    )
+    filters.add_argument(
+        "--type",
+        dest="types",
+        action="append",
+        default=[],
+        metavar="TYPE",
+        help="Violation type, case-insensitive (repeatable)",
+    )
+    filters.add_argument(
+        "--street",
+        help="Street-name prefix, e.g. 'Sycamore' or 'Sycamore Ln'",
+    )
+    filters.add_argument(
+        "--address",
+        help="Normalized-address prefix, e.g. '600 Sycamore'",
+    )
+    filters.add_argument(
+        "--min-rating",
+        type=float,
+        help="Minimum Yelp star rating",
     )
     args = parser.parse_args()
 
-    if args.view == "all":
-        for name, fn in VIEWS.items():
-            fn(args.fmt)
-    else:
-        VIEWS[args.view](args.fmt)
+    opts = ViewOptions(
+        fmt=args.fmt,
+        limit=args.limit,
+        offset=args.offset,
+        stream=args.stream,
+        page_size=args.page_size,
+        query=args.query,
+        filters=match_index.RecordFilter(
+            since=args.since,
+            until=args.until,
+            types=tuple(t for t in map(match_index.type_key, args.types) if t),
+            street=query_key(args.street) if args.street else None,
+            address=query_key(args.address) if args.address else None,
+            min_rating=args.min_rating,
+        ),
+    )
+
+    try:
+        if args.view == "all" and opts.fmt == "json":
+            view_all_json(opts)
+        elif args.view == "all":
+            for name, fn in VIEWS.items():
+                fn(opts)
+        else:
+            {**VIEWS, **EXTRA_VIEWS}[args.view](opts)
+    except BrokenPipeError:
+        # The pager (or `head`) exited early — point stdout at /dev/null so
+        # the interpreter's final flush doesn't raise again, then stop quietly.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    instrument.run(main, "view_data")
@@ -0,0 +1,259 @@
+"""
+violation_classifier.py — Map free-text violation types onto the app's taxonomy.
+
+`violation_type` is whatever the city export had (ingest_city_data.py even
+takes it from a "description" column), so it is normalized here to the
+categories the app shows (ReportViolationForm's VIOLATION_TYPES) and a
+severity (1 = minor … 3 = life-safety) for risk_score.py.
+
+The whole TAXONOMY is compiled into one regular expression, one named group
+per category, so each string is scanned once however many phrases there
+are. When several categories match, the most severe wins, then the one
+listed first. Phrases match whole words; a trailing `*` matches any word
+starting with the stem ("plumb*" → plumbing, plumber). Results are cached
+per distinct text, since city exports repeat a few hundred descriptions
+across many rows.
+
+Usage:
+    python violation_classifier.py                 Category counts for normalized_violations.json
+    python violation_classifier.py "Roach infestation in unit 4"
+    python violation_classifier.py --benchmark --size 2000000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import NamedTuple
+
+import instrument
+from json_records import iter_json_array
+
+
+VIOLATIONS_FILE = "normalized_violations.json"
+CACHE_SIZE = 65_536
+
+OTHER = "Other"
+DEFAULT_SEVERITY = 1.0
+
+# (category, severity, phrases). Category names match the app's labels.
+TAXONOMY: list[tuple[str, float, tuple[str, ...]]] = [
+    ("Fire Safety Violation", 3.0, (
+        "fire*", "smoke*", "carbon monoxide", "co detector*", "sprinkler*", "extinguisher*",
+        "egress", "exit sign*", "gas", "gas leak*", "flammable", "combustible",
+    )),
+    ("Electrical Hazard", 3.0, (
+        "electric*", "wiring", "exposed wire*", "outlet*", "breaker*", "panel*", "gfci",
+    )),
+    ("Structural Damage", 3.0, (
+        "structur*", "foundation*", "collapse*", "roof*", "stair*", "balcon*", "railing*",
+        "handrail*", "dangerous building", "unsafe building",
+    )),
+    ("Plumbing/Mold", 2.0, (
+        "plumb*", "mold*", "mould*", "mildew", "leak*", "sewage", "sewer*", "water heater*",
+        "hot water", "drain*", "toilet*", "moisture", "water damage",
+    )),
+    ("Pest Infestation", 2.0, (
+        "pest*", "infest*", "roach*", "cockroach*", "rodent*", "rat", "rats", "mice", "mouse",
+        "bed bug*", "bedbug*", "termite*", "vermin",
+    )),
+    ("HVAC Failure", 2.0, (
+        "hvac", "heat*", "furnace*", "air condition*", "ventilation", "a/c",
+    )),
+    ("Sanitation Issue", 1.0, (
+        "sanita*", "unsanitary", "trash", "garbage", "debris", "rubbish", "junk", "litter*",
+        "refuse", "overgrown", "weed*",
+    )),
+    ("Noise Complaint", 1.0, (
+        "noise", "noisy", "loud",
+    )),
+]
+
+
+class Classification(NamedTuple):
+    category: str
+    severity: float
+
+
+UNCLASSIFIED = Classification(OTHER, DEFAULT_SEVERITY)
+
+
+# ── Compiled matcher ───────────────────────────────────────────────────────────
+
+def _phrase_pattern(phrase: str) -> str:
+    stem = phrase.endswith("*")
+    words = phrase.rstrip("*").split()
+    body = r"\s+".join(re.escape(w) for w in words)
+    return body + (r"\w*" if stem else r"(?!\w)")
+
+
+def compile_taxonomy(taxonomy: list[tuple[str, float, tuple[str, ...]]]) -> re.Pattern:
+    """
+    One pattern for the whole taxonomy: group `c<i>` holds category i's
+    phrases, longest first so multi-word phrases beat their prefixes.
+    """
+    groups = []
+    for i, (_, _, phrases) in enumerate(taxonomy):
+        alts = sorted(phrases, key=lambda p: -len(p.rstrip("*")))
+        groups.append(f"(?P<c{i}>{'|'.join(_phrase_pattern(p) for p in alts)})")
+    return re.compile(r"(?<!\w)(?:" + "|".join(groups) + ")", re.IGNORECASE)
+
+
+_PATTERN = compile_taxonomy(TAXONOMY)
+# Rank of each category group: higher severity first, then taxonomy order.
+_RANK = {
+    f"c{i}": (-severity, i)
+    for i, (_, severity, _) in enumerate(TAXONOMY)
+}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _classify_text(text: str) -> Classification:
+    best = None
+    for match in _PATTERN.finditer(text):
+        group = match.lastgroup
+        if best is None or _RANK[group] < _RANK[best]:
+            best = group
+    if best is None:
+        return UNCLASSIFIED
+    category, severity, _ = TAXONOMY[int(best[1:])]
+    return Classification(category, severity)
+
+
+def classify(violation_type: str | None) -> Classification:
+    """Category and severity for one free-text violation type."""
+    if not violation_type:
+        return UNCLASSIFIED
+    return _classify_text(violation_type)
+
+
+def classify_records(records: list[dict], key: str = "violation_type") -> list[dict]:
+    """Add `violation_category` and `violation_severity` to each record."""
+    for rec in records:
+        category, severity = classify(rec.get(key))
+        rec["violation_category"] = category
+        rec["violation_severity"] = severity
+    instrument.count("violations_classified", len(records))
+    return records
+
+
+# ── Case status ────────────────────────────────────────────────────────────────
+
+# Free-text case statuses, matched anywhere in the lower-cased text; open wins
+# when both match ("reopened after closure"). Shared by the report, the
+# temporal index, risk scores and the property_summary migration's SQL.
+OPEN_PATTERN = r"open|active|pending|in progress"
+CLOSED_PATTERN = r"clos|resolv|complied|abated|dismiss|void"
+
+_OPEN = re.compile(OPEN_PATTERN)
+
+
+def is_open(status: str | None) -> bool:
+    """True if a free-text case status counts as open."""
+    return bool(status) and _OPEN.search(str(status).lower()) is not None
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+BENCH_PREFIXES = ("", "Tenant reports ", "Inspection found ", "Complaint: ", "Repeat - ", "Notice of ")
+BENCH_SUFFIXES = ("", " in unit", " at rear of building", " (follow-up)", " per code 8.01", " not corrected")
+BENCH_PHRASES = (
+    "roach infestation", "mold in bathroom", "leaking water heater", "exposed wiring",
+    "missing smoke detector", "broken handrail", "no heat", "trash accumulation",
+    "loud music", "inoperable furnace", "sewer backup", "unpermitted fence",
+    "abandoned vehicle", "rodent activity", "damaged roof", "blocked egress",
+)
+
+
+def _naive(text: str) -> Classification:
+    """Per-phrase substring scan, the approach the compiled pattern replaces."""
+    lower = text.lower()
+    best = None
+    for category, severity, phrases in TAXONOMY:
+        if any(p.rstrip("*") in lower for p in phrases):
+            if best is None or severity > best[1]:
+                best = (category, severity)
+    return Classification(*best) if best else UNCLASSIFIED
+
+
+def benchmark(size: int, distinct: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    pool = [
+        f"{rng.choice(BENCH_PREFIXES)}{rng.choice(BENCH_PHRASES)}{rng.choice(BENCH_SUFFIXES)} #{i}"
+        for i in range(distinct)
+    ]
+    texts = [pool[rng.randrange(distinct)] for _ in range(size)]
+
+    start = time.perf_counter()
+    for text in pool:
+        _naive(text)
+    naive = time.perf_counter() - start
+
+    _classify_text.cache_clear()
+    start = time.perf_counter()
+    for text in pool:
+        _classify_text.__wrapped__(text)
+    compiled = time.perf_counter() - start
+
+    _classify_text.cache_clear()
+    start = time.perf_counter()
+    counts = Counter(classify(t).category for t in texts)
+    cached = time.perf_counter() - start
+
+    print(f"  • naive scan:     {distinct:,} distinct texts in {naive:.2f}s ({distinct / naive:,.0f}/s)")
+    print(f"  • compiled regex: {distinct:,} distinct texts in {compiled:.2f}s ({distinct / compiled:,.0f}/s)")
+    print(f"  • cached:         {size:,} descriptions in {cached:.2f}s ({size / cached:,.0f}/s)")
+    top = ", ".join(f"{c} {n:,}" for c, n in counts.most_common(4))
+    print(f"  • top categories: {top}")
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="LeaseLens — Classify violation types into categories and severities",
+    )
+    parser.add_argument("text", nargs="*", help="Classify these strings instead of the violations file")
+    parser.add_argument("--input", default=VIOLATIONS_FILE, help="Violations JSON file")
+    parser.add_argument("--benchmark", action="store_true", help="Time synthetic descriptions instead")
+    parser.add_argument("--size", type=int, default=2_000_000, help="Benchmark descriptions")
+    parser.add_argument("--distinct", type=int, default=50_000, help="Benchmark distinct texts")
+    args = parser.parse_args()
+
+    print("violation_classifier.py — Violation taxonomy for LeaseLens\n")
+    if args.benchmark:
+        benchmark(args.size, args.distinct)
+        return
+    if args.text:
+        for text in args.text:
+            category, severity = classify(text)
+            print(f"  • {text!r} → {category} (severity {severity:g})")
+        return
+
+    try:
+        records = list(iter_json_array(args.input))
+    except FileNotFoundError:
+        print(f"  ⚠  {args.input} not found — run normalize_data.py first.")
+        sys.exit(1)
+
+    counts: Counter = Counter()
+    other: Counter = Counter()
+    for rec in records:
+        result = classify(rec.get("violation_type"))
+        counts[result] += 1
+        if result == UNCLASSIFIED:
+            other[rec.get("violation_type") or "(blank)"] += 1
+    for (category, severity), n in counts.most_common():
+        print(f"  {n:>7}  {category:<24} severity {severity:g}")
+    if other:
+        print("\n  Most common unclassified types:")
+        for text, n in other.most_common(10):
+            print(f"  {n:>7}  {text}")
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    instrument.run(main, "violation_classifier")
@@ -0,0 +1,137 @@
+"""
+violation_report.py — Aggregate statistics over normalized LeaseLens data.
+
+Builds every section of `view_data.py report` from two DataFrames in a single
+pass of vectorized pandas group-bys, so summarising 100k+ violation rows takes
+well under a second instead of a spreadsheet session.
+
+Sections (each a list of headers plus rows):
+    summary              totals, open / closed split, Yelp coverage
+    by_type              violations and open cases per violation type
+    by_status            open / closed / unknown counts
+    by_year              violations and open cases per calendar year
+    worst_addresses      top-N addresses by violation count, with Yelp name
+    rating_distribution  Yelp listings per half-star bucket
+"""
+
+import pandas as pd
+
+from violation_classifier import CLOSED_PATTERN, OPEN_PATTERN
+
+
+Section = tuple[list[str], list[list]]
+
+
+def _status_class(status: pd.Series) -> pd.Series:
+    """Map free-text case statuses onto 'open' / 'closed' / 'unknown'."""
+    text = status.fillna("").astype(str).str.strip().str.lower()
+    out = pd.Series("unknown", index=status.index)
+    out[text.str.contains(CLOSED_PATTERN, regex=True)] = "closed"
+    out[text.str.contains(OPEN_PATTERN, regex=True)] = "open"
+    return out
+
+
+def _frame(records: list[dict], columns: list[str]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(records)
+    for col in columns:
+        if col not in df.columns:
+            df[col] = None
+    return df
+
+
+def _rows(df: pd.DataFrame) -> list[list]:
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+def build_report(
+    violations: list[dict],
+    yelp: list[dict],
+    top_n: int = 10,
+) -> dict[str, Section]:
+    """Compute every report section. `top_n=0` lists all addresses."""
+    v = _frame(violations, ["normalized_address", "address", "violation_type", "date", "status"])
+    y = _frame(yelp, ["normalized_address", "property_name", "star_rating"])
+
+    v["address_key"] = (
+        v["normalized_address"].fillna(v["address"]).fillna("").astype(str).str.lower()
+    )
+    v["type"] = v["violation_type"].fillna("(unknown)").astype(str).str.strip()
+    v["when"] = pd.to_datetime(v["date"], errors="coerce", format="mixed")
+    v["state"] = _status_class(v["status"])
+    v["is_open"] = v["state"] == "open"
+
+    y["address_key"] = y["normalized_address"].fillna("").astype(str).str.lower()
+    y["rating"] = pd.to_numeric(y["star_rating"], errors="coerce")
+
+    report: dict[str, Section] = {}
+
+    # ── Summary ────────────────────────────────────────────────────────────
+    state_counts = v["state"].value_counts()
+    mean_rating = y["rating"].mean()
+    report["summary"] = (
+        ["Metric", "Value"],
+        [
+            ["Violations", len(v)],
+            ["Distinct addresses", int(v["address_key"].nunique())],
+            ["Open", int(state_counts.get("open", 0))],
+            ["Closed", int(state_counts.get("closed", 0))],
+            ["Unknown status", int(state_counts.get("unknown", 0))],
+            ["Yelp listings", len(y)],
+            ["Mean Yelp rating", None if pd.isna(mean_rating) else round(float(mean_rating), 2)],
+        ],
+    )
+
+    # ── By type ────────────────────────────────────────────────────────────
+    by_type = (
+        v.groupby("type")
+        .agg(violations=("type", "size"), open=("is_open", "sum"))
+        .sort_values(["violations", "open"], ascending=False)
+        .reset_index()
+    )
+    by_type["share_pct"] = (by_type["violations"] / max(len(v), 1) * 100).round(1)
+    report["by_type"] = (["Violation Type", "Violations", "Open", "Share %"], _rows(by_type))
+
+    # ── By status ──────────────────────────────────────────────────────────
+    by_status = state_counts.rename_axis("status").reset_index(name="violations")
+    report["by_status"] = (["Status", "Violations"], _rows(by_status))
+
+    # ── By year ────────────────────────────────────────────────────────────
+    dated = v[v["when"].notna()]
+    by_year = (
+        dated.groupby(dated["when"].dt.year)
+        .agg(violations=("type", "size"), open=("is_open", "sum"))
+        .sort_index()
+        .reset_index()
+    )
+    report["by_year"] = (["Year", "Violations", "Open"], _rows(by_year))
+
+    # ── Worst addresses ────────────────────────────────────────────────────
+    per_address = (
+        v[v["address_key"] != ""]
+        .groupby("address_key")
+        .agg(violations=("type", "size"), open=("is_open", "sum"), latest=("when", "max"))
+        .sort_values(["violations", "open"], ascending=False)
+    )
+    if top_n:
+        per_address = per_address.head(top_n)
+    names = y[y["address_key"] != ""].drop_duplicates("address_key", keep="last")
+    worst = per_address.reset_index().merge(
+        names[["address_key", "property_name"]], on="address_key", how="left",
+    )
+    worst["address"] = worst["address_key"].str.title()
+    worst["latest"] = worst["latest"].dt.strftime("%Y-%m-%d")
+    report["worst_addresses"] = (
+        ["Address", "Property", "Violations", "Open", "Latest"],
+        _rows(worst[["address", "property_name", "violations", "open", "latest"]]),
+    )
+
+    # ── Rating distribution ────────────────────────────────────────────────
+    rated = y["rating"].dropna()
+    buckets = (rated * 2) // 1 / 2
+    distribution = buckets.value_counts().sort_index(ascending=False)
+    report["rating_distribution"] = (
+        ["Rating", "Listings"],
+        [[f"{rating:.1f}", int(count)] for rating, count in distribution.items()],
+    )
+
+    return report